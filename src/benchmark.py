@@ -0,0 +1,251 @@
+"""
+Benchmark suite for the registered problems.
+
+Runs every BENCHMARK_SUITE entry (problem x size) over several seeds and records
+wall time, evaluations per second, time-to-target, the best/mean fitness curves
+and the peak RSS of each run, then writes everything as JSON. Given a baseline
+JSON from an earlier run, it flags the cases that got slower, bigger or worse
+beyond a threshold and exits with status 1.
+
+Every run happens in a fresh (spawned) process, so the peak RSS is that run's
+own and no problem instance or cache is shared between runs.
+
+    python -m src.benchmark --output bench.json
+    python -m src.benchmark --problems rosenbrock sphere --seeds 1 2 --output new.json --baseline bench.json
+
+--ga-option passes BaseGA arguments to every run, e.g. to compare the cellular
+engine's quality and evaluations against a panmictic baseline:
+
+    python -m src.benchmark --ga-option cellular=True --baseline bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config.setting import BENCHMARK_SUITE, BENCHMARK_GA_PARAMS, get_problem
+from src.main import fitness_curves, parse_assignments
+
+
+# runs one (problem, size, seed) case; executed in a worker process
+def run_case(case):
+    from src.ga.base_ga import BaseGA
+
+    name, params, seed, ga_params = case
+
+    setup_start = time.perf_counter()
+    ga = BaseGA.from_problem(
+        get_problem(name, **params),
+        population_size=ga_params["POPULATION_SIZE"],
+        ngen=ga_params["MAX_GENERATIONS"],
+        crossover_prob=ga_params["P_CROSSOVER"],
+        mutation_prob=ga_params["P_MUTATION"],
+        seed=seed,
+        verbose=False,
+        profile=ga_params.get("PROFILE", False),
+        **ga_params.get("GA_OPTIONS", {}),
+    )
+    setup_time = time.perf_counter() - setup_start
+
+    start = time.perf_counter()
+    results = ga.run()
+    wall_time = time.perf_counter() - start
+
+    # plain floats (some fitness functions return numpy scalars, which json rejects);
+    # multi-objective runs follow their first objective
+    maximize, best_curve, mean_curve = fitness_curves(ga, results)
+    run = {
+        "problem": name,
+        "params": params,
+        "seed": seed,
+        "maximize": maximize,
+        "setup_time": setup_time,
+        "wall_time": wall_time,
+        "evaluations": results["evaluations"],
+        "evals_per_sec": results["evaluations"] / wall_time,
+        "evaluations_to_target": results.get("evaluations_to_target"),
+        "time_to_target": results.get("time_to_target"),
+        "final_best": best_curve[-1],
+        "best_curve": best_curve,
+        "mean_curve": mean_curve,
+        # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    if "profile" in results:
+        run["phase_times"] = results["profile"]["totals"]
+        run["counters"] = results["profile"]["counters"]
+    return run
+
+
+# "name[key=value,...]" label of a problem size
+def case_key(name, params):
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{k}={v}" for k, v in sorted(params.items())) + "]"
+
+
+# median of the values that are not None, or None
+def median_or_none(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+# per-case medians over the seeds
+def summarize(runs):
+    grouped = {}
+    for run in runs:
+        grouped.setdefault(case_key(run["problem"], run["params"]), []).append(run)
+
+    summary = {}
+    for key, case_runs in grouped.items():
+        summary[key] = {
+            "runs": len(case_runs),
+            "maximize": case_runs[0]["maximize"],
+            "wall_time": median_or_none([r["wall_time"] for r in case_runs]),
+            "evals_per_sec": median_or_none([r["evals_per_sec"] for r in case_runs]),
+            "evaluations": median_or_none([r["evaluations"] for r in case_runs]),
+            "final_best": median_or_none([r["final_best"] for r in case_runs]),
+            "evaluations_to_target": median_or_none(
+                [r["evaluations_to_target"] for r in case_runs]
+            ),
+            "time_to_target": median_or_none([r["time_to_target"] for r in case_runs]),
+            "reached_target": sum(r["evaluations_to_target"] is not None for r in case_runs),
+            "peak_rss_kb": median_or_none([r["peak_rss_kb"] for r in case_runs]),
+        }
+    return summary
+
+
+# cases of summary that regressed against baseline by more than threshold
+def compare(summary, baseline, threshold):
+    regressions = []
+    for key, new in summary.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+
+        checks = [
+            ("wall_time", new["wall_time"] > old["wall_time"] * (1 + threshold)),
+            ("evals_per_sec", new["evals_per_sec"] < old["evals_per_sec"] * (1 - threshold)),
+            ("peak_rss_kb", new["peak_rss_kb"] > old["peak_rss_kb"] * (1 + threshold)),
+        ]
+        # quality: relative to the baseline value, or absolute near zero
+        sign = -1 if new["maximize"] else 1
+        loss = sign * (new["final_best"] - old["final_best"])
+        checks.append(("final_best", loss > threshold * max(abs(old["final_best"]), 1.0)))
+
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append(
+                    {"case": key, "metric": metric, "baseline": old[metric], "current": new[metric]}
+                )
+    return regressions
+
+
+# describes the machine and code the numbers were measured on
+def environment():
+    import numpy as np
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def print_summary(summary, regressions):
+    flagged = {}
+    for r in regressions:
+        flagged.setdefault(r["case"], []).append(r["metric"])
+
+    print(f"{'case':45s} {'wall s':>9s} {'evals/s':>11s} {'evals':>9s} {'best':>14s} {'to target':>10s} {'RSS MB':>8s}")
+    for key, s in summary.items():
+        mark = "  <-- " + ", ".join(flagged[key]) if key in flagged else ""
+        print(
+            f"{key:45s} {s['wall_time']:9.3f} {s['evals_per_sec']:11.0f} {s['evaluations']:9.0f} {s['final_best']:14.6g} "
+            f"{s['reached_target']:>4d}/{s['runs']:<5d} {s['peak_rss_kb'] / 1024:8.1f}{mark}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GA engine on the registered problems")
+    parser.add_argument("--problems", nargs="+", choices=sorted(BENCHMARK_SUITE),
+                        default=list(BENCHMARK_SUITE), help="problems to run (default: all)")
+    parser.add_argument("--seeds", nargs="+", type=int, default=list(BENCHMARK_GA_PARAMS["SEEDS"]))
+    parser.add_argument("--population-size", type=int, default=BENCHMARK_GA_PARAMS["POPULATION_SIZE"])
+    parser.add_argument("--generations", type=int, default=BENCHMARK_GA_PARAMS["MAX_GENERATIONS"])
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="runs in parallel (more than 1 makes timings noisier)")
+    parser.add_argument("--profile", action="store_true",
+                        help="record the time spent in each phase of the GA")
+    parser.add_argument("--ga-option", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="further BaseGA argument of every run, e.g. cellular=True")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_GA_PARAMS["REGRESSION_THRESHOLD"],
+                        help="relative change reported as a regression")
+    args = parser.parse_args(argv)
+
+    ga_params = dict(
+        BENCHMARK_GA_PARAMS,
+        POPULATION_SIZE=args.population_size,
+        MAX_GENERATIONS=args.generations,
+        PROFILE=args.profile,
+        GA_OPTIONS=parse_assignments(args.ga_option),
+    )
+    ga_params.pop("SEEDS")
+    cases = [
+        (name, params, seed, ga_params)
+        for name in args.problems
+        for params in BENCHMARK_SUITE[name]
+        for seed in args.seeds
+    ]
+
+    # --- One fresh process per run (not daemonic, so steady-state runs can start workers) ---
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.jobs, mp_context=context, max_tasks_per_child=1) as executor:
+        runs = list(executor.map(run_case, cases))
+
+    summary = summarize(runs)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(summary, json.load(f)["summary"], args.threshold)
+
+    print_summary(summary, regressions)
+    if args.output:
+        report = {
+            "environment": environment(),
+            "ga_params": ga_params,
+            "seeds": args.seeds,
+            "summary": summary,
+            "regressions": regressions,
+            "runs": runs,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} of the baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,81 +1,306 @@
-from src.ga.tsp import tsp_fitness, tsp_instance
-from src.ga.knapsack import knapsack_fitness, knapsack
-from src.ga.nurses import nurses_fitness, nsp
-from src.ga.timetabling import timetable_fitness, timetable_instance
-from src.ga.rosenbrock import rosenbrock_fitness, rosenbrock
-from src.problems.timetabling import TimetablingProblem
+from functools import cache, partial
 
 DEFAULT_GA_PARAMS = {
-    # tsp
-    # "POPULATION_SIZE": 300,
-    # "MAX_GENERATIONS": 200,
-    # rosenbrock
     "POPULATION_SIZE": 50,
     "MAX_GENERATIONS": 100,
-    # knapsack
-    # "POPULATION_SIZE": 50,
-    # "MAX_GENERATIONS": 50,
-    # nursing
-    # "POPULATION_SIZE": 300,
-    # "MAX_GENERATIONS": 200,
-    # timetabling
-    # "POPULATION_SIZE": 150,
-    # "MAX_GENERATIONS": 600,
     "P_CROSSOVER": 0.6,
     "P_MUTATION": 0.1,
     "SEED": 42,
 }
 
+# Per-problem overrides of DEFAULT_GA_PARAMS used by main.py; GA_OPTIONS holds further
+# BaseGA.from_problem() arguments, passed as its defaults, so an engine mode drops the
+# ones it cannot use (e.g. elitism). Entries in this format are printed by src/tuning.py.
+PROBLEM_GA_PARAMS = {
+    "tsp": {"POPULATION_SIZE": 300, "MAX_GENERATIONS": 200},
+    # tuned: reaches the median quality of 50 x 50 after 211 instead of ~1500 evaluations
+    "knapsack": {
+        "POPULATION_SIZE": 20,
+        "MAX_GENERATIONS": 25,
+        "P_CROSSOVER": 0.9,
+        "P_MUTATION": 0.2,
+        "GA_OPTIONS": {"elitism": 2, "mate": "uniform", "mutate": "flip_bit", "selection": "sus"},
+    },
+    # tuned: reaches a zero cost after 29 instead of 82 evaluations (median)
+    "nurses": {
+        "POPULATION_SIZE": 20,
+        "MAX_GENERATIONS": 50,
+        "P_CROSSOVER": 0.5,
+        "P_MUTATION": 0.2,
+        "GA_OPTIONS": {"elitism": 1, "mate": "two_point", "selection": "rank"},
+    },
+    "timetabling": {"POPULATION_SIZE": 150, "MAX_GENERATIONS": 600},
+    # tuned: reaches the median quality of 50 x 100 after 448 instead of 2174 evaluations
+    "rosenbrock": {
+        "POPULATION_SIZE": 100,
+        "MAX_GENERATIONS": 200,
+        "P_CROSSOVER": 0.5,
+        "P_MUTATION": 0.05,
+        "GA_OPTIONS": {"elitism": 1, "mate": "blend", "mutate": "gaussian", "selection": "tournament"},
+    },
+}
+
 HARD_CONSTRAINT_PENALTY = 10
 
-PROBLEMS = {
-    "tsp": {
+
+# Every PROBLEMS entry is a factory returning the problem's configuration. The
+# src.ga.* modules (and the problem instances they create) are only imported once
+# a problem is selected through get_problem().
+
+
+def tsp_problem():
+    from src.ga.tsp import tsp_fitness, tsp_instance
+
+    return {
         "fitness_func": tsp_fitness,
         "individual_size": len(tsp_instance),
         "chromosome_type": "permutation",
         "maximize": False,
         "plot_func": tsp_instance.plotData,
         "stats": ("min", "avg"),
-    },
-    "knapsack": {
+    }
+
+
+def knapsack_problem():
+    from src.ga.knapsack import knapsack_fitness, knapsack
+
+    return {
         "fitness_func": knapsack_fitness,
         "individual_size": len(knapsack),
         "chromosome_type": "binary",
         "maximize": True,
         "plot_func": knapsack.printItems,
         "stats": ("max", "avg"),
-    },
-    "nurses": {
-        "fitness_func": nurses_fitness,
-        "individual_size": len(nsp),
+    }
+
+
+def nurses_problem(instance=None, nurses_file=None):
+    """
+    PROBLEMS entry for a given NurseSchedulingProblem instance, or the one of a
+    data/nurses file named by nurses_file (default: the textbook one)
+    """
+    from src.ga.nurses import (
+        nurses_fitness,
+        nurses_objectives,
+        nurses_init,
+        nurses_mutate,
+        nurses_local_search,
+        load_nsp,
+        nsp,
+    )
+
+    if nurses_file is not None:
+        instance = load_nsp(nurses_file)
+    instance = nsp if instance is None else instance
+    return {
+        "fitness_func": partial(nurses_fitness, problem=instance),
+        "individual_size": len(instance),
         "chromosome_type": "binary",
         "maximize": False,
-        "plot_func": nsp.printScheduleInfo,
+        "plot_func": instance.printScheduleInfo,
         "stats": ("min", "avg"),
-    },
-    "timetabling": {
-        "fitness_func": timetable_fitness,
-        "individual_size": len(timetable_instance),
+        "extra_params": lambda: {
+            "init_func": partial(nurses_init, problem=instance),
+            "mutate_func": partial(nurses_mutate, problem=instance),
+            "mutate_evaluates": True,
+            "local_search": partial(nurses_local_search, problem=instance),
+        },
+        # hard and soft violations as separate minimized objectives (NSGA-II)
+        "multi_objective_params": lambda: {
+            "fitness_func": partial(nurses_objectives, problem=instance),
+            "objectives": (-1.0, -1.0),
+            "init_func": partial(nurses_init, problem=instance),
+        },
+    }
+
+
+def nurses_synthetic_problem(num_nurses=200, weeks=4, tightness=0.5, seed=0):
+    from src.ga.nurses import synthetic_nsp
+
+    return nurses_problem(synthetic_nsp(num_nurses, weeks, tightness, seed))
+
+
+def timetabling_problem(instance=None):
+    """PROBLEMS entry for a given TimetablingProblem instance (default: the toy one)"""
+    from src.ga.timetabling import (
+        timetable_fitness,
+        timetable_batch_fitness,
+        timetable_objectives,
+        timetable_batch_objectives,
+        timetable_init,
+        timetable_mutate,
+        timetable_local_search,
+        timetable_instance,
+    )
+
+    instance = timetable_instance if instance is None else instance
+    return {
+        "fitness_func": partial(timetable_fitness, problem=instance),
+        "individual_size": len(instance),
         "chromosome_type": "integer",
         "maximize": False,
-        "plot_func": timetable_instance.printSchedule,
+        "plot_func": instance.printSchedule,
         "stats": ("min", "avg"),
         "extra_params": lambda: {
-            "int_range": (
-                0,
-                TimetablingProblem(HARD_CONSTRAINT_PENALTY).numRooms
-                * TimetablingProblem(HARD_CONSTRAINT_PENALTY).numTimeslots
-                - 1,
-            )
+            "batch_fitness_func": partial(timetable_batch_fitness, problem=instance),
+            "init_func": partial(timetable_init, problem=instance),
+            "mutate_func": partial(timetable_mutate, problem=instance),
+            "mutate_evaluates": True,
+            "local_search": partial(timetable_local_search, problem=instance),
+            "int_range": (0, instance.numRooms * instance.numTimeslots - 1),
         },
-    },
-    "rosenbrock": {
-        "fitness_func": rosenbrock_fitness,
-        "individual_size": len(rosenbrock),
+        # hard and soft costs as separate minimized objectives (NSGA-II)
+        "multi_objective_params": lambda: {
+            "fitness_func": partial(timetable_objectives, problem=instance),
+            "batch_fitness_func": partial(timetable_batch_objectives, problem=instance),
+            "objectives": (-1.0, -1.0),
+            "init_func": partial(timetable_init, problem=instance),
+            "int_range": (0, instance.numRooms * instance.numTimeslots - 1),
+        },
+    }
+
+
+def timetabling_synthetic_problem(num_modules=None, seed=0):
+    """The bundled 1000-module instance, or a generated one of num_modules modules"""
+    from src.ga.timetabling import load_timetable, synthetic_timetable
+
+    if num_modules is None:
+        return timetabling_problem(load_timetable("synthetic_1000"))
+    return timetabling_problem(synthetic_timetable(num_modules, seed))
+
+
+def rosenbrock_problem(dimensions=2):
+    from src.ga.rosenbrock import (
+        rosenbrock_fitness,
+        rosenbrock_batch_fitness,
+        rosenbrock,
+    )
+    from src.problems.rosenbrock import RosenbrockProblem
+
+    instance = rosenbrock if dimensions == 2 else RosenbrockProblem(dimensions)
+    return {
+        "fitness_func": partial(rosenbrock_fitness, problem=instance),
+        "individual_size": len(instance),
         "chromosome_type": "real",
         "maximize": False,
-        "plot_func": rosenbrock.printSolution,
+        "plot_func": instance.printSolution,
         "stats": ("min", "avg"),
-        "real_range": (-5, 5),
-    },
+        "extra_params": lambda: {
+            "batch_fitness_func": partial(rosenbrock_batch_fitness, problem=instance),
+            "real_range": (-5, 5),
+            "target": instance.optimumValue + 1e-4,
+        },
+    }
+
+
+def benchmark_problem(name, dimensions=10, shift=False, rotate=False, seed=0):
+    """PROBLEMS entry for a continuous benchmark function (see src/problems/benchmarks.py)"""
+    from src.ga.benchmarks import (
+        benchmark_instance,
+        benchmark_fitness,
+        benchmark_batch_fitness,
+    )
+
+    instance = benchmark_instance(name, dimensions, shift, rotate, seed)
+    return {
+        "fitness_func": partial(benchmark_fitness, problem=instance),
+        "individual_size": len(instance),
+        "chromosome_type": "real",
+        "maximize": False,
+        "plot_func": instance.printSolution,
+        "stats": ("min", "avg"),
+        "extra_params": lambda: {
+            "batch_fitness_func": partial(benchmark_batch_fitness, problem=instance),
+            "real_range": (instance.lowerBound, instance.upperBound),
+            "target": instance.optimumValue + 1e-4,
+        },
+    }
+
+
+PROBLEMS = {
+    "tsp": tsp_problem,
+    "knapsack": knapsack_problem,
+    # e.g. get_problem("nurses", nurses_file="synthetic_200x4") for data/nurses/synthetic_200x4.nsp
+    "nurses": nurses_problem,
+    # grow num_nurses/weeks/tightness through get_problem() keywords for scaling sweeps
+    "nurses_synthetic": nurses_synthetic_problem,
+    "timetabling": timetabling_problem,
+    "timetabling_synthetic": timetabling_synthetic_problem,
+    # e.g. get_problem("rosenbrock", dimensions=1000)
+    "rosenbrock": rosenbrock_problem,
+    # e.g. get_problem("rastrigin", dimensions=100, shift=True, rotate=True)
+    "sphere": partial(benchmark_problem, "sphere"),
+    "rastrigin": partial(benchmark_problem, "rastrigin"),
+    "ackley": partial(benchmark_problem, "ackley"),
+    "griewank": partial(benchmark_problem, "griewank"),
+    "schwefel": partial(benchmark_problem, "schwefel"),
+    "levy": partial(benchmark_problem, "levy"),
+    "zakharov": partial(benchmark_problem, "zakharov"),
+}
+
+
+@cache
+def get_problem(name, **params):
+    """
+    Instantiates a registered problem on first selection; later calls with the
+    same name and keyword parameters return the cached configuration.
+    """
+    return PROBLEMS[name](**params)
+
+
+# Benchmark suite (src/benchmark.py): the get_problem() keywords of every size
+# benchmarked per problem, and the GA settings shared by all benchmark runs.
+BENCHMARK_SUITE = {
+    "tsp": [{}],
+    "knapsack": [{}],
+    "nurses": [{}],
+    "nurses_synthetic": [{"num_nurses": 50, "weeks": 2}, {"num_nurses": 200, "weeks": 4}],
+    "timetabling": [{}],
+    "timetabling_synthetic": [{"num_modules": 200}, {}],
+    "rosenbrock": [{"dimensions": 10}, {"dimensions": 100}],
+    "sphere": [{"dimensions": 30}],
+    "rastrigin": [{"dimensions": 30}],
+    "ackley": [{"dimensions": 30}],
+    "griewank": [{"dimensions": 30}],
+    "schwefel": [{"dimensions": 30}],
+    "levy": [{"dimensions": 30}],
+    "zakharov": [{"dimensions": 30}],
+}
+
+# Racing tuner (src/tuning.py): candidate values of BaseGA.from_problem() arguments
+# ("mate" and "mutate" name operators of the encoding's portfolio, see
+# src/ga/adaptive.py, and are drawn from the whole portfolio when set to None; a
+# problem with its own mutation operator keeps it), and the race settings.
+TUNING_SPACE = {
+    "population_size": (20, 50, 100, 200),
+    "ngen": (25, 50, 100, 200),
+    "crossover_prob": (0.5, 0.7, 0.9),
+    "mutation_prob": (0.05, 0.1, 0.2, 0.4),
+    "selection": ("tournament", "rank", "sus", "truncation"),
+    "elitism": (0, 1, 2),
+    "mate": None,
+    "mutate": None,
+}
+
+TUNING_PARAMS = {
+    "CANDIDATES": 24,
+    "SEEDS_PER_ROUND": 2,
+    # seeds every surviving candidate has run before the first elimination test; exact
+    # p-values only get below ALPHA / CANDIDATES after about log2(CANDIDATES / ALPHA) seeds
+    "FIRST_TEST": 10,
+    "MAX_SEEDS": 30,
+    # significance level of the eliminations (Holm-corrected Wilcoxon signed-rank tests)
+    "ALPHA": 0.05,
+    # first tuning seed, so tuning and evaluation seeds differ
+    "SEED_OFFSET": 1000,
+}
+
+BENCHMARK_GA_PARAMS = {
+    "POPULATION_SIZE": 50,
+    "MAX_GENERATIONS": 50,
+    "P_CROSSOVER": 0.6,
+    "P_MUTATION": 0.1,
+    "SEEDS": (1, 2, 3),
+    # relative slowdown (or quality loss) over the baseline reported as a regression
+    "REGRESSION_THRESHOLD": 0.10,
 }
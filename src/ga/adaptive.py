@@ -0,0 +1,320 @@
+"""
+Adaptive operator control for the "ga" variation stage.
+
+Each generation, every offspring is credited with its improvement over its best
+parent (in weighted fitness, so larger is better), normalized by the largest
+improvement of the generation. The credit goes to the mate and mutate operators
+that produced the offspring, and drives three adaptations:
+
+- operator choice: a sliding-window bandit (UCB1 or epsilon-greedy) picks one of
+  several registered mate/mutate operators for every application;
+- crossover and mutation rates: pursued towards their upper bound while the
+  offspring they touch earn more credit per evaluation than average, and
+  towards their lower bound otherwise;
+- per-gene mutation probabilities (indpb): the 1/5th success rule, per mutate
+  operator taking an indpb argument.
+"""
+
+import inspect
+import math
+from collections import deque
+from functools import partial
+
+import numpy as np
+from deap import tools
+
+
+def default_operators(chromosome_type, individual_size, int_range=(0, 10), real_range=(0.0, 1.0)):
+    """
+    The mate and mutate portfolios of an encoding
+    :return: two dicts of operator name -> (function, initial indpb or None)
+    """
+    indpb = 1.0 / individual_size
+    if chromosome_type == "binary":
+        mate = {
+            "one_point": (tools.cxOnePoint, None),
+            "two_point": (tools.cxTwoPoint, None),
+            "uniform": (partial(tools.cxUniform, indpb=0.5), None),
+        }
+        mutate = {"flip_bit": (tools.mutFlipBit, indpb)}
+    elif chromosome_type == "integer":
+        low, high = int_range
+        mate = {
+            "one_point": (tools.cxOnePoint, None),
+            "two_point": (tools.cxTwoPoint, None),
+            "uniform": (partial(tools.cxUniform, indpb=0.5), None),
+        }
+        mutate = {"uniform_int": (partial(tools.mutUniformInt, low=low, up=high), indpb)}
+    elif chromosome_type == "permutation":
+        mate = {
+            "ordered": (tools.cxOrdered, None),
+            "pmx": (tools.cxPartialyMatched, None),
+            "uniform_pmx": (partial(tools.cxUniformPartialyMatched, indpb=0.5), None),
+        }
+        mutate = {
+            "shuffle": (tools.mutShuffleIndexes, indpb),
+            "inversion": (tools.mutInversion, None),
+        }
+    elif chromosome_type == "real":
+        low, high = real_range
+        mate = {
+            "two_point": (tools.cxTwoPoint, None),
+            "blend": (partial(tools.cxBlend, alpha=0.5), None),
+            "sbx": (partial(tools.cxSimulatedBinaryBounded, eta=15.0, low=low, up=high), None),
+        }
+        mutate = {
+            "gaussian": (partial(tools.mutGaussian, mu=0.0, sigma=0.1 * (high - low)), indpb),
+            "gaussian_fine": (partial(tools.mutGaussian, mu=0.0, sigma=0.01 * (high - low)), indpb),
+            "polynomial": (partial(tools.mutPolynomialBounded, eta=20.0, low=low, up=high), indpb),
+        }
+    else:
+        raise ValueError("Unsupported chromosome type")
+    return mate, mutate
+
+
+def portfolio_operator(kind, name, chromosome_type, individual_size, int_range=(0, 10), real_range=(0.0, 1.0)):
+    """
+    One operator of the encoding's portfolio, by name, with its initial indpb bound
+    :param kind: "mate" or "mutate"
+    """
+    mate, mutate = default_operators(chromosome_type, individual_size, int_range, real_range)
+    portfolio = mate if kind == "mate" else mutate
+    if name not in portfolio:
+        raise ValueError(f"Unknown {kind} operator {name!r} for {chromosome_type} genomes")
+    func, indpb = portfolio[name]
+    return func if indpb is None else partial(func, indpb=indpb)
+
+
+def operator_entry(func):
+    """(func, its default indpb or None) for an operator given as a bare function"""
+    try:
+        parameter = inspect.signature(func).parameters.get("indpb")
+    except (TypeError, ValueError):
+        parameter = None
+    if parameter is None or parameter.default is inspect.Parameter.empty:
+        return func, None
+    return func, parameter.default
+
+
+class Operator:
+    """A registered operator and its credit statistics"""
+
+    __slots__ = ("name", "func", "indpb", "uses", "evaluations", "successes", "credit",
+                 "generation_uses", "generation_successes")
+
+    def __init__(self, name, func, indpb=None):
+        self.name = name
+        self.func = func
+        self.indpb = indpb
+        self.uses = 0
+        self.evaluations = 0
+        self.successes = 0
+        self.credit = 0.0
+        self.generation_uses = 0
+        self.generation_successes = 0
+
+    def __call__(self, *individuals):
+        if self.indpb is None:
+            return self.func(*individuals)
+        return self.func(*individuals, indpb=self.indpb)
+
+    def stats(self):
+        return {
+            "uses": self.uses,
+            "evaluations": self.evaluations,
+            "successes": self.successes,
+            "credit": self.credit,
+            "credit_per_evaluation": self.credit / self.evaluations if self.evaluations else 0.0,
+            "indpb": self.indpb,
+        }
+
+
+class Bandit:
+    """
+    Sliding-window bandit over a list of operators. Rewards arrive once per
+    generation, so the operators chosen since then count as pending pulls in the UCB
+    bonus, which spreads the choices of one generation over the operators.
+    """
+
+    def __init__(self, operators, policy="ucb", window=200, exploration=0.5, epsilon=0.1):
+        if policy not in ("ucb", "epsilon"):
+            raise ValueError(f"Unsupported bandit policy {policy!r}")
+        self.operators = operators
+        self.policy = policy
+        self.exploration = exploration
+        self.epsilon = epsilon
+        self.history = deque(maxlen=window)  # (operator index, reward)
+        self.counts = np.zeros(len(operators))
+        self.rewards = np.zeros(len(operators))
+        self.pending = np.zeros(len(operators))
+
+    def choose(self, rng):
+        """:return: the index of the operator to apply"""
+        index = self._choose(rng)
+        self.pending[index] += 1
+        return index
+
+    def _choose(self, rng):
+        if len(self.operators) == 1:
+            return 0
+        pulls = self.counts + self.pending
+        untried = np.flatnonzero(pulls == 0)
+        if len(untried):
+            return int(untried[rng.integers(len(untried))])
+        if self.counts.min() == 0:
+            return int(np.argmin(pulls))
+        means = self.rewards / self.counts
+        if self.policy == "epsilon":
+            if rng.random() < self.epsilon:
+                return int(rng.integers(len(self.operators)))
+            return int(np.argmax(means))
+        bonus = self.exploration * np.sqrt(2.0 * math.log(pulls.sum()) / pulls)
+        return int(np.argmax(means + bonus))
+
+    def reward(self, index, reward):
+        if len(self.history) == self.history.maxlen:
+            old_index, old_reward = self.history[0]
+            self.counts[old_index] -= 1
+            self.rewards[old_index] -= old_reward
+        self.history.append((index, reward))
+        self.counts[index] += 1
+        self.rewards[index] += reward
+        self.pending[index] = max(self.pending[index] - 1, 0)
+
+
+class AdaptiveControl:
+    """
+    Chooses the mate/mutate operators of the "ga" stage and adapts the crossover and
+    mutation rates and the operators' indpb from the credit of their offspring.
+    """
+
+    def __init__(
+        self,
+        mate_operators,
+        mutate_operators,
+        crossover_prob,
+        mutation_prob,
+        individual_size,
+        policy="ucb",
+        window=200,
+        exploration=0.5,
+        epsilon=0.1,
+        adapt_rates=True,
+        rate_bounds=(0.05, 0.95),
+        learning_rate=0.1,
+        adapt_indpb=True,
+    ):
+        """
+        :param mate_operators: dict of name -> function or (function, initial indpb)
+        :param mutate_operators: dict of name -> function or (function, initial indpb)
+        :param policy: "ucb" (UCB1) or "epsilon" (epsilon-greedy) over the last window
+        operator applications
+        :param rate_bounds: bounds of the adapted crossover and mutation rates
+        :param learning_rate: step of the rate pursuit
+        """
+        self._portfolio = (dict(mate_operators), dict(mutate_operators))
+        self.initial_rates = (crossover_prob, mutation_prob)
+        self.individual_size = individual_size
+        self.policy = policy
+        self.window = window
+        self.exploration = exploration
+        self.epsilon = epsilon
+        self.adapt_rates = adapt_rates
+        self.rate_bounds = rate_bounds
+        self.learning_rate = learning_rate
+        self.adapt_indpb = adapt_indpb
+        self.reset()
+
+    def _operators(self, portfolio):
+        operators = []
+        for name, entry in portfolio.items():
+            func, indpb = entry if isinstance(entry, tuple) else operator_entry(entry)
+            operators.append(Operator(name, func, indpb))
+        return operators
+
+    def reset(self):
+        """Restores the initial rates and clears the statistics; called at the start of a run"""
+        self.crossover_prob, self.mutation_prob = self.initial_rates
+        self.mate_operators = self._operators(self._portfolio[0])
+        self.mutate_operators = self._operators(self._portfolio[1])
+        bandit = partial(Bandit, policy=self.policy, window=self.window,
+                         exploration=self.exploration, epsilon=self.epsilon)
+        self._mate_bandit = bandit(self.mate_operators)
+        self._mutate_bandit = bandit(self.mutate_operators)
+        self.history = []
+
+    def choose_mate(self, rng):
+        return self.mate_operators[self._mate_bandit.choose(rng)]
+
+    def choose_mutate(self, rng):
+        return self.mutate_operators[self._mutate_bandit.choose(rng)]
+
+    def update(self, parent_fitness, child_fitness, mates, mutations):
+        """
+        Credits the operators with the offspring of one generation and adapts the rates
+        :param parent_fitness: weighted fitness of the best parent of each offspring
+        :param child_fitness: weighted fitness of each offspring
+        :param mates: the mate Operator applied to each offspring, or None
+        :param mutations: the mutate Operator applied to each offspring, or None
+        """
+        improvement = np.maximum(child_fitness - parent_fitness, 0.0)
+        scale = improvement.max()
+        credit = improvement / scale if scale > 0 else improvement
+        success = improvement > 0
+
+        for operators in (self.mate_operators, self.mutate_operators):
+            for operator in operators:
+                operator.generation_uses = operator.generation_successes = 0
+
+        crossed = np.array([mate is not None for mate in mates])
+        mutated = np.array([mutation is not None for mutation in mutations])
+        for i in np.flatnonzero(crossed | mutated).tolist():
+            for operator, bandit in ((mates[i], self._mate_bandit), (mutations[i], self._mutate_bandit)):
+                if operator is None:
+                    continue
+                operator.uses += 1
+                operator.evaluations += 1
+                operator.credit += credit[i]
+                operator.successes += int(success[i])
+                operator.generation_uses += 1
+                operator.generation_successes += int(success[i])
+                bandit.reward(bandit.operators.index(operator), credit[i])
+
+        # --- Rates: pursue the bound matching the operator's productivity ---
+        if self.adapt_rates and (crossed | mutated).any():
+            average = credit[crossed | mutated].mean()
+            low, high = self.rate_bounds
+            if crossed.any():
+                target = high if credit[crossed].mean() >= average else low
+                self.crossover_prob += self.learning_rate * (target - self.crossover_prob)
+            if mutated.any():
+                target = high if credit[mutated].mean() >= average else low
+                self.mutation_prob += self.learning_rate * (target - self.mutation_prob)
+
+        # --- indpb: 1/5th success rule ---
+        if self.adapt_indpb:
+            for operator in self.mutate_operators:
+                if operator.indpb is None or not operator.generation_uses:
+                    continue
+                ratio = operator.generation_successes / operator.generation_uses
+                factor = 1.22 if ratio > 0.2 else 0.82
+                low = 0.1 / self.individual_size
+                operator.indpb = float(min(max(operator.indpb * factor, low), 0.5))
+
+        self.history.append(
+            {
+                "crossover_prob": self.crossover_prob,
+                "mutation_prob": self.mutation_prob,
+                "mate_uses": {op.name: op.generation_uses for op in self.mate_operators},
+                "mutate_uses": {op.name: op.generation_uses for op in self.mutate_operators},
+                "indpb": {op.name: op.indpb for op in self.mutate_operators if op.indpb is not None},
+            }
+        )
+
+    def report(self):
+        """:return: per-operator credit statistics and the per-generation rates"""
+        return {
+            "mate_operators": {op.name: op.stats() for op in self.mate_operators},
+            "mutate_operators": {op.name: op.stats() for op in self.mutate_operators},
+            "generations": self.history,
+        }
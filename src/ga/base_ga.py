@@ -1,8 +1,34 @@
-from deap import base, creator, tools, algorithms
+from deap import base, tools, algorithms
 import random
-import array
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 import numpy as np
 
+from src.ga import hybrid
+from src.ga.selection import SELECTION_SCHEMES
+from src.ga.elitism import HallOfFame, top_k, weighted_fitness
+from src.ga.adaptive import AdaptiveControl, default_operators, operator_entry, portfolio_operator
+from src.ga import nsga2
+from src.ga.surrogate import SurrogateScreen
+from src.ga import steady_state as steady
+from src.ga import cellular as cga
+from src.ga.diversity import DiversityControl, genome_array, genome_keys, population_entropy
+from src.ga.individuals import individual_class
+from src.ga.profiling import NULL_PROFILER, PhaseProfiler
+
+# variation stages usable in BaseGA(variation=...); all but "ga" need a real encoding
+VARIATION_STAGES = ("ga", "de", "de_best", "pso")
+# smallest population of the DE stages: each member and its distinct partners
+DE_MIN_POPULATION = {"de": 4, "de_best": 3}
+# arguments an engine mode rejects or does not use; from_problem() leaves them out of
+# the problem's extra_params and of the defaults (e.g. tuned settings) when the mode
+# is requested
+MODE_EXCLUDED_PARAMS = {
+    "multi_objective": ("elitism",),
+    "steady_state": ("elitism", "local_search", "batch_fitness_func"),
+    "cellular": ("elitism",),
+}
+
 
 class BaseGA:
     def __init__(
@@ -18,10 +44,119 @@ class BaseGA:
         mutation_prob=0.2,
         maximize=True,
         seed=None,
+        mutate_func=None,
+        mate_func=None,
+        mutate_evaluates=False,
+        local_search=None,
+        batch_fitness_func=None,
+        init_func=None,
+        map_func=None,
+        variation="ga",
+        de_f=0.5,
+        de_cr=0.9,
+        pso_w=0.72,
+        pso_c1=1.49,
+        pso_c2=1.49,
+        target=None,
+        verbose=True,
+        profile=False,
+        selection="tournament",
+        selection_params=None,
+        elitism=0,
+        hall_of_fame=1,
+        adaptive=False,
+        objectives=None,
+        surrogate=False,
+        steady_state=False,
+        diversity=False,
+        cellular=False,
     ):
         """
         Generic Genetic Algorithm using DEAP.
         Supports binary, integer, permutation, and real encodings.
+
+        mutate_func and mate_func replace the encoding's default mutation and crossover
+        operators. If mutate_evaluates is set, it is trusted to leave a valid fitness on
+        the mutant (e.g. an incremental evaluator), so the mutant is not re-evaluated; it
+        returns (mutant, full), full telling whether it evaluated the mutant in full (a
+        crossed child with no valid fitness, or an incremental state built from the
+        genome), which counts as one evaluation.
+        local_search(individual), if given, improves the best offspring of each generation
+        in place and updates its fitness; each call counts as one evaluation (of its
+        starting point; its moves are incremental).
+        batch_fitness_func(individuals), if given, evaluates a whole list of individuals in
+        one call and returns one fitness value per individual; it replaces fitness_func.
+        init_func(seed), if given, builds the genome of one initial individual (e.g. a
+        constructive heuristic) instead of drawing random genes; the seeds are drawn from
+        random, so seeded runs stay reproducible.
+        map_func replaces the builtin map for generating the initial population and for
+        evaluation, e.g. multiprocessing.Pool(...).map to run them in parallel.
+
+        variation selects the variation stage of each generation: "ga" (selection,
+        crossover, mutation), "de" (DE/rand/1/bin), "de_best" (DE/current-to-best/1/bin) or
+        "pso" (particle swarm), or a sequence of them applied cyclically, generation by
+        generation; "mixed" is short for ("ga", "de", "pso"). The DE and PSO stages need
+        chromosome_type="real"; de_f/de_cr and pso_w/pso_c1/pso_c2 are their coefficients.
+        target, if given, is the fitness at which the number of evaluations spent and the
+        elapsed time are reported as "evaluations_to_target" and "time_to_target".
+        verbose=False turns off the per-generation printout.
+        profile=True records the time spent in each phase of run() and its counters
+        (evaluations, cache hits, i.e. offspring left unchanged clones of their parent,
+        invalidated individuals) and returns them as results["profile"];
+        profile="memory" adds tracemalloc statistics, and a PhaseProfiler instance may
+        be passed to keep it for exporting a trace.
+        selection names the parent selection scheme of the "ga" stage: "tournament",
+        "sus", "rank" or "truncation" (see src/ga/selection.py); selection_params are
+        its keyword arguments (default: a tournament of size 3).
+        elitism is the number of best individuals carried over, unevaluated, into the
+        next population of each "ga" stage (the DE and PSO stages are elitist already).
+        hall_of_fame is the number of distinct best genomes kept over the whole run;
+        the best one is returned as results["best_individual"].
+        adaptive=True lets src/ga/adaptive.py choose among the encoding's mate/mutate
+        operators (mutate_func replaces the mutate portfolio) with a bandit, and adapt the
+        crossover/mutation rates and indpb from the improvement of the offspring; a dict
+        passes AdaptiveControl arguments (e.g. other portfolios, policy="epsilon"), and an
+        AdaptiveControl may be given directly. Per-operator credit statistics are returned
+        as results["adaptive"].
+        objectives, a tuple of weights (e.g. (-1.0, -1.0)), switches to multi-objective
+        NSGA-II: fitness_func (or batch_fitness_func) then returns one value per weight,
+        and results["pareto_front"] holds the non-dominated solutions of the final
+        population. It uses the "ga" stage only, without elitism (NSGA-II is elitist),
+        adaptive control, local search or target.
+        surrogate=True pre-screens the offspring of the "ga" and DE stages with a model
+        trained online on the evaluated individuals (src/ga/surrogate.py): only the most
+        promising share of them is evaluated, the others are replaced by their parents.
+        A dict passes SurrogateScreen arguments (e.g. model="ridge", fraction=0.3), and a
+        SurrogateScreen may be given directly. The savings are returned as
+        results["surrogate"].
+        steady_state=True replaces the generations by asynchronous steady-state
+        evolution (src/ga/steady_state.py): fitness_func runs on a pool of workers that
+        always have evaluations outstanding, and every result is inserted into the
+        population as it arrives. A dict sets "workers", "executor" ("process" or
+        "thread"), "replacement" ("worst", "inverse_tournament" or "oldest") and
+        "replacement_params". ngen * population_size offspring are bred, one snapshot
+        per population_size of them; throughput and worker utilization are returned as
+        results["steady_state"]. It uses the "ga" stage only, without elitism, adaptive
+        control, surrogate screening, local search or batch_fitness_func.
+        diversity=True replaces the repeated genomes of each "ga" stage's new population
+        by mutants of them (src/ga/diversity.py); a dict passes DiversityControl arguments:
+        niching="sharing" or "clearing" on the selection fitness, with a neighbour index
+        that hashes genomes instead of comparing all pairs, and restarts keeping the
+        best individuals when the population entropy falls below restart_entropy or the
+        best fitness stalls for restart_stall generations. Its statistics are returned
+        as results["diversity"]. Every snapshot holds the population "entropy" (mean
+        normalized entropy of the loci), returned as results["entropy_values"].
+        cellular=True places the population on a 2-D toroidal grid (src/ga/cellular.py):
+        each generation, every cell breeds one offspring with a neighbour picked by a
+        tournament, and the offspring replaces it if it is at least as good, all cells at
+        once. The encoding's default operators run vectorized over the whole grid, other
+        mate/mutate operators per cell. A dict sets "grid" ((rows, columns)),
+        "neighbourhood" ("von_neumann", "moore" or "linear9"), "tournament_size" and
+        "replacement" ("if_not_worse" or "always"); the replacement rate is returned as
+        results["cellular"]. local_search improves the best offspring of each generation
+        before the replacement. It uses neither selection, elitism, other variation
+        stages, adaptive control, surrogate screening, objectives, steady state nor
+        diversity control.
         """
         if seed is not None:
             random.seed(seed)
@@ -36,27 +171,189 @@ class BaseGA:
         self.crossover_prob = crossover_prob
         self.mutation_prob = mutation_prob
         self.maximize = maximize
+        if selection not in SELECTION_SCHEMES:
+            raise ValueError(f"Unsupported selection scheme {selection!r}")
+        self.selection = SELECTION_SCHEMES[selection]
+        if selection_params is None:
+            selection_params = {"size": 3} if selection == "tournament" else {}
+        self.selection_params = selection_params
+        if not 0 <= elitism < population_size:
+            raise ValueError("elitism must be between 0 and population_size - 1")
+        self.elitism = elitism
+        self.hall_of_fame_size = max(1, hall_of_fame)
+        self.mutate_evaluates = mutate_evaluates
+        self.local_search = local_search
+        self.batch_fitness_func = batch_fitness_func
+        self.init_func = init_func
+        self.de_f = de_f
+        self.de_cr = de_cr
+        self.pso_w = pso_w
+        self.pso_c1 = pso_c1
+        self.pso_c2 = pso_c2
+        self.target = target
+        self.verbose = verbose
+        if isinstance(profile, PhaseProfiler):
+            self.profiler = profile
+        elif profile:
+            self.profiler = PhaseProfiler(memory=profile == "memory")
+        else:
+            self.profiler = NULL_PROFILER
 
-        # DEAP setup
-        weight = 1.0 if maximize else -1.0
-        creator.create("FitnessType", base.Fitness, weights=(weight,))
+        if variation == "mixed":
+            variation = ("ga", "de", "pso")
+        self.variation = (variation,) if isinstance(variation, str) else tuple(variation)
+        for stage in self.variation:
+            if stage not in VARIATION_STAGES:
+                raise ValueError(f"Unsupported variation stage {stage!r}")
+            if stage != "ga" and chromosome_type != "real":
+                raise ValueError(f"The {stage!r} stage needs chromosome_type='real'")
+            if population_size < DE_MIN_POPULATION.get(stage, 0):
+                raise ValueError(
+                    f"The {stage!r} stage needs population_size >= {DE_MIN_POPULATION[stage]}"
+                )
+
+        self.objectives = tuple(objectives) if objectives is not None else None
+        if self.objectives is not None and (
+            self.variation != ("ga",) or elitism or adaptive or surrogate or local_search
+            or target is not None or diversity
+        ):
+            raise ValueError(
+                "Multi-objective runs support neither other variation stages nor elitism, "
+                "adaptive control, surrogate screening, local search, target or diversity control"
+            )
+
+        # DEAP setup (types are per instance, not on the global deap.creator)
+        weights = self.objectives or (1.0 if maximize else -1.0,)
         if chromosome_type in ["binary", "integer", "real"]:
-            creator.create("Individual", list, fitness=creator.FitnessType)
+            self.Individual = individual_class(weights, "list")
         elif chromosome_type == "permutation":
-            creator.create(
-                "Individual", array.array, typecode="i", fitness=creator.FitnessType
-            )
+            self.Individual = individual_class(weights, "array")
         else:
             raise ValueError("Unsupported chromosome type")
+        self.FitnessType = self.Individual.fitness_class
 
         self.toolbox = base.Toolbox()
+        self.toolbox.register("map", map_func or map)
         self._setup_encoding()
+        if mutate_func is not None:
+            self.toolbox.register("mutate", mutate_func)
+        if mate_func is not None:
+            self.toolbox.register("mate", mate_func)
+
+        if isinstance(adaptive, AdaptiveControl):
+            self.adaptive = adaptive
+        elif adaptive:
+            options = dict(adaptive) if isinstance(adaptive, dict) else {}
+            mate, mutate = default_operators(chromosome_type, individual_size, int_range, real_range)
+            if mutate_func is not None:
+                mutate = {"mutate_func": operator_entry(mutate_func)}
+            if mate_func is not None:
+                mate = {"mate_func": operator_entry(mate_func)}
+            self.adaptive = AdaptiveControl(
+                mate_operators=options.pop("mate_operators", mate),
+                mutate_operators=options.pop("mutate_operators", mutate),
+                crossover_prob=crossover_prob,
+                mutation_prob=mutation_prob,
+                individual_size=individual_size,
+                **options,
+            )
+        else:
+            self.adaptive = None
+        self.steady_state = steady.steady_state_options(steady_state) if steady_state else None
+        if self.steady_state is not None and (
+            self.variation != ("ga",) or elitism or adaptive or surrogate or local_search
+            or self.objectives is not None or diversity
+        ):
+            raise ValueError(
+                "Steady-state runs support neither other variation stages nor elitism, "
+                "adaptive control, surrogate screening, local search, objectives or diversity control"
+            )
+        if isinstance(surrogate, SurrogateScreen):
+            self.surrogate = surrogate
+        elif surrogate:
+            self.surrogate = SurrogateScreen(**(dict(surrogate) if isinstance(surrogate, dict) else {}))
+        else:
+            self.surrogate = None
+        self.cellular = (
+            cga.cellular_options(cellular, population_size) if cellular else None
+        )
+        if self.cellular is not None and (
+            self.variation != ("ga",) or elitism or adaptive or surrogate
+            or self.objectives is not None or steady_state or diversity
+        ):
+            raise ValueError(
+                "Cellular runs support neither other variation stages nor elitism, adaptive "
+                "control, surrogate screening, objectives, steady state or diversity control"
+            )
+        if isinstance(diversity, DiversityControl):
+            self.diversity = diversity
+        elif diversity:
+            self.diversity = DiversityControl(
+                chromosome_type,
+                individual_size,
+                int_range,
+                real_range,
+                **(dict(diversity) if isinstance(diversity, dict) else {}),
+            )
+        else:
+            self.diversity = None
         self.toolbox.register(
             "population", tools.initRepeat, list, self.toolbox.individualCreator
         )
 
         self.toolbox.register("evaluate", self.fitness_func)
-        self.toolbox.register("select", tools.selTournament, tournsize=3)
+
+    @classmethod
+    def from_problem(cls, cfg, multi_objective=False, defaults=None, **kwargs):
+        """
+        Builds a GA for a problem configuration (a get_problem() result): its fitness,
+        encoding and direction, plus its extra_params, overridden by defaults (e.g. the
+        problem's tuned GA_OPTIONS), overridden by kwargs.
+        multi_objective=True uses the problem's multi_objective_params instead of its
+        extra_params (e.g. hard and soft violations as separate objectives).
+        mate and mutate keyword arguments name operators of the encoding's portfolio
+        (src/ga/adaptive.py), e.g. mate="ordered"; a named mutation replaces the
+        problem's own one.
+        An engine mode (multi_objective, or e.g. steady_state=True in kwargs) drops the
+        extra_params and defaults it cannot use (MODE_EXCLUDED_PARAMS), such as a
+        problem's local search or a tuned elitism; kwargs are kept as given.
+        """
+        params = {
+            "fitness_func": cfg["fitness_func"],
+            "individual_size": cfg["individual_size"],
+            "chromosome_type": cfg["chromosome_type"],
+            "maximize": cfg["maximize"],
+        }
+        if multi_objective:
+            if "multi_objective_params" not in cfg:
+                raise ValueError("The problem has no multi-objective formulation")
+            problem_params = cfg["multi_objective_params"]()
+        else:
+            problem_params = cfg.get("extra_params", lambda: {})()
+        modes = dict(kwargs, multi_objective=multi_objective)
+        excluded = {
+            name
+            for mode, names in MODE_EXCLUDED_PARAMS.items()
+            if modes.get(mode)
+            for name in names
+        }
+        for source in (problem_params, defaults or {}):
+            params.update((k, v) for k, v in source.items() if k not in excluded)
+        params.update(kwargs)
+        for kind in ("mate", "mutate"):
+            name = params.pop(kind, None)
+            if name is not None:
+                params[f"{kind}_func"] = portfolio_operator(
+                    kind,
+                    name,
+                    params["chromosome_type"],
+                    params["individual_size"],
+                    params.get("int_range", (0, 10)),
+                    params.get("real_range", (0.0, 1.0)),
+                )
+                if kind == "mutate":
+                    params["mutate_evaluates"] = False
+        return cls(**params)
 
     def _setup_encoding(self):
         if self.chromosome_type == "binary":
@@ -64,7 +361,7 @@ class BaseGA:
             self.toolbox.register(
                 "individualCreator",
                 tools.initRepeat,
-                creator.Individual,
+                self.Individual,
                 self.toolbox.attr_gene,
                 n=self.individual_size,
             )
@@ -77,12 +374,14 @@ class BaseGA:
             self.toolbox.register(
                 "individualCreator",
                 tools.initRepeat,
-                creator.Individual,
+                self.Individual,
                 self.toolbox.attr_gene,
                 n=self.individual_size,
             )
             self.toolbox.register("mate", tools.cxOnePoint)
-            self.toolbox.register("mutate", tools.mutFlipBit, indpb=0.005)
+            self.toolbox.register(
+                "mutate", tools.mutUniformInt, low=low, up=high, indpb=1.0 / self.individual_size
+            )
 
         elif self.chromosome_type == "permutation":
             self.toolbox.register(
@@ -94,11 +393,11 @@ class BaseGA:
             self.toolbox.register(
                 "individualCreator",
                 tools.initIterate,
-                creator.Individual,
+                self.Individual,
                 self.toolbox.randomOrder,
             )
-            self.toolbox.register("mate", tools.cxOnePoint)
-            self.toolbox.register("mutate", tools.mutFlipBit, indpb=0.005)
+            self.toolbox.register("mate", tools.cxOrdered)
+            self.toolbox.register("mutate", tools.mutShuffleIndexes, indpb=1.0 / self.individual_size)
 
         elif self.chromosome_type == "real":
             low, high = self.real_range
@@ -106,83 +405,911 @@ class BaseGA:
             self.toolbox.register(
                 "individualCreator",
                 tools.initRepeat,
-                creator.Individual,
+                self.Individual,
                 self.toolbox.attr_gene,
                 n=self.individual_size,
             )
             self.toolbox.register("mate", tools.cxOnePoint)
-            self.toolbox.register("mutate", tools.mutFlipBit, indpb=0.005)
+            self.toolbox.register(
+                "mutate",
+                tools.mutGaussian,
+                mu=0.0,
+                sigma=0.1 * (high - low),
+                indpb=1.0 / self.individual_size,
+            )
+
+    def _evaluate(self, individuals):
+        """Evaluates the given individuals and assigns their fitness values"""
+        if not individuals:
+            return
+        with self.profiler.phase("evaluation"):
+            if self.batch_fitness_func is not None:
+                values = np.asarray(self.batch_fitness_func(individuals), dtype=float)
+                fitness_values = values.reshape(len(individuals), -1).tolist()
+            else:
+                fitness_values = list(self.toolbox.map(self.toolbox.evaluate, individuals))
+            for ind, fit in zip(individuals, fitness_values):
+                ind.fitness.values = fit
+        if self.surrogate is not None:
+            self.surrogate.observe(individuals)
+        self.evaluations += len(individuals)
+        self.profiler.count("evaluations", len(individuals))
+
+    def _mutate(self, mutant, operator=None):
+        """
+        Mutates in place with operator (default: the toolbox's); invalidates the fitness
+        unless mutate_evaluates, which counts the mutants the operator evaluated in full
+        """
+        result = (operator or self.toolbox.mutate)(mutant)
+        if not self.mutate_evaluates:
+            del mutant.fitness.values
+        elif result[1]:
+            self.evaluations += 1
+            self.profiler.count("evaluations")
+
+    def _local_search(self, individual):
+        """Applies local_search to an individual, counted as one evaluation"""
+        with self.profiler.phase("local_search"):
+            self.local_search(individual)
+        self.evaluations += 1
+        self.profiler.count("evaluations")
+
+    def _evaluate_screened(self, candidates):
+        """
+        Evaluates the candidates the surrogate lets through (all of them without one)
+        :return: the positions of the rejected, still unevaluated candidates
+        """
+        if self.surrogate is None:
+            self._evaluate(candidates)
+            return []
+        with self.profiler.phase("surrogate"):
+            chosen = self.surrogate.screen(self.rng, candidates).tolist()
+        evaluated = [candidates[i] for i in chosen]
+        self._evaluate(evaluated)
+        self.surrogate.record(evaluated)
+
+        rejected = np.ones(len(candidates), dtype=bool)
+        rejected[chosen] = False
+        self.profiler.count("surrogate_rejections", len(candidates) - len(chosen))
+        return np.flatnonzero(rejected).tolist()
+
+    def _init_population(self):
+        """Creates the initial population, from init_func when one is given"""
+        if self.init_func is None:
+            return self.toolbox.population(n=self.population_size)
+
+        seeds = [random.randrange(2**32) for _ in range(self.population_size)]
+        genomes = self.toolbox.map(self.init_func, seeds)
+        return [self.Individual(genome) for genome in genomes]
+
+    def _gather(self, population, indices):
+        """Copies of the individuals at the given indices, keeping their fitness"""
+        offspring = []
+        for i in indices.tolist():
+            parent = population[i]
+            child = self.Individual(parent)
+            child.fitness.wvalues = parent.fitness.wvalues
+            offspring.append(child)
+        return offspring
+
+    def _entropy(self, population):
+        """Normalized population entropy (see src/ga/diversity.py)"""
+        return population_entropy(
+            genome_array(population), self.chromosome_type, self.int_range, self.real_range
+        )
+
+    def _ga_variation(self, population, chosen=None):
+        """
+        Selection (unless the chosen parent indices are given), crossover and mutation;
+        returns the evaluated offspring, followed by the elite of the population
+        """
+        profiler = self.profiler
+
+        # Selection
+        with profiler.phase("select"):
+            fitness = weighted_fitness(population)
+            if chosen is None:
+                selection_fitness = fitness
+                if self.diversity is not None and self.diversity.niching is not None:
+                    with profiler.phase("niching"):
+                        selection_fitness = self.diversity.niche_fitness(
+                            self.rng, genome_array(population), fitness
+                        )
+                chosen = self.selection(
+                    self.rng, selection_fitness, len(population) - self.elitism, **self.selection_params
+                )
+        with profiler.phase("clone"):
+            offspring = self._gather(population, chosen)
+
+        # Adaptive control: operators and rates, and what produced each offspring
+        control = self.adaptive
+        if control is None:
+            crossover_prob, mutation_prob = self.crossover_prob, self.mutation_prob
+        else:
+            crossover_prob, mutation_prob = control.crossover_prob, control.mutation_prob
+            parent_fitness = fitness[chosen]
+            mates = [None] * len(offspring)
+            mutations = [None] * len(offspring)
+        # offspring changed by crossover or mutation; the others are clones of their parent
+        varied = np.zeros(len(offspring), dtype=bool)
+
+        # Crossover
+        with profiler.phase("crossover"):
+            for i in range(1, len(offspring), 2):
+                if random.random() < crossover_prob:
+                    child1, child2 = offspring[i - 1], offspring[i]
+                    if control is None:
+                        self.toolbox.mate(child1, child2)
+                    else:
+                        mates[i - 1] = mates[i] = control.choose_mate(self.rng)
+                        mates[i](child1, child2)
+                        parent_fitness[i - 1] = parent_fitness[i] = max(
+                            parent_fitness[i - 1], parent_fitness[i]
+                        )
+                    del child1.fitness.values
+                    del child2.fitness.values
+                    varied[i - 1] = varied[i] = True
+
+        # Mutation
+        with profiler.phase("mutation"):
+            for i, mutant in enumerate(offspring):
+                if random.random() < mutation_prob:
+                    if control is None:
+                        self._mutate(mutant)
+                    else:
+                        mutations[i] = control.choose_mutate(self.rng)
+                        self._mutate(mutant, mutations[i])
+                    varied[i] = True
+
+        # Evaluate new individuals; the ones the surrogate rejects give way to their parent
+        invalid = [i for i, ind in enumerate(offspring) if not ind.fitness.valid]
+        if profiler.enabled:
+            profiler.count("invalidated", len(invalid))
+            profiler.count("cache_hits", len(offspring) - int(varied.sum()))
+        rejected = self._evaluate_screened([offspring[i] for i in invalid])
+        if rejected:
+            positions = [invalid[j] for j in rejected]
+            for i, parent in zip(positions, self._gather(population, chosen[positions])):
+                offspring[i] = parent
+
+        if control is not None:
+            with profiler.phase("adaptive"):
+                control.update(parent_fitness, weighted_fitness(offspring), mates, mutations)
+
+        # Elitism
+        if self.elitism:
+            offspring.extend(population[i] for i in top_k(fitness, self.elitism).tolist())
+        return offspring
+
+    def _deduplicate(self, offspring, tries=10):
+        """
+        Replaces the repeats of other genomes of the new population by mutants of them
+        (a new random individual when tries mutations still give a repeat) and evaluates them
+        """
+        with self.profiler.phase("diversity"):
+            keys = genome_keys(genome_array(offspring))
+            seen, repeats = set(), []
+            # the elite comes last: checking from the end keeps it
+            for i in range(len(keys) - 1, -1, -1):
+                if keys[i] in seen:
+                    repeats.append(i)
+                else:
+                    seen.add(keys[i])
+
+            for i in repeats:
+                child = self._gather(offspring, np.array([i]))[0]
+                for _ in range(tries):
+                    self._mutate(child)
+                    key = genome_keys(genome_array([child]))[0]
+                    if key not in seen:
+                        break
+                else:
+                    if self.init_func is None:
+                        child = self.toolbox.individualCreator()
+                    else:
+                        child = self.Individual(self.init_func(random.randrange(2**32)))
+                    key = genome_keys(genome_array([child]))[0]
+                seen.add(key)
+                offspring[i] = child
+        self.diversity.duplicates_replaced += len(repeats)
+        self._evaluate([offspring[i] for i in repeats if not offspring[i].fitness.valid])
+        return offspring
+
+    def _restart(self, population, fitness):
+        """A new random population, but for the restart_keep best individuals"""
+        keep = [population[i] for i in top_k(fitness, self.diversity.restart_keep).tolist()]
+        with self.profiler.phase("init"):
+            fresh = self._init_population()[:len(population) - len(keep)]
+        self._evaluate(fresh)
+        self._swarm = None
+        return keep + fresh
+
+    def _de_variation(self, population, stage):
+        """Differential evolution with one-to-one survivor selection"""
+        with self.profiler.phase("variation"):
+            positions = np.asarray(population, dtype=float)
+            if stage == "de":
+                trials = hybrid.de_rand_1_bin(self.rng, positions, self.de_f, self.de_cr)
+            else:
+                best = max(range(len(population)), key=lambda i: population[i].fitness)
+                trials = hybrid.de_current_to_best_1_bin(
+                    self.rng, positions, positions[best], self.de_f, self.de_cr
+                )
+            np.clip(trials, *self.real_range, out=trials)
+            trial_ind = [self.Individual(row) for row in trials.tolist()]
+
+        rejected = set(self._evaluate_screened(trial_ind))
+        with self.profiler.phase("select"):
+            return [
+                trial if i not in rejected and trial.fitness >= parent.fitness else parent
+                for i, (trial, parent) in enumerate(zip(trial_ind, population))
+            ]
+
+    def _pso_variation(self, population):
+        """
+        One particle-swarm step. The swarm keeps its own positions and velocities; the
+        population holds the personal bests, so individuals produced by other stages
+        (in mixed mode) update the personal bests they improve on.
+        """
+        with self.profiler.phase("variation"):
+            particles = self._pso_move(population)
+
+        self._evaluate(particles)
+        personal_best = self._swarm[2]
+        for i, particle in enumerate(particles):
+            if particle.fitness > personal_best[i].fitness:
+                personal_best[i] = particle
+        return list(personal_best)
+
+    def _pso_move(self, population):
+        """Updates the swarm's velocities and positions; returns the new particles"""
+        low, high = self.real_range
+        max_velocity = high - low
+
+        if self._swarm is None:
+            positions = np.asarray(population, dtype=float)
+            velocities = self.rng.uniform(-0.1, 0.1, positions.shape) * max_velocity
+            self._swarm = (positions, velocities, list(population))
+        positions, velocities, personal_best = self._swarm
+
+        for i, ind in enumerate(population):
+            if ind.fitness > personal_best[i].fitness:
+                personal_best[i] = ind
+        best_positions = np.asarray(personal_best, dtype=float)
+        global_best = best_positions[
+            max(range(len(personal_best)), key=lambda i: personal_best[i].fitness)
+        ]
+
+        velocities[:] = hybrid.pso_velocity(
+            self.rng,
+            positions,
+            velocities,
+            best_positions,
+            global_best,
+            self.pso_w,
+            self.pso_c1,
+            self.pso_c2,
+        )
+        np.clip(velocities, -max_velocity, max_velocity, out=velocities)
+        positions += velocities
+        np.clip(positions, low, high, out=positions)
+
+        return [self.Individual(row) for row in positions.tolist()]
+
+    def run_iter(self):
+        """
+        Runs the GA as a generator yielding a snapshot dict after every generation:
+        "generation", "stage", "best_fitness", "mean_fitness", "entropy", "best" (a reference to
+        the best individual, not a copy), "evaluations", "elapsed" and "generation_time"
+        (seconds), and "evaluations_to_target"/"time_to_target" (None until the target
+        is reached). Nothing is accumulated; closing the generator stops the run.
+        """
+        if self.objectives is not None:
+            yield from self._nsga2_iter()
+            return
+        if self.steady_state is not None:
+            yield from self._steady_state_iter()
+            return
+        if self.cellular is not None:
+            yield from self._cellular_iter()
+            return
 
-    def run(self):
         # --- Create initial population ---
-        population = self.toolbox.population(n=self.population_size)
+        start_time = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
+        self.evaluations = 0
+        self.rng = np.random.default_rng(random.randrange(2**32))
+        self._swarm = None
+        if self.adaptive is not None:
+            self.adaptive.reset()
+        if self.surrogate is not None:
+            self.surrogate.reset()
+        if self.diversity is not None:
+            self.diversity.reset()
+        with profiler.phase("init"):
+            population = self._init_population()
         generation_counter = 0
 
         # --- Evaluate initial population ---
-        fitness_values = list(map(self.toolbox.evaluate, population))
-        for ind, fit in zip(population, fitness_values):
-            ind.fitness.values = fit
+        self._evaluate(population)
+        self.hall_of_fame = HallOfFame(self.hall_of_fame_size)
+        self.hall_of_fame.update(population)
 
         # --- Decide objective direction dynamically ---
         if self.maximize:
-            best_func = np.max
             compare_func = max
             best_label = "Max"
         else:
-            best_func = np.min
             compare_func = min
             best_label = "Min"
 
-        best_fitness_values = []
-        mean_fitness_values = []
+        evaluations_to_target = None
+        time_to_target = None
 
         # --- Evolutionary loop ---
-        while generation_counter < self.ngen:
-            generation_counter += 1
+        try:
+            while generation_counter < self.ngen:
+                generation_counter += 1
+                generation_start = time.perf_counter()
+                profiler.next_generation(generation_counter)
 
-            # Selection
-            offspring = self.toolbox.select(population, len(population))
-            offspring = list(map(self.toolbox.clone, offspring))
+                # Variation stage of this generation
+                stage = self.variation[(generation_counter - 1) % len(self.variation)]
+                if stage == "ga":
+                    offspring = self._ga_variation(population)
+                    if self.diversity is not None and self.diversity.deduplicate:
+                        offspring = self._deduplicate(offspring)
+                elif stage == "pso":
+                    offspring = self._pso_variation(population)
+                else:
+                    offspring = self._de_variation(population, stage)
 
-            # Crossover
-            for child1, child2 in zip(offspring[::2], offspring[1::2]):
-                if random.random() < self.crossover_prob:
-                    self.toolbox.mate(child1, child2)
-                    del child1.fitness.values
-                    del child2.fitness.values
+                # Local search on the best offspring
+                if self.local_search is not None:
+                    self._local_search(
+                        compare_func(offspring, key=lambda ind: ind.fitness.values[0])
+                    )
+
+                # Replace old population
+                population[:] = offspring
+
+                # --- Gather statistics ---
+                with profiler.phase("stats"):
+                    fitness = weighted_fitness(population)
+                    best_index = int(np.argmax(fitness))
+                    best_fitness = population[best_index].fitness.values[0]
+                    mean_fitness = float(np.mean(fitness)) * self.FitnessType.weights[0]
+                    entropy = self._entropy(population)
+
+                with profiler.phase("hall_of_fame"):
+                    self.hall_of_fame.update(population, fitness)
 
-            # Mutation
+                now = time.perf_counter()
+                if (
+                    self.target is not None
+                    and evaluations_to_target is None
+                    and best_fitness == compare_func(best_fitness, self.target)
+                ):
+                    evaluations_to_target = self.evaluations
+                    time_to_target = now - start_time
+
+                if self.verbose:
+                    with profiler.phase("print"):
+                        print(
+                            f"- Generation {generation_counter}: {best_label} Fitness = {best_fitness}, Avg Fitness = {mean_fitness}")
+
+                        # --- Print best individual ---
+                        print("Best Individual = ", *population[best_index], "\n")
+
+                yield {
+                    "generation": generation_counter,
+                    "stage": stage,
+                    "best_fitness": best_fitness,
+                    "mean_fitness": mean_fitness,
+                    "entropy": entropy,
+                    "best": population[best_index],
+                    "evaluations": self.evaluations,
+                    "elapsed": now - start_time,
+                    "generation_time": now - generation_start,
+                    "evaluations_to_target": evaluations_to_target,
+                    "time_to_target": time_to_target,
+                }
+
+                # Restart on convergence, from the next generation on
+                if (
+                    self.diversity is not None
+                    and generation_counter < self.ngen
+                    and self.diversity.should_restart(generation_counter, entropy, fitness[best_index])
+                ):
+                    population[:] = self._restart(population, fitness)
+        finally:
+            if profiler.enabled:
+                profiler.stop()
+
+    def _breed(self, population, fitness):
+        """Two offspring of two selected members, each crossed and mutated with their probabilities"""
+        with self.profiler.phase("select"):
+            chosen = self.selection(self.rng, fitness, 2, **self.selection_params)
+            offspring = self._gather(population, chosen)
+        if random.random() < self.crossover_prob:
+            with self.profiler.phase("crossover"):
+                self.toolbox.mate(*offspring)
+                for child in offspring:
+                    del child.fitness.values
+        with self.profiler.phase("mutation"):
             for mutant in offspring:
                 if random.random() < self.mutation_prob:
-                    self.toolbox.mutate(mutant)
-                    del mutant.fitness.values
+                    self._mutate(mutant)
+        return offspring
 
-            # Evaluate new individuals
-            invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-            fitness_values = list(map(self.toolbox.evaluate, invalid_ind))
-            for ind, fit in zip(invalid_ind, fitness_values):
-                ind.fitness.values = fit
+    def _steady_state_iter(self):
+        """
+        run_iter() of steady-state runs: the workers always have evaluations outstanding,
+        and each returning individual goes into the population by the replacement policy
+        before a new offspring is submitted. A "generation" is population_size offspring;
+        snapshots also hold "evaluations_per_second" and "utilization" (the share of the
+        workers' time spent in the fitness function) so far.
+        """
+        options = self.steady_state
+        workers = options["workers"]
+        replace = steady.REPLACEMENT_POLICIES[options["replacement"]]
+        replacement_params = options["replacement_params"]
+        start_time = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
+        self.evaluations = 0
+        self.rng = np.random.default_rng(random.randrange(2**32))
+        executor, submit = steady.make_executor(options["executor"], workers, self.fitness_func)
+        pending = {}  # future -> individual being evaluated
+        busy_time = 0.0
+
+        def evaluated(future):
+            nonlocal busy_time
+            individual = pending.pop(future)
+            values, duration = future.result()
+            individual.fitness.values = values
+            busy_time += duration
+            self.evaluations += 1
+            profiler.count("evaluations")
+            return individual
+
+        def throughput(elapsed):
+            # results["steady_state"] after elapsed seconds
+            return {
+                "workers": workers,
+                "evaluations_per_second": self.evaluations / elapsed,
+                "utilization": busy_time / (workers * elapsed),
+                "mean_evaluation_time": busy_time / self.evaluations,
+            }
+
+        try:
+            # --- Initial population, evaluated asynchronously too ---
+            with profiler.phase("init"):
+                population = self._init_population()
+            for individual in population:
+                pending[submit(individual)] = individual
+            with profiler.phase("evaluation"):
+                for future in wait(list(pending)).done:
+                    evaluated(future)
+            fitness = weighted_fitness(population)
+            self.steady_state_stats = throughput(time.perf_counter() - start_time)
+            ages = np.arange(len(population))
+            insertions = len(population)
+            self.hall_of_fame = HallOfFame(self.hall_of_fame_size)
+            self.hall_of_fame.update(population, fitness)
+
+            compare_func = max if self.maximize else min
+            best_label = "Max" if self.maximize else "Min"
+            evaluations_to_target = None
+            time_to_target = None
+            budget = self.ngen * len(population)
+            bred = processed = 0
+            backlog = []
+            generation_counter = 0
+            generation_start = time.perf_counter()
+            profiler.next_generation(1)
+
+            def insert(individual):
+                nonlocal insertions
+                child = individual.fitness.wvalues[0]
+                with profiler.phase("replacement"):
+                    index = replace(self.rng, fitness, child, ages, **replacement_params)
+                    if index >= 0:
+                        population[index] = individual
+                        fitness[index] = child
+                        ages[index] = insertions
+                        insertions += 1
+                        profiler.count("replacements")
+
+            def refill():
+                # keep every worker busy; offspring with a valid fitness skip the pool
+                nonlocal bred
+                newcomers = []
+                while len(pending) < workers and bred < budget:
+                    if not backlog:
+                        backlog.extend(reversed(self._breed(population, fitness)))
+                    child = backlog.pop()
+                    bred += 1
+                    if child.fitness.valid:
+                        newcomers.append(child)
+                    else:
+                        pending[submit(child)] = child
+                return newcomers
+
+            newcomers = refill()
+            while newcomers or pending:
+                if not newcomers:
+                    with profiler.phase("wait"):
+                        done = wait(pending, return_when=FIRST_COMPLETED).done
+                    newcomers = [evaluated(future) for future in done]
+                for individual in newcomers:
+                    insert(individual)
+                processed += len(newcomers)
+                newcomers = refill()
+
+                # --- One snapshot per population_size processed offspring ---
+                while processed >= (generation_counter + 1) * len(population):
+                    generation_counter += 1
+                    with profiler.phase("stats"):
+                        best_index = int(np.argmax(fitness))
+                        best_fitness = population[best_index].fitness.values[0]
+                        mean_fitness = float(np.mean(fitness)) * self.FitnessType.weights[0]
+                        entropy = self._entropy(population)
+                    with profiler.phase("hall_of_fame"):
+                        self.hall_of_fame.update(population, fitness)
+
+                    now = time.perf_counter()
+                    if (
+                        self.target is not None
+                        and evaluations_to_target is None
+                        and best_fitness == compare_func(best_fitness, self.target)
+                    ):
+                        evaluations_to_target = self.evaluations
+                        time_to_target = now - start_time
+                    elapsed = now - start_time
+                    self.steady_state_stats = throughput(elapsed)
 
-            # Replace old population
-            population[:] = offspring
+                    if self.verbose:
+                        with profiler.phase("print"):
+                            print(
+                                f"- Generation {generation_counter}: {best_label} Fitness = {best_fitness}, "
+                                f"Avg Fitness = {mean_fitness}, "
+                                f"{self.steady_state_stats['evaluations_per_second']:.1f} evaluations/s\n")
 
-            # --- Gather statistics ---
-            fitness_values = [ind.fitness.values[0] for ind in population]
-            best_fitness = best_func(fitness_values)
-            mean_fitness = np.mean(fitness_values)
+                    yield {
+                        "generation": generation_counter,
+                        "stage": "steady_state",
+                        "best_fitness": best_fitness,
+                        "mean_fitness": mean_fitness,
+                        "entropy": entropy,
+                        "best": population[best_index],
+                        "evaluations": self.evaluations,
+                        "elapsed": elapsed,
+                        "generation_time": now - generation_start,
+                        "evaluations_to_target": evaluations_to_target,
+                        "time_to_target": time_to_target,
+                        "evaluations_per_second": self.steady_state_stats["evaluations_per_second"],
+                        "utilization": self.steady_state_stats["utilization"],
+                    }
+                    generation_start = time.perf_counter()
+                    profiler.next_generation(generation_counter + 1)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if profiler.enabled:
+                profiler.stop()
 
-            best_fitness_values.append(best_fitness)
-            mean_fitness_values.append(mean_fitness)
+    def _cellular_breed(self, population, genomes, mates):
+        """
+        One offspring per cell, from the cell and its mate
+        :return: (the cells whose offspring differs from them, the offspring of those
+        cells, their genome array)
+        """
+        profiler = self.profiler
+        n = len(population)
+        crossed = self.rng.random(n) < self.crossover_prob
+        mutated = self.rng.random(n) < self.mutation_prob
+        changed = np.flatnonzero(crossed | mutated)
+        mate = cga.vector_operator(self.toolbox.mate)
+        mutate = cga.vector_operator(self.toolbox.mutate)
+
+        if mate is not None and mutate is not None:
+            # the whole grid at once
+            children = genomes.copy()
+            with profiler.phase("crossover"):
+                cells = np.flatnonzero(crossed)
+                children[cells] = mate[0](self.rng, genomes[cells], genomes[mates[cells]], **mate[1])
+            with profiler.phase("mutation"):
+                cells = np.flatnonzero(mutated)
+                children[cells] = mutate[0](self.rng, children[cells], **mutate[1])
+            children = children[changed]
+            return changed, [self.Individual(row) for row in children.tolist()], children
+
+        # cell by cell, with the toolbox operators
+        offspring = []
+        for cell in changed.tolist():
+            child, partner = self._gather(population, np.array([cell, mates[cell]]))
+            if crossed[cell]:
+                with profiler.phase("crossover"):
+                    self.toolbox.mate(child, partner)
+                    del child.fitness.values
+            if mutated[cell]:
+                with profiler.phase("mutation"):
+                    self._mutate(child)
+            offspring.append(child)
+        return changed, offspring, genome_array(offspring)
+
+    def _cellular_iter(self):
+        """
+        run_iter() of cellular runs: synchronous generations over the toroidal grid,
+        whose cells are the population in row-major order
+        """
+        options = self.cellular
+        start_time = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
+        self.evaluations = 0
+        self.rng = np.random.default_rng(random.randrange(2**32))
+        neighbours = cga.neighbour_indices(
+            options["grid"], cga.NEIGHBOURHOODS[options["neighbourhood"]]
+        )
+        with profiler.phase("init"):
+            population = self._init_population()
+        self._evaluate(population)
+        genomes = genome_array(population)
+        fitness = weighted_fitness(population)
+        self.hall_of_fame = HallOfFame(self.hall_of_fame_size)
+        self.hall_of_fame.update(population, fitness)
+
+        compare_func = max if self.maximize else min
+        best_label = "Max" if self.maximize else "Min"
+        evaluations_to_target = None
+        time_to_target = None
+        offspring_count = replacements = 0
+        self.cellular_stats = {
+            "grid": list(options["grid"]),
+            "neighbourhood": options["neighbourhood"],
+            "replacement_rate": 0.0,
+        }
+
+        try:
+            for generation_counter in range(1, self.ngen + 1):
+                generation_start = time.perf_counter()
+                profiler.next_generation(generation_counter)
+
+                with profiler.phase("select"):
+                    mates = cga.select_mates(
+                        self.rng, fitness, neighbours, options["tournament_size"]
+                    )
+                cells, offspring, children = self._cellular_breed(population, genomes, mates)
+                self._evaluate([ind for ind in offspring if not ind.fitness.valid])
+
+                # Local search on the best offspring
+                if self.local_search is not None and offspring:
+                    best = max(range(len(offspring)), key=lambda i: offspring[i].fitness)
+                    self._local_search(offspring[best])
+                    children[best] = offspring[best]
+
+                # Synchronous replacement of the cells by their offspring
+                with profiler.phase("replacement"):
+                    child_fitness = weighted_fitness(offspring)
+                    if options["replacement"] == "always":
+                        winners = np.arange(len(cells))
+                    else:
+                        winners = np.flatnonzero(child_fitness >= fitness[cells])
+                    replaced = cells[winners]
+                    for position, cell in zip(winners.tolist(), replaced.tolist()):
+                        population[cell] = offspring[position]
+                    if len(replaced):
+                        genomes[replaced] = children[winners]
+                    fitness[replaced] = child_fitness[winners]
+                    offspring_count += len(cells)
+                    replacements += len(replaced)
+                    profiler.count("replacements", len(replaced))
+
+                # --- Gather statistics ---
+                with profiler.phase("stats"):
+                    best_index = int(np.argmax(fitness))
+                    best_fitness = population[best_index].fitness.values[0]
+                    mean_fitness = float(np.mean(fitness)) * self.FitnessType.weights[0]
+                    entropy = population_entropy(
+                        genomes, self.chromosome_type, self.int_range, self.real_range
+                    )
+
+                with profiler.phase("hall_of_fame"):
+                    self.hall_of_fame.update(population, fitness)
+
+                now = time.perf_counter()
+                if (
+                    self.target is not None
+                    and evaluations_to_target is None
+                    and best_fitness == compare_func(best_fitness, self.target)
+                ):
+                    evaluations_to_target = self.evaluations
+                    time_to_target = now - start_time
+                if offspring_count:
+                    self.cellular_stats["replacement_rate"] = replacements / offspring_count
+
+                if self.verbose:
+                    with profiler.phase("print"):
+                        print(
+                            f"- Generation {generation_counter}: {best_label} Fitness = {best_fitness}, "
+                            f"Avg Fitness = {mean_fitness}")
+                        print("Best Individual = ", *population[best_index], "\n")
 
-            print(
-                f"- Generation {generation_counter}: {best_label} Fitness = {best_fitness}, Avg Fitness = {mean_fitness}")
+                yield {
+                    "generation": generation_counter,
+                    "stage": "cellular",
+                    "best_fitness": best_fitness,
+                    "mean_fitness": mean_fitness,
+                    "entropy": entropy,
+                    "best": population[best_index],
+                    "evaluations": self.evaluations,
+                    "elapsed": now - start_time,
+                    "generation_time": now - generation_start,
+                    "evaluations_to_target": evaluations_to_target,
+                    "time_to_target": time_to_target,
+                }
+        finally:
+            if profiler.enabled:
+                profiler.stop()
 
-            # --- Find and print best individual dynamically ---
-            best_index = fitness_values.index(compare_func(fitness_values))
-            print("Best Individual = ", *population[best_index], "\n")
+    def _nsga2_iter(self):
+        """
+        run_iter() of multi-objective runs: NSGA-II with crowded binary tournaments and
+        (mu + lambda) survivor selection by front rank and crowding distance. Snapshots
+        hold per-objective "best_fitness" and "mean_fitness" lists, "front_size" and
+        "front" (references to the non-dominated individuals).
+        """
+        start_time = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
+        self.evaluations = 0
+        self.rng = np.random.default_rng(random.randrange(2**32))
+        weights = np.array(self.objectives)
+        with profiler.phase("init"):
+            population = self._init_population()
+        self._evaluate(population)
+        with profiler.phase("sort"):
+            objectives = -nsga2.weighted_objectives(population)
+            ranks = nsga2.non_dominated_sort(objectives)
+            crowding = nsga2.crowding_distance(objectives, ranks)
+
+        try:
+            for generation_counter in range(1, self.ngen + 1):
+                generation_start = time.perf_counter()
+                profiler.next_generation(generation_counter)
+
+                # Variation of crowded-tournament winners
+                with profiler.phase("select"):
+                    chosen = nsga2.crowded_tournament(self.rng, ranks, crowding, len(population))
+                offspring = self._ga_variation(population, chosen)
+
+                # Survivors among parents and offspring
+                with profiler.phase("sort"):
+                    combined = population + offspring
+                    objectives = -nsga2.weighted_objectives(combined)
+                    survivors, ranks, crowding = nsga2.environmental_selection(
+                        objectives, len(population)
+                    )
+                    population = [combined[i] for i in survivors.tolist()]
+                    objectives = objectives[survivors]
+
+                with profiler.phase("stats"):
+                    best_fitness = (-objectives.min(axis=0) / weights).tolist()
+                    mean_fitness = (-objectives.mean(axis=0) / weights).tolist()
+                    front = [population[i] for i in np.flatnonzero(ranks == 0).tolist()]
+                    entropy = self._entropy(population)
+
+                now = time.perf_counter()
+                if self.verbose:
+                    with profiler.phase("print"):
+                        print(
+                            f"- Generation {generation_counter}: Pareto front size = {len(front)}, "
+                            f"Best per objective = {best_fitness}, Avg = {mean_fitness}\n")
+
+                self.pareto_front = front
+                yield {
+                    "generation": generation_counter,
+                    "stage": "nsga2",
+                    "best_fitness": best_fitness,
+                    "mean_fitness": mean_fitness,
+                    "entropy": entropy,
+                    "front_size": len(front),
+                    "front": front,
+                    "evaluations": self.evaluations,
+                    "elapsed": now - start_time,
+                    "generation_time": now - generation_start,
+                }
+        finally:
+            if profiler.enabled:
+                profiler.stop()
+
+    def _multi_objective_results(self, snapshots, progress):
+        """run() of multi-objective runs"""
+        best_fitness_values, mean_fitness_values, front_sizes, entropy_values = [], [], [], []
+        self.pareto_front = []
+        for snapshot in snapshots:
+            best_fitness_values.append(snapshot["best_fitness"])
+            mean_fitness_values.append(snapshot["mean_fitness"])
+            entropy_values.append(snapshot["entropy"])
+            front_sizes.append(snapshot["front_size"])
+            if progress is not None and progress(snapshot) is False:
+                snapshots.close()
+                break
+
+        # --- Distinct non-dominated solutions, best on the first objective first ---
+        front, seen = [], set()
+        for ind in sorted(self.pareto_front, key=lambda ind: ind.fitness.wvalues, reverse=True):
+            if tuple(ind) not in seen:
+                seen.add(tuple(ind))
+                front.append(ind)
+        results = {
+            "best_fitness_values": best_fitness_values,
+            "mean_fitness_values": mean_fitness_values,
+            "front_sizes": front_sizes,
+            "entropy_values": entropy_values,
+            "evaluations": self.evaluations,
+            "pareto_front": [
+                {"genome": list(ind), "fitness": list(ind.fitness.values)} for ind in front
+            ],
+        }
+        if front:
+            results["best_individual"] = list(front[0])
+            results["best_fitness"] = list(front[0].fitness.values)
+        if self.profiler.enabled:
+            results["profile"] = self.profiler.report()
+        return results
+
+    def run(self, progress=None):
+        """
+        Runs the GA for ngen generations and returns the fitness history.
+        progress(snapshot), if given, is called with every run_iter() snapshot; the run
+        stops early if it returns False.
+        """
+        best_fitness_values = []
+        mean_fitness_values = []
+        entropy_values = []
+        snapshot = {"evaluations_to_target": None, "time_to_target": None}
+
+        snapshots = self.run_iter()
+        if self.objectives is not None:
+            return self._multi_objective_results(snapshots, progress)
+        for snapshot in snapshots:
+            best_fitness_values.append(snapshot["best_fitness"])
+            mean_fitness_values.append(snapshot["mean_fitness"])
+            entropy_values.append(snapshot["entropy"])
+            if progress is not None and progress(snapshot) is False:
+                snapshots.close()
+                break
 
         # --- Return dynamically labeled result ---
         if self.maximize:
-            return {"max_fitness_values": best_fitness_values, "mean_fitness_values": mean_fitness_values}
+            results = {"max_fitness_values": best_fitness_values, "mean_fitness_values": mean_fitness_values}
         else:
-            return {"min_fitness_values": best_fitness_values, "mean_fitness_values": mean_fitness_values}
+            results = {"min_fitness_values": best_fitness_values, "mean_fitness_values": mean_fitness_values}
+        results["entropy_values"] = entropy_values
+        results["evaluations"] = self.evaluations
+        results["evaluations_to_target"] = snapshot["evaluations_to_target"]
+        results["time_to_target"] = snapshot["time_to_target"]
+
+        # --- Best solutions found ---
+        best = self.hall_of_fame[0]
+        results["best_individual"] = list(best)
+        results["best_fitness"] = best.fitness.values[0]
+        results["hall_of_fame"] = [
+            {"genome": list(ind), "fitness": ind.fitness.values[0]} for ind in self.hall_of_fame
+        ]
+        if self.adaptive is not None:
+            results["adaptive"] = self.adaptive.report()
+        if self.surrogate is not None:
+            results["surrogate"] = self.surrogate.report()
+        if self.steady_state is not None:
+            results["steady_state"] = self.steady_state_stats
+        if self.diversity is not None:
+            results["diversity"] = self.diversity.report()
+        if self.cellular is not None:
+            results["cellular"] = self.cellular_stats
+        if self.profiler.enabled:
+            results["profile"] = self.profiler.report()
+        return results
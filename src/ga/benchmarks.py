@@ -0,0 +1,16 @@
+from src.problems.benchmarks import BENCHMARKS
+
+
+# create instance
+def benchmark_instance(name, dimensions=10, shift=False, rotate=False, seed=0):
+    return BENCHMARKS[name](dimensions=dimensions, shift=shift, rotate=rotate, seed=seed)
+
+
+# fitness calculation
+def benchmark_fitness(individual, problem):
+    return problem.fitness(individual)
+
+
+# fitness calculation of a whole population in one call
+def benchmark_batch_fitness(population, problem):
+    return problem.fitnessBatch(population)
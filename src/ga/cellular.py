@@ -0,0 +1,179 @@
+"""
+Cellular GA on a 2-D toroidal grid, for BaseGA(cellular=...).
+
+Every cell of the grid holds one individual, which only mates with its
+neighbours. A generation updates the whole grid synchronously with array
+operations: the neighbours of every cell are shifted views of the grid's index
+array (np.roll), each cell breeds one offspring with a neighbour picked by a
+tournament, and the offspring takes the cell if it is at least as good. Good
+genes spread from neighbourhood to neighbourhood instead of across the whole
+population at once, which keeps the population diverse longer.
+
+The default operators of each encoding have vectorized twins below that breed the
+whole grid at once; other operators (e.g. a problem's own mutation) run per cell.
+"""
+
+from math import isqrt
+
+import numpy as np
+from deap import tools
+
+# (row, column) offsets of the neighbours of a cell, by BaseGA(cellular={"neighbourhood": ...}) name
+NEIGHBOURHOODS = {
+    # L5: the 4 nearest cells
+    "von_neumann": ((-1, 0), (1, 0), (0, -1), (0, 1)),
+    # C9: the 8 surrounding cells
+    "moore": ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)),
+    # L9: the 2 nearest cells in each direction
+    "linear9": ((-2, 0), (-1, 0), (1, 0), (2, 0), (0, -2), (0, -1), (0, 1), (0, 2)),
+}
+
+
+def grid_shape(size):
+    """:return: the most square (rows, columns) grid of size cells"""
+    rows = max(r for r in range(1, isqrt(size) + 1) if size % r == 0)
+    return rows, size // rows
+
+
+def neighbour_indices(shape, offsets):
+    """
+    :return: (len(offsets), rows * columns) array of the flat index of every cell's
+    neighbour at each offset, wrapping around the grid's edges
+    """
+    cells = np.arange(shape[0] * shape[1]).reshape(shape)
+    return np.stack([np.roll(cells, (-dr, -dc), axis=(0, 1)).ravel() for dr, dc in offsets])
+
+
+def select_mates(rng, fitness, neighbours, size=2):
+    """
+    :param fitness: weighted fitness vector of the cells (larger is better)
+    :param neighbours: neighbour_indices() array
+    :param size: contestants of each cell's tournament, drawn among its neighbours;
+    None picks the best neighbour
+    :return: the index of every cell's mate
+    """
+    cells = np.arange(neighbours.shape[1])
+    if size is None:
+        return neighbours[np.argmax(fitness[neighbours], axis=0), cells]
+    contestants = neighbours[rng.integers(len(neighbours), size=(size, len(cells))), cells]
+    return contestants[np.argmax(fitness[contestants], axis=0), cells]
+
+
+# Vectorized operators: each one breeds or mutates a whole (cells, genome length)
+# array of genomes at once, like its DEAP twin does one individual (first child only
+# for crossovers). Crossovers take the numpy Generator and the parents' arrays,
+# mutations the Generator, the array and the DEAP operator's keyword arguments.
+
+def one_point_crossover(rng, first, second):
+    """tools.cxOnePoint: first's genes before a random cut, second's after it"""
+    n, length = first.shape
+    cuts = rng.integers(1, max(length, 2), size=n)
+    return np.where(np.arange(length) < cuts[:, None], first, second)
+
+
+def ordered_crossover(rng, first, second):
+    """
+    tools.cxOrdered (OX) on permutations: a random slice of first, the other
+    positions filled with the remaining genes in second's order, both from the end
+    of the slice on
+    """
+    n, length = first.shape
+    rows = np.arange(n)[:, None]
+    positions = np.arange(length)
+    start = rng.integers(length, size=n)
+    end = rng.integers(length - 1, size=n)
+    end += end >= start
+    start, end = np.minimum(start, end), np.maximum(start, end) + 1
+    in_slice = (positions >= start[:, None]) & (positions < end[:, None])
+    taken = np.zeros((n, length), dtype=bool)
+    taken[rows, first] = in_slice
+
+    # from the slice's end on: second's genes, not taken ones first, and the free
+    # positions first, both in order; the first length - slice length pair up
+    rotation = (end[:, None] + positions) % length
+    donor = second[rows, rotation]
+    genes = donor[rows, np.argsort(taken[rows, donor], axis=1, kind="stable")]
+    free = rotation[rows, np.argsort(in_slice[rows, rotation], axis=1, kind="stable")]
+    child = first.copy()
+    fill = positions < (length - (end - start))[:, None]
+    child[rows, free] = np.where(fill, genes, child[rows, free])
+    return child
+
+
+def flip_bits(rng, genomes, indpb):
+    """tools.mutFlipBit"""
+    return np.where(rng.random(genomes.shape) < indpb, 1 - genomes, genomes)
+
+
+def uniform_int(rng, genomes, low, up, indpb):
+    """tools.mutUniformInt"""
+    mask = rng.random(genomes.shape) < indpb
+    return np.where(mask, rng.integers(low, up + 1, size=genomes.shape), genomes)
+
+
+def gaussian(rng, genomes, mu, sigma, indpb):
+    """tools.mutGaussian"""
+    mask = rng.random(genomes.shape) < indpb
+    return genomes + mask * rng.normal(mu, sigma, size=genomes.shape)
+
+
+def shuffle_indexes(rng, genomes, indpb):
+    """tools.mutShuffleIndexes: each position swapped with another random one with probability indpb"""
+    genomes = genomes.copy()
+    n, length = genomes.shape
+    rows, positions = np.nonzero(rng.random(genomes.shape) < indpb)
+    others = rng.integers(length - 1, size=len(positions))
+    others += others >= positions
+    # the swaps of a genome happen in order: one swap per genome and round
+    order = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    for k in range(int(order.max()) + 1 if len(order) else 0):
+        swap = order == k
+        r, a, b = rows[swap], positions[swap], others[swap]
+        genomes[r, a], genomes[r, b] = genomes[r, b], genomes[r, a]
+    return genomes
+
+
+# vectorized twins of the DEAP operators registered by BaseGA._setup_encoding()
+VECTOR_OPERATORS = {
+    tools.cxOnePoint: one_point_crossover,
+    tools.cxOrdered: ordered_crossover,
+    tools.mutFlipBit: flip_bits,
+    tools.mutUniformInt: uniform_int,
+    tools.mutGaussian: gaussian,
+    tools.mutShuffleIndexes: shuffle_indexes,
+}
+
+
+def vector_operator(registered):
+    """
+    :param registered: a toolbox operator (functools.partial of a DEAP operator)
+    :return: (vectorized twin, its keyword arguments), or None if it has none
+    """
+    twin = VECTOR_OPERATORS.get(getattr(registered, "func", None))
+    if twin is None or registered.args:
+        return None
+    return twin, registered.keywords
+
+
+def cellular_options(options, population_size):
+    """
+    Normalizes BaseGA(cellular=...): True or a dict of "grid" ((rows, columns), default:
+    the most square grid of population_size cells), "neighbourhood" ("von_neumann",
+    "moore" or "linear9"), "tournament_size" (None mates with the best neighbour) and
+    "replacement" ("if_not_worse" or "always")
+    """
+    options = dict(options) if isinstance(options, dict) else {}
+    unknown = set(options) - {"grid", "neighbourhood", "tournament_size", "replacement"}
+    if unknown:
+        raise ValueError(f"Unsupported cellular options {sorted(unknown)}")
+    options["grid"] = tuple(options.get("grid") or grid_shape(population_size))
+    options.setdefault("neighbourhood", "von_neumann")
+    options.setdefault("tournament_size", 2)
+    options.setdefault("replacement", "if_not_worse")
+    if options["grid"][0] * options["grid"][1] != population_size:
+        raise ValueError(f"A {options['grid']} grid does not hold {population_size} individuals")
+    if options["neighbourhood"] not in NEIGHBOURHOODS:
+        raise ValueError(f"Unsupported neighbourhood {options['neighbourhood']!r}")
+    if options["replacement"] not in ("if_not_worse", "always"):
+        raise ValueError(f"Unsupported cellular replacement {options['replacement']!r}")
+    return options
@@ -0,0 +1,417 @@
+"""
+Master/worker evaluation over TCP, for runs that outgrow one machine's process pool.
+
+The master listens for workers; DistributedEvaluator.map plugs into
+BaseGA(map_func=...) like a pool's map. It ships the mapped function (the fitness
+function with its problem instance) once per worker, splits the items into batches
+and keeps every worker busy with one; a worker that disconnects or times out is
+dropped and its batch resent to another one.
+
+Frames are a 5-byte header (kind, payload length) and a payload; batches of
+genomes and of results travel as raw numpy buffers (dtype, shape, bytes), with a
+pickle fallback for items that do not form a numeric array. Both ends prove they
+share the authkey (HMAC challenges) before anything is unpickled.
+
+    with DistributedEvaluator(port=5555, authkey=b"secret") as evaluator:
+        # on each node: python -m src.ga.distributed HOST:5555 --authkey secret
+        ga = BaseGA.from_problem(cfg, map_func=evaluator.map)
+
+    with DistributedEvaluator(authkey=b"secret", local_workers=4) as evaluator:
+        ...  # four workers on localhost
+"""
+
+import argparse
+import hashlib
+import hmac
+import math
+import multiprocessing
+import os
+import pickle
+import selectors
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+# frame kinds
+CHALLENGE, RESPONSE, SETUP, BATCH, RESULT, ERROR, SHUTDOWN = range(1, 8)
+# batch payload encodings
+ARRAY, PICKLE = 0, 1
+
+_HEADER = struct.Struct("!BI")
+_TAG = struct.Struct("!II")  # map call, batch; echoed back with the results
+_ARRAY = struct.Struct("!4sB")  # dtype string, number of dimensions
+_DIGEST = hashlib.sha256
+
+
+# --- Framing ---
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def send_frame(sock, kind, payload=b""):
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """:return: (kind, payload)"""
+    kind, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return kind, _recv_exact(sock, size)
+
+
+def pack_items(items):
+    """Items as a raw numeric array when they form one, pickled otherwise"""
+    try:
+        array = np.asarray(items)
+    except ValueError:  # ragged
+        array = None
+    if array is None or array.dtype.kind not in "biuf":
+        return bytes([PICKLE]) + pickle.dumps(list(items), protocol=pickle.HIGHEST_PROTOCOL)
+    array = np.ascontiguousarray(array)
+    header = _ARRAY.pack(array.dtype.str.encode().ljust(4), array.ndim)
+    shape = struct.pack(f"!{array.ndim}I", *array.shape)
+    return bytes([ARRAY]) + header + shape + array.tobytes()
+
+
+def unpack_items(payload):
+    """:return: the list of items (rows as Python lists, scalars as Python numbers)"""
+    if payload[0] == PICKLE:
+        return pickle.loads(payload[1:])
+    dtype, ndim = _ARRAY.unpack_from(payload, 1)
+    offset = 1 + _ARRAY.size
+    shape = struct.unpack_from(f"!{ndim}I", payload, offset)
+    offset += 4 * ndim
+    array = np.frombuffer(payload, dtype=np.dtype(dtype.strip().decode()), offset=offset)
+    return array.reshape(shape).tolist()
+
+
+# --- Authentication: each side answers the other's challenge ---
+
+class AuthenticationError(ConnectionError):
+    """The other end does not share the authkey or does not follow the handshake"""
+
+
+def _answer(authkey, challenge):
+    return hmac.new(authkey, challenge, _DIGEST).digest()
+
+
+def _authenticate(sock, authkey, initiator):
+    """
+    Mutual HMAC challenge; raises AuthenticationError unless both sides share the
+    authkey, and ConnectionError if the connection closes first
+    """
+    own = os.urandom(32)
+    if initiator:
+        send_frame(sock, CHALLENGE, own)
+        kind, payload = recv_frame(sock)
+        answer, theirs = payload[:_DIGEST().digest_size], payload[_DIGEST().digest_size:]
+        if kind != RESPONSE or not hmac.compare_digest(answer, _answer(authkey, own)):
+            raise AuthenticationError("Worker authentication failed")
+        send_frame(sock, RESPONSE, _answer(authkey, theirs))
+    else:
+        kind, theirs = recv_frame(sock)
+        if kind != CHALLENGE:
+            raise AuthenticationError("Unexpected handshake")
+        send_frame(sock, RESPONSE, _answer(authkey, theirs) + own)
+        kind, answer = recv_frame(sock)
+        if kind != RESPONSE or not hmac.compare_digest(answer, _answer(authkey, own)):
+            raise AuthenticationError("Master authentication failed")
+
+
+# --- Worker ---
+
+def run_worker(address, authkey, retry_for=10.0):
+    """
+    Connects to a master and evaluates its batches until it shuts the worker down or
+    goes away (also during the handshake, e.g. a master closing as the worker joins)
+    :param address: (host, port) of the master
+    :param retry_for: seconds to keep retrying the connection
+    """
+    deadline = time.monotonic() + retry_for
+    while True:
+        try:
+            sock = socket.create_connection(address)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+    with sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            _authenticate(sock, authkey, initiator=False)
+        except AuthenticationError:
+            raise
+        except ConnectionError:
+            return
+        func = None
+        while True:
+            try:
+                kind, payload = recv_frame(sock)
+            except ConnectionError:
+                return
+            if kind == SHUTDOWN:
+                return
+            if kind == SETUP:
+                func = pickle.loads(payload)
+            elif kind == BATCH:
+                tag = payload[:_TAG.size]
+                try:
+                    results = [func(item) for item in unpack_items(payload[_TAG.size:])]
+                    send_frame(sock, RESULT, tag + pack_items(results))
+                except Exception as error:
+                    send_frame(sock, ERROR, tag + f"{type(error).__name__}: {error}".encode())
+
+
+# --- Master ---
+
+class _Worker:
+    """
+    A connected worker: its socket, the function version it holds and its batch in
+    flight, as (map call, batch)
+    """
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.version = None
+        self.batch = None
+        self.sent_at = None
+
+
+class DistributedEvaluator:
+    """
+    Listens for workers and evaluates map() calls on them; usable as a context manager
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        authkey=None,
+        local_workers=0,
+        batch_size=None,
+        worker_timeout=None,
+        connect_timeout=30.0,
+    ):
+        """
+        :param host: interface to listen on ("0.0.0.0" for remote workers)
+        :param port: port to listen on (0 picks a free one, see address)
+        :param authkey: shared secret of the master and its workers (bytes)
+        :param local_workers: worker processes to start on this machine
+        :param batch_size: items per batch (default: about four batches per worker)
+        :param worker_timeout: seconds after which a worker that has not returned its
+        batch counts as lost (default: never)
+        :param connect_timeout: seconds map() waits for a first worker
+        """
+        if not authkey:
+            raise ValueError("An authkey is required")
+        self.authkey = authkey
+        self.batch_size = batch_size
+        self.worker_timeout = worker_timeout
+        self.connect_timeout = connect_timeout
+        self.workers = []
+        self.lost_workers = 0
+        self.resent_batches = 0
+        self._joined = []
+        self._lock = threading.Lock()
+        self._func = None
+        self._version = 0
+        self._call = 0
+        self._closed = False
+
+        self._listener = socket.create_server((host, port))
+        self.address = self._listener.getsockname()[:2]
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+        context = multiprocessing.get_context("spawn")
+        self._processes = [
+            context.Process(target=run_worker, args=(self.address, authkey), daemon=True)
+            for _ in range(local_workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                sock, address = self._listener.accept()
+            except OSError:
+                return
+            try:
+                sock.settimeout(self.connect_timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                _authenticate(sock, self.authkey, initiator=True)
+                sock.settimeout(None)
+            except (OSError, ConnectionError):
+                sock.close()
+                continue
+            with self._lock:
+                self._joined.append(_Worker(sock, address))
+
+    def _admit_joined(self):
+        with self._lock:
+            joined, self._joined = self._joined, []
+        self.workers.extend(joined)
+
+    def _drop(self, worker, queue):
+        """Forgets a lost worker and puts its batch back in the queue"""
+        self.workers.remove(worker)
+        self.lost_workers += 1
+        if worker.batch is not None and worker.batch[0] == self._call:
+            queue.append(worker.batch[1])
+            self.resent_batches += 1
+        try:
+            worker.sock.close()
+        except OSError:
+            pass
+
+    def _send_batch(self, worker, batch_id, payload):
+        if worker.version != self._version:
+            send_frame(worker.sock, SETUP, self._setup)
+            worker.version = self._version
+        send_frame(worker.sock, BATCH, _TAG.pack(self._call, batch_id) + payload)
+        worker.batch = (self._call, batch_id)
+        worker.sent_at = time.monotonic()
+
+    def map(self, func, iterable):
+        """:return: [func(item) for item in iterable], evaluated on the workers"""
+        items = list(iterable)
+        if not items:
+            return []
+        self._call += 1
+        if func is not self._func:
+            self._func = func
+            self._version += 1
+            self._setup = pickle.dumps(func, protocol=pickle.HIGHEST_PROTOCOL)
+
+        deadline = time.monotonic() + self.connect_timeout
+        self._admit_joined()
+        while not self.workers:
+            if time.monotonic() > deadline:
+                raise RuntimeError("No worker connected to the distributed evaluator")
+            time.sleep(0.01)
+            self._admit_joined()
+
+        size = self.batch_size or max(1, math.ceil(len(items) / (4 * len(self.workers))))
+        payloads = [pack_items(items[i:i + size]) for i in range(0, len(items), size)]
+        queue = list(range(len(payloads) - 1, -1, -1))  # popped from the end
+        results = [None] * len(payloads)
+        remaining = len(payloads)
+
+        with selectors.DefaultSelector() as selector:
+            registered = set()
+            while remaining:
+                self._admit_joined()
+                for worker in list(self.workers):
+                    if worker.batch is None and queue:
+                        batch_id = queue.pop()
+                        try:
+                            self._send_batch(worker, batch_id, payloads[batch_id])
+                        except OSError:
+                            worker.batch = (self._call, batch_id)
+                            self._drop(worker, queue)
+                            continue
+                    if worker not in registered:
+                        selector.register(worker.sock, selectors.EVENT_READ, worker)
+                        registered.add(worker)
+                if not self.workers:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("Every worker of the distributed evaluator was lost")
+                    time.sleep(0.01)
+                    continue
+                deadline = time.monotonic() + self.connect_timeout
+
+                for key, _ in selector.select(timeout=0.1):
+                    worker = key.data
+                    try:
+                        kind, payload = recv_frame(worker.sock)
+                    except (OSError, ConnectionError):
+                        selector.unregister(worker.sock)
+                        registered.discard(worker)
+                        self._drop(worker, queue)
+                        continue
+                    worker.batch = None
+                    call, batch_id = _TAG.unpack_from(payload)
+                    if call != self._call:
+                        continue  # left over from a failed map() call
+                    if kind == ERROR:
+                        message = payload[_TAG.size:].decode()
+                        raise RuntimeError(f"Worker {worker.address} failed: {message}")
+                    if results[batch_id] is None:
+                        results[batch_id] = unpack_items(payload[_TAG.size:])
+                        remaining -= 1
+
+                # --- Workers that sit on their batch for too long count as lost ---
+                if self.worker_timeout is not None:
+                    now = time.monotonic()
+                    for worker in list(self.workers):
+                        if worker.batch is not None and now - worker.sent_at > self.worker_timeout:
+                            if worker in registered:
+                                selector.unregister(worker.sock)
+                                registered.discard(worker)
+                            self._drop(worker, queue)
+
+            for worker in registered:
+                selector.unregister(worker.sock)
+        return [result for batch in results for result in batch]
+
+    def close(self):
+        """Stops listening, then shuts down the workers, including those that just joined"""
+        self._closed = True
+        try:
+            self._listener.shutdown(socket.SHUT_RDWR)  # wakes the acceptor up
+        except OSError:
+            pass
+        self._listener.close()
+        self._acceptor.join(timeout=self.connect_timeout)
+        self._admit_joined()
+        for worker in self.workers:
+            try:
+                send_frame(worker.sock, SHUTDOWN)
+                worker.sock.close()
+            except OSError:
+                pass
+        self.workers = []
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        raise TypeError("A DistributedEvaluator cannot be pickled; create it in the master process")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a distributed evaluation worker")
+    parser.add_argument("master", help="HOST:PORT of the master")
+    parser.add_argument("--authkey", default=os.environ.get("GA_AUTHKEY"),
+                        help="shared secret (default: $GA_AUTHKEY)")
+    parser.add_argument("--retry-for", type=float, default=10.0,
+                        help="seconds to keep retrying the connection")
+    args = parser.parse_args(argv)
+    if not args.authkey:
+        parser.error("an authkey is required (--authkey or $GA_AUTHKEY)")
+    host, port = args.master.rsplit(":", 1)
+    run_worker((host, int(port)), args.authkey.encode(), args.retry_for)
+
+
+if __name__ == "__main__":
+    main()
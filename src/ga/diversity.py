@@ -0,0 +1,310 @@
+"""
+Diversity control of the "ga" stage: duplicate removal, niching and restarts.
+
+Genomes are compared as numpy rows. Duplicates are found by hashing the rows'
+bytes; niching (fitness sharing or clearing) looks for the neighbours of a genome
+within a radius through a locality-sensitive hashing index, so only genomes that
+share a bucket get their distance computed instead of all pairs. The distance is
+the Hamming distance for binary and integer genomes, the number of directed
+edges not shared for permutations (Hamming distance of the successor arrays, so
+rotated tours are equal) and the Euclidean distance for real genomes.
+
+    ga = BaseGA.from_problem(cfg, diversity={"niching": "clearing", "restart_stall": 50})
+    results = ga.run()
+    results["entropy_values"], results["diversity"]["restarts"]
+"""
+
+import math
+import time
+
+import numpy as np
+
+# population size from which index="auto" hashes instead of comparing all pairs
+LSH_MIN_SIZE = 384
+
+
+def genome_array(individuals):
+    """:return: the (len(individuals), genome length) array of the genomes"""
+    return np.asarray(individuals)
+
+
+def genome_keys(genomes):
+    """:return: one hashable key (the bytes) per genome row"""
+    genomes = np.ascontiguousarray(genomes)
+    return [row.tobytes() for row in genomes]
+
+
+def population_entropy(genomes, chromosome_type, int_range=(0, 10), real_range=(0.0, 1.0), bins=16):
+    """
+    Mean Shannon entropy of the loci, normalized to [0, 1] (1: the genes of every
+    locus are spread as evenly as the population size allows). Real genes are
+    binned into bins equal intervals of real_range; for permutations, the symbol of
+    a locus is the element at that position.
+    """
+    n, length = genomes.shape
+    if chromosome_type == "real":
+        low, high = real_range
+        # genes outside real_range (e.g. after gaussian mutation) go to the end bins
+        codes = np.clip(np.floor((genomes - low) * (bins / (high - low))), 0, bins - 1)
+        symbols = bins
+    else:
+        codes = genomes
+        if chromosome_type == "binary":
+            symbols = 2
+        elif chromosome_type == "integer":
+            symbols = int_range[1] - int_range[0] + 1
+        else:
+            symbols = length
+    if min(n, symbols) < 2:
+        return 0.0
+
+    # run lengths of equal genes in each sorted column: the counts of each symbol
+    ordered = np.sort(codes, axis=0).T
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    first = np.flatnonzero(starts.ravel())
+    p = np.diff(np.append(first, ordered.size)) / n
+    return float((p * np.log(1.0 / p)).sum() / (length * math.log(min(n, symbols))))
+
+
+def _stable_collision(width):
+    """Probability that 2 points at distance 1 share a p-stable (Gaussian) hash of the given width"""
+    normal_tail = 0.5 * math.erfc(width / math.sqrt(2.0))
+    return 1.0 - 2.0 * normal_tail - 2.0 / (math.sqrt(2.0 * math.pi) * width) * (
+        1.0 - math.exp(-width * width / 2.0)
+    )
+
+
+class NeighbourIndex:
+    """
+    Genomes within a radius of each other. Each of the bands hashes every genome on
+    a few sampled loci (Hamming distance) or a few random projections (Euclidean
+    distance), tuned so that 2 genomes at the radius share the band's bucket with
+    probability band_collision: genomes sharing a bucket in any band are candidates,
+    and only they are compared. With the defaults, 99% of the genomes at the radius
+    are found, and more of the closer ones. exact=True compares every pair instead.
+    """
+
+    def __init__(self, rng, features, radius, metric="hamming", bands=16, band_collision=0.25, exact=False):
+        """
+        :param features: (n, length) array; Hamming distances count differing columns
+        :param radius: neighbourhood radius, in distance units
+        :param metric: "hamming" or "euclidean"
+        """
+        self.features = features
+        self.radius = radius
+        self.metric = metric
+        n, length = features.shape
+        self._bands = None
+        if exact or n < 2:
+            return
+
+        if metric == "hamming":
+            share = min(radius / length, 0.99)
+            width = max(1, min(length, round(math.log(band_collision) / math.log1p(-share))))
+        else:
+            scale = 4.0 * radius
+            width = max(1, round(math.log(band_collision) / math.log(_stable_collision(4.0))))
+        self._bands = []
+        for _ in range(bands):
+            if metric == "hamming":
+                keys = features[:, rng.choice(length, width, replace=False)]
+            else:
+                projections = features @ rng.standard_normal((length, width))
+                keys = np.floor(projections / scale + rng.uniform(0.0, 1.0, width)).astype(np.int64)
+            _, ids = np.unique(keys, axis=0, return_inverse=True)
+            ids = ids.reshape(-1)
+            order = np.argsort(ids, kind="stable")
+            starts = np.searchsorted(ids[order], np.arange(ids.max() + 2))
+            self._bands.append((ids, order, starts))
+
+    def candidates(self, i):
+        """:return: the genomes sharing a bucket with genome i in any band (all genomes if exact)"""
+        if self._bands is None:
+            return np.arange(len(self.features))
+        return np.unique(np.concatenate([
+            order[starts[ids[i]]:starts[ids[i] + 1]] for ids, order, starts in self._bands
+        ]))
+
+    def neighbours(self, i, among=None):
+        """
+        :param among: boolean mask of the genomes to consider (default: all)
+        :return: (indices, distances) of the genomes closer than the radius to genome i, i excluded
+        """
+        candidates = self.candidates(i)
+        if among is not None:
+            candidates = candidates[among[candidates]]
+        candidates = candidates[candidates != i]
+        if self.metric == "hamming":
+            distances = (self.features[candidates] != self.features[i]).sum(axis=1)
+        else:
+            distances = np.linalg.norm(self.features[candidates] - self.features[i], axis=1)
+        within = distances < self.radius
+        return candidates[within], distances[within]
+
+
+def sharing(index, fitness, alpha=1.0):
+    """
+    Fitness sharing: the fitness above the worst one, divided by the niche count
+    1 + sum of (1 - (distance / radius) ** alpha) over the neighbours
+    """
+    niche_counts = np.ones(len(fitness))
+    for i in range(len(fitness)):
+        _, distances = index.neighbours(i)
+        niche_counts[i] += (1.0 - (distances / index.radius) ** alpha).sum()
+    shifted = fitness - fitness.min()
+    return (shifted + 1e-12 * (1.0 + shifted.max())) / niche_counts
+
+
+def clearing(index, fitness, capacity=1):
+    """
+    Clearing: from the best genome down, each one not cleared yet keeps its fitness
+    and, with its capacity - 1 best neighbours, wins its niche; the other neighbours
+    get a fitness below every winner's
+    """
+    cleared_value = fitness.min() - (np.ptp(fitness) + 1.0)
+    result = fitness.copy()
+    open_ = np.ones(len(fitness), dtype=bool)  # neither processed nor cleared
+    for i in np.argsort(-fitness, kind="stable").tolist():
+        if not open_[i]:
+            continue
+        open_[i] = False
+        members, _ = index.neighbours(i, among=open_)
+        losers = members[np.argsort(-fitness[members], kind="stable")][capacity - 1:]
+        open_[losers] = False
+        result[losers] = cleared_value
+    return result
+
+
+# niching methods by DiversityControl(niching=...) name
+NICHING_METHODS = {
+    "sharing": sharing,
+    "clearing": clearing,
+}
+
+
+class DiversityControl:
+    """
+    Duplicate removal and niching of the "ga" stage, restart triggers, and their
+    statistics
+    """
+
+    def __init__(
+        self,
+        chromosome_type,
+        individual_size,
+        int_range=(0, 10),
+        real_range=(0.0, 1.0),
+        deduplicate=True,
+        niching=None,
+        radius=0.1,
+        capacity=1,
+        alpha=1.0,
+        index="auto",
+        bands=16,
+        restart_entropy=None,
+        restart_stall=None,
+        restart_keep=1,
+    ):
+        """
+        :param deduplicate: replace the repeated genomes of each new population by mutants
+        :param niching: None, "sharing" or "clearing", applied to the selection fitness
+        :param radius: niche radius, as a share of the genome length (Hamming distances)
+        or of the diagonal of the real_range box (Euclidean distances)
+        :param capacity: winners per niche of clearing
+        :param alpha: shape of the sharing function
+        :param index: "lsh", "exact" (all pairs) or "auto" (lsh from LSH_MIN_SIZE genomes)
+        :param bands: hash bands of the lsh index; more find more neighbours
+        :param restart_entropy: restart when the population entropy falls below it
+        :param restart_stall: restart after that many generations without improvement
+        :param restart_keep: best individuals carried over a restart
+        """
+        if niching is not None and niching not in NICHING_METHODS:
+            raise ValueError(f"Unsupported niching method {niching!r}")
+        if not 0.0 < radius <= 1.0:
+            raise ValueError("The niche radius must be in (0, 1]")
+        if capacity < 1:
+            raise ValueError("The niche capacity must be at least 1")
+        if index not in ("auto", "lsh", "exact"):
+            raise ValueError(f"Unsupported neighbour index {index!r}")
+        self.chromosome_type = chromosome_type
+        self.int_range = int_range
+        self.real_range = real_range
+        self.deduplicate = deduplicate
+        self.niching = niching
+        self.capacity = capacity
+        self.alpha = alpha
+        self.index = index
+        self.bands = bands
+        self.restart_entropy = restart_entropy
+        self.restart_stall = restart_stall
+        self.restart_keep = restart_keep
+        if chromosome_type == "real":
+            self.metric = "euclidean"
+            self.radius = radius * (real_range[1] - real_range[0]) * math.sqrt(individual_size)
+        else:
+            self.metric = "hamming"
+            self.radius = radius * individual_size
+        self.reset()
+
+    def reset(self):
+        """Clears the statistics and the restart triggers; called at the start of a run"""
+        self.duplicates_replaced = 0
+        self.niching_time = 0.0
+        self.restarts = []
+        self._best = -math.inf
+        self._stall = 0
+
+    def features(self, genomes):
+        """Distance features: successor arrays of permutations, the genomes otherwise"""
+        if self.chromosome_type != "permutation":
+            return genomes
+        successors = np.empty_like(genomes)
+        successors[np.arange(len(genomes))[:, None], genomes] = np.roll(genomes, -1, axis=1)
+        return successors
+
+    def niche_fitness(self, rng, genomes, fitness):
+        """
+        :param genomes: genome array of the population
+        :param fitness: its weighted fitness vector
+        :return: the selection fitness after niching (the fitness itself without)
+        """
+        if self.niching is None:
+            return fitness
+        start = time.perf_counter()
+        exact = self.index == "exact" or (self.index == "auto" and len(fitness) < LSH_MIN_SIZE)
+        index = NeighbourIndex(
+            rng, self.features(genomes), self.radius, self.metric, self.bands, exact=exact
+        )
+        if self.niching == "sharing":
+            selection_fitness = sharing(index, fitness, self.alpha)
+        else:
+            selection_fitness = clearing(index, fitness, self.capacity)
+        self.niching_time += time.perf_counter() - start
+        return selection_fitness
+
+    def should_restart(self, generation, entropy, best):
+        """
+        Updates the restart triggers with a generation's entropy and weighted best fitness
+        :return: whether to restart the population now
+        """
+        if best > self._best:
+            self._best = best
+            self._stall = 0
+        else:
+            self._stall += 1
+        if (self.restart_entropy is not None and entropy < self.restart_entropy) or (
+            self.restart_stall is not None and self._stall >= self.restart_stall
+        ):
+            self.restarts.append(generation)
+            self._stall = 0
+            return True
+        return False
+
+    def report(self):
+        """:return: the diversity statistics of the run"""
+        return {
+            "duplicates_replaced": self.duplicates_replaced,
+            "niching_time": self.niching_time,
+            "restarts": list(self.restarts),
+        }
@@ -0,0 +1,76 @@
+"""
+Elitism and a bounded hall of fame, both working on weighted fitness vectors
+(fitness.wvalues[0], so larger is always better) with partial sorting.
+"""
+
+import numpy as np
+
+
+def top_k(fitness, k):
+    """
+    :param fitness: weighted fitness vector
+    :return: the indices of the k best entries, best first
+    """
+    k = min(k, len(fitness))
+    if k <= 0:
+        return np.empty(0, dtype=int)
+    best = np.argpartition(-fitness, k - 1)[:k]
+    return best[np.argsort(-fitness[best], kind="stable")]
+
+
+def weighted_fitness(individuals):
+    """:return: the vector of fitness.wvalues[0] of the individuals"""
+    return np.fromiter(
+        (ind.fitness.wvalues[0] for ind in individuals), float, len(individuals)
+    )
+
+
+class HallOfFame:
+    """
+    The maxsize best distinct genomes seen so far, best first. Each update only
+    looks at the top maxsize of the population (partial sort) and at the entries
+    that beat the current worst member, and stores copies of the newcomers.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = []
+        self._keys = set()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def update(self, population, fitness=None):
+        """
+        :param population: evaluated individuals
+        :param fitness: their weighted fitness vector, if already known
+        """
+        if fitness is None:
+            fitness = weighted_fitness(population)
+
+        worst = self.items[-1].fitness.wvalues[0] if len(self.items) == self.maxsize else None
+        added = False
+        for i in top_k(fitness, self.maxsize).tolist():
+            if worst is not None and fitness[i] <= worst:
+                break  # best first, so no later candidate gets in either
+            key = tuple(population[i])
+            if key in self._keys:
+                continue
+            parent = population[i]
+            member = type(parent)(parent)
+            member.fitness.wvalues = parent.fitness.wvalues
+            self.items.append(member)
+            self._keys.add(key)
+            added = True
+
+        if added:
+            self.items.sort(key=lambda ind: ind.fitness.wvalues[0], reverse=True)
+            for removed in self.items[self.maxsize:]:
+                self._keys.discard(tuple(removed))
+            del self.items[self.maxsize:]
@@ -0,0 +1,72 @@
+"""
+Differential-evolution and particle-swarm variation operators for real-coded
+populations. Every operator works on the whole population at once, given as a
+(population_size, dimensions) array, and draws its random numbers from a
+numpy Generator.
+"""
+
+import numpy as np
+
+
+def _distinct_indices(rng, population_size, count):
+    """
+    For every row i, count distinct random indices that are all different from i.
+    :return: a (population_size, count) index array
+    """
+    taken = np.arange(population_size)[:, None]
+    for k in range(count):
+        # draw among the free indices, then step over the taken ones in ascending order:
+        pick = rng.integers(population_size - 1 - k, size=population_size)
+        for column in np.sort(taken, axis=1).T:
+            pick += pick >= column
+        taken = np.column_stack((taken, pick))
+    return taken[:, 1:]
+
+
+def _binomial_crossover(rng, target, mutant, cr):
+    """Takes each gene from the mutant with probability cr, and at least one per row"""
+    population_size, dimensions = target.shape
+    mask = rng.random((population_size, dimensions)) < cr
+    mask[np.arange(population_size), rng.integers(dimensions, size=population_size)] = True
+    return np.where(mask, mutant, target)
+
+
+def de_rand_1_bin(rng, population, f=0.5, cr=0.9):
+    """
+    DE/rand/1/bin: v_i = x_r1 + F (x_r2 - x_r3), binomially crossed with x_i
+    :return: the (population_size, dimensions) trial vectors
+    """
+    r = _distinct_indices(rng, len(population), 3)
+    mutant = population[r[:, 0]] + f * (population[r[:, 1]] - population[r[:, 2]])
+    return _binomial_crossover(rng, population, mutant, cr)
+
+
+def de_current_to_best_1_bin(rng, population, best, f=0.5, cr=0.9):
+    """
+    DE/current-to-best/1/bin: v_i = x_i + F (x_best - x_i) + F (x_r1 - x_r2),
+    binomially crossed with x_i
+    :param best: the (dimensions,) best vector of the population
+    :return: the (population_size, dimensions) trial vectors
+    """
+    r = _distinct_indices(rng, len(population), 2)
+    mutant = (
+        population
+        + f * (best - population)
+        + f * (population[r[:, 0]] - population[r[:, 1]])
+    )
+    return _binomial_crossover(rng, population, mutant, cr)
+
+
+def pso_velocity(rng, positions, velocities, personal_best, global_best, w, c1, c2):
+    """
+    Inertia-weight particle-swarm velocity update:
+    v = w v + c1 r1 (p_i - x_i) + c2 r2 (g - x_i)
+    :return: the new (population_size, dimensions) velocities
+    """
+    r1 = rng.random(positions.shape)
+    r2 = rng.random(positions.shape)
+    return (
+        w * velocities
+        + c1 * r1 * (personal_best - positions)
+        + c2 * r2 * (global_best - positions)
+    )
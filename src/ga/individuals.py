@@ -0,0 +1,112 @@
+"""
+Fitness and individual types of BaseGA.
+
+deap.creator.create() defines its classes on the global deap.creator module, so
+every GA would overwrite the classes of the previous one. The classes here are
+built per (weights, kind) instead and cached, so GAs with different objectives
+or encodings coexist in one process, and GAs with the same ones share their
+types. Fitnesses and individuals pickle through module-level factories, so they
+cross process boundaries (multiprocessing maps, worker pools) without the
+classes having to be importable by name.
+"""
+
+import array
+from copy import deepcopy
+from functools import cache
+
+from deap import base
+
+# typecode of permutation individuals
+PERMUTATION_TYPECODE = "i"
+
+
+class _Fitness(base.Fitness):
+    def __reduce__(self):
+        return _rebuild_fitness, (self.weights, self.wvalues)
+
+
+class _ListIndividual(list):
+    """Individual stored as a list (binary, integer and real encodings)"""
+
+    fitness_class = None
+
+    def __init__(self, genes=()):
+        super().__init__(genes)
+        self.fitness = self.fitness_class()
+
+    def __deepcopy__(self, memo):
+        copy_ = self.__class__.__new__(self.__class__)
+        list.__init__(copy_, self)
+        copy_.__dict__.update(deepcopy(self.__dict__, memo))
+        return copy_
+
+    def __reduce_ex__(self, protocol):
+        return (
+            _rebuild_individual,
+            (self.fitness_class.weights, "list", list(self)),
+            self.__dict__,
+        )
+
+
+class _ArrayIndividual(array.array):
+    """Individual stored as an int array (permutation encoding)"""
+
+    fitness_class = None
+
+    def __new__(cls, genes=()):
+        return super().__new__(cls, PERMUTATION_TYPECODE, genes)
+
+    def __init__(self, genes=()):
+        self.fitness = self.fitness_class()
+
+    def __deepcopy__(self, memo):
+        copy_ = self.__class__(self)
+        copy_.__dict__.update(deepcopy(self.__dict__, memo))
+        return copy_
+
+    def __reduce_ex__(self, protocol):
+        return (
+            _rebuild_individual,
+            (self.fitness_class.weights, "array", self.tolist()),
+            self.__dict__,
+        )
+
+
+_BASES = {"list": _ListIndividual, "array": _ArrayIndividual}
+
+
+def fitness_class(weights):
+    """
+    :param weights: tuple of objective weights (1.0 maximizes, -1.0 minimizes)
+    :return: the Fitness class with those weights
+    """
+    return _fitness_class(tuple(weights))
+
+
+@cache
+def _fitness_class(weights):
+    return type("Fitness", (_Fitness,), {"weights": weights})
+
+
+def individual_class(weights, kind="list"):
+    """
+    :param weights: tuple of objective weights of the individual's fitness
+    :param kind: "list", or "array" for permutations
+    :return: the Individual class of that fitness and storage
+    """
+    return _individual_class(tuple(weights), kind)
+
+
+@cache
+def _individual_class(weights, kind):
+    return type("Individual", (_BASES[kind],), {"fitness_class": fitness_class(weights)})
+
+
+def _rebuild_fitness(weights, wvalues):
+    fitness = fitness_class(weights)()
+    fitness.wvalues = wvalues
+    return fitness
+
+
+def _rebuild_individual(weights, kind, genes):
+    return individual_class(weights, kind)(genes)
@@ -0,0 +1,99 @@
+"""
+Local search over incremental evaluation states.
+
+A state (e.g. NurseScheduleState, TimetableState) exposes:
+    cost                  -> current cost (minimized)
+    delta(move)           -> cost change of a move, without applying it
+    apply(move)           -> applies a move and returns the cost change
+    randomMove(rng)       -> a random move of the neighbourhood
+    moveAttribute(move)   -> the attribute made tabu once the move is applied
+    toList() / reset(sol) -> read back / restore a solution
+"""
+
+import math
+import random
+
+
+def hill_climbing(state, max_iters=1000, max_no_improve=200, rng=random):
+    """
+    First-improvement hill climbing over randomly sampled moves.
+    Stops after max_iters samples or max_no_improve consecutive non-improving ones.
+    :return: the final cost of the state
+    """
+    no_improve = 0
+    for _ in range(max_iters):
+        move = state.randomMove(rng)
+        if state.delta(move) < 0:
+            state.apply(move)
+            no_improve = 0
+        else:
+            no_improve += 1
+            if no_improve >= max_no_improve:
+                break
+    return state.cost
+
+
+def tabu_search(state, max_iters=200, candidates=20, tenure=10, rng=random):
+    """
+    Tabu search: each iteration applies the best of a sample of candidate moves,
+    skipping tabu ones unless they improve on the best cost found so far.
+    The state is restored to the best solution found before returning.
+    :return: the best cost found
+    """
+    best_cost = state.cost
+    best_solution = state.toList()
+    tabu_until = {}
+
+    for iteration in range(max_iters):
+        best_move, best_delta = None, None
+        for _ in range(candidates):
+            move = state.randomMove(rng)
+            delta = state.delta(move)
+            is_tabu = tabu_until.get(state.moveAttribute(move), -1) >= iteration
+            if is_tabu and state.cost + delta >= best_cost:
+                continue
+            if best_delta is None or delta < best_delta:
+                best_move, best_delta = move, delta
+
+        if best_move is None:
+            continue
+
+        state.apply(best_move)
+        tabu_until[state.moveAttribute(best_move)] = iteration + tenure
+
+        if state.cost < best_cost:
+            best_cost = state.cost
+            best_solution = state.toList()
+
+    # --- Restore the best solution found ---
+    if state.cost != best_cost:
+        state.reset(best_solution)
+    return best_cost
+
+
+def simulated_annealing(
+    state, max_iters=2000, start_temp=10.0, cooling=0.995, rng=random
+):
+    """
+    Simulated annealing over randomly sampled moves with geometric cooling.
+    The state is restored to the best solution found before returning.
+    :return: the best cost found
+    """
+    best_cost = state.cost
+    best_solution = state.toList()
+    temp = start_temp
+
+    for _ in range(max_iters):
+        move = state.randomMove(rng)
+        delta = state.delta(move)
+        if delta <= 0 or rng.random() < math.exp(-delta / temp):
+            state.apply(move)
+            if state.cost < best_cost:
+                best_cost = state.cost
+                best_solution = state.toList()
+        temp = max(temp * cooling, 1e-9)
+
+    # --- Restore the best solution found ---
+    if state.cost != best_cost:
+        state.reset(best_solution)
+    return best_cost
@@ -0,0 +1,136 @@
+"""
+NSGA-II building blocks over objective matrices.
+
+All functions take a (population_size, objectives) array to be minimized (BaseGA
+passes the negated weighted fitness, -fitness.wvalues) and return index or value
+arrays, so a generation of a few thousand individuals is sorted without Python
+loops over pairs of individuals.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+
+def weighted_objectives(individuals):
+    """:return: the (len(individuals), objectives) matrix of fitness.wvalues"""
+    return np.array([ind.fitness.wvalues for ind in individuals], dtype=float)
+
+
+def _sort_two_objectives(objectives):
+    """
+    Front ranks of 2 objectives by a sweep in O(n log n): in lexicographic order,
+    each point joins the first front whose latest point (the one with the lowest
+    second objective so far) does not dominate it.
+    """
+    order = np.lexsort((objectives[:, 1], objectives[:, 0]))
+    first, second = objectives[order, 0].tolist(), objectives[order, 1].tolist()
+    ranks = np.empty(len(objectives), dtype=int)
+    front_last = []  # lowest second objective of each front, non-decreasing
+    front_point = []  # the point that set it
+    for position, index in enumerate(order.tolist()):
+        point = (first[position], second[position])
+        front = bisect_right(front_last, point[1])
+        # a duplicate of a front's latest point belongs to that front
+        if front > 0 and front_point[front - 1] == point:
+            front -= 1
+        elif front == len(front_last):
+            front_last.append(point[1])
+            front_point.append(point)
+        else:
+            front_last[front] = point[1]
+            front_point[front] = point
+        ranks[index] = front
+    return ranks
+
+
+def _sort_by_dominance(objectives, chunk=1024):
+    """
+    Front ranks of any number of objectives from the dominance matrix, built in
+    chunks of rows, then peeled front by front.
+    """
+    n = len(objectives)
+    dominates = np.empty((n, n), dtype=bool)
+    for start in range(0, n, chunk):
+        block = objectives[start:start + chunk, None, :]
+        dominates[start:start + chunk] = np.all(block <= objectives[None], axis=2) & np.any(
+            block < objectives[None], axis=2
+        )
+
+    dominated_count = dominates.sum(axis=0)
+    ranks = np.full(n, -1, dtype=int)
+    front = np.flatnonzero(dominated_count == 0)
+    rank = 0
+    while len(front):
+        ranks[front] = rank
+        dominated_count -= dominates[front].sum(axis=0)
+        dominated_count[front] = -1
+        front = np.flatnonzero(dominated_count == 0)
+        rank += 1
+    return ranks
+
+
+def non_dominated_sort(objectives):
+    """
+    :param objectives: (population_size, objectives) array, minimized
+    :return: the front rank of every individual (0 = non-dominated)
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if objectives.shape[1] == 1:
+        _, ranks = np.unique(objectives[:, 0], return_inverse=True)
+        return ranks.reshape(-1)
+    if objectives.shape[1] == 2:
+        return _sort_two_objectives(objectives)
+    return _sort_by_dominance(objectives)
+
+
+def crowding_distance(objectives, ranks):
+    """
+    Crowding distance of every individual within its front: the normalized
+    perimeter of the box spanned by its neighbours, infinite at the front's ends
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n, m = objectives.shape
+    distance = np.zeros(n)
+    for k in range(m):
+        # sort by front, then by this objective: neighbours within a front are adjacent
+        order = np.lexsort((objectives[:, k], ranks))
+        values = objectives[order, k]
+        fronts = ranks[order]
+        starts = np.r_[True, fronts[1:] != fronts[:-1]]
+        ends = np.r_[fronts[1:] != fronts[:-1], True]
+
+        # per-front range of the objective, broadcast to the front's members
+        front_id = np.cumsum(starts) - 1
+        span = (values[ends] - values[starts])[front_id]
+        gaps = np.zeros(n)
+        inner = ~(starts | ends)
+        gaps[inner] = (values[2:] - values[:-2])[inner[1:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gaps = np.where(span > 0, gaps / span, 0.0)
+        gaps[starts | ends] = np.inf
+        distance[order] += gaps
+    return distance
+
+
+def crowded_tournament(rng, ranks, crowding, count):
+    """
+    Binary tournaments on (lower rank, then larger crowding distance)
+    :return: the indices of the count winners
+    """
+    contestants = rng.integers(len(ranks), size=(count, 2))
+    a, b = contestants[:, 0], contestants[:, 1]
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] >= crowding[b]))
+    return np.where(a_wins, a, b)
+
+
+def environmental_selection(objectives, count):
+    """
+    NSGA-II survivor selection: whole fronts in rank order, the last one cut by
+    crowding distance
+    :return: (indices of the count survivors, their ranks, their crowding distances)
+    """
+    ranks = non_dominated_sort(objectives)
+    crowding = crowding_distance(objectives, ranks)
+    survivors = np.lexsort((-crowding, ranks))[:count]
+    return survivors, ranks[survivors], crowding[survivors]
@@ -1,11 +1,78 @@
+import os
+import random
+
 from src.problems.nurses import NurseSchedulingProblem
+from src.ga.local_search import hill_climbing, tabu_search
 
 HARD_CONSTRAINT_PENALTY = 10
 
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../../data/nurses"
+)
+
 # create instance
 nsp = NurseSchedulingProblem(HARD_CONSTRAINT_PENALTY)
 
 
 # fitness calculation
-def nurses_fitness(individual):
-    return (nsp.getCost(individual),)
+def nurses_fitness(individual, problem=nsp):
+    return (problem.getCost(individual),)
+
+
+# (hard constraint violations, soft preference violations), for multi-objective runs
+def nurses_objectives(individual, problem=nsp):
+    return problem.getObjectives(individual)
+
+
+# constructive initial roster respecting the coverage bounds
+def nurses_init(seed, problem=nsp):
+    return problem.constructSchedule(seed)
+
+
+# bit-flip mutation evaluated incrementally: the cost of a mutant with a valid fitness
+# moves by the delta of each flip, O(nurses + shifts per week) from the genome; at these
+# flip rates that beats building a NurseScheduleState (O(n), then O(1) per flip).
+# Returns the individual and whether it was evaluated in full (a crossed child, with no
+# valid fitness)
+def nurses_mutate(individual, indpb=0.005, problem=nsp):
+    flips = [i for i in range(len(individual)) if random.random() < indpb]
+    if not individual.fitness.valid:
+        for i in flips:
+            individual[i] = 1 - individual[i]
+        individual.fitness.values = (problem.getCost(individual),)
+        return individual, True
+    cost = individual.fitness.values[0]
+    for i in flips:
+        cost += problem.flipDelta(individual, i)
+        individual[i] = 1 - individual[i]
+    individual.fitness.values = (cost,)
+    return individual, False
+
+
+# bit-flip local search applied to the best offspring
+def nurses_local_search(individual, method="hill_climbing", problem=nsp):
+    state = problem.getState(individual)
+    if method == "tabu":
+        tabu_search(state)
+    else:
+        hill_climbing(state)
+    individual[:] = state.toList()
+    individual.fitness.values = (state.cost,)
+
+
+# file-based instance, e.g. "synthetic_200x4" for data/nurses/synthetic_200x4.nsp
+def load_nsp(name):
+    return NurseSchedulingProblem.fromFile(
+        os.path.join(DATA_PATH, f"{name}.nsp"), HARD_CONSTRAINT_PENALTY
+    )
+
+
+# synthetic instance of a given size, for scaling runs
+def synthetic_nsp(num_nurses=200, weeks=4, tightness=0.5, seed=0):
+    return NurseSchedulingProblem.generate(
+        HARD_CONSTRAINT_PENALTY,
+        numNurses=num_nurses,
+        weeks=weeks,
+        tightness=tightness,
+        seed=seed,
+    )
@@ -0,0 +1,197 @@
+"""
+Opt-in phase profiling for BaseGA.run.
+
+BaseGA wraps each phase of a run (selection, cloning, crossover, mutation,
+evaluation, statistics, printing, ...) in profiler.phase(name) and reports its
+counters through profiler.count(name, n). NULL_PROFILER, used when profiling is
+off, turns both into no-ops; PhaseProfiler records cumulative and per-generation
+timings and counters, optionally traced memory, and exports the recorded phases
+as a Chrome trace (chrome://tracing, Perfetto, speedscope) or as folded stacks
+(flamegraph.pl, speedscope).
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+
+class NullProfiler:
+    """Profiler that records nothing; the default of BaseGA"""
+
+    enabled = False
+    _phase = nullcontext()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, n=1):
+        pass
+
+    def start(self):
+        pass
+
+    def next_generation(self, generation):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Phase:
+    """Times one phase and records it into the profiler on exit"""
+
+    __slots__ = ("profiler", "name", "begin")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append(self.name)
+        self.begin = time.perf_counter()
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.begin
+        profiler = self.profiler
+        path = ";".join(profiler._stack)
+        profiler._stack.pop()
+
+        profiler.totals[self.name] = profiler.totals.get(self.name, 0.0) + duration
+        profiler.calls[self.name] = profiler.calls.get(self.name, 0) + 1
+        timings = profiler._current["timings"]
+        timings[self.name] = timings.get(self.name, 0.0) + duration
+        profiler.events.append((path, self.begin - profiler._origin, duration, profiler.generation))
+
+
+class PhaseProfiler:
+    """
+    Records, for every phase, the cumulative time and number of calls, and the time
+    spent in each generation; counters (evaluations, cache hits, invalidated
+    individuals, ...) are kept the same way.
+    With memory=True, tracemalloc runs during the profiled run: the traced memory is
+    recorded after every generation and the largest allocation sites at the end.
+    """
+
+    enabled = True
+
+    def __init__(self, memory=False, memory_top=10):
+        self.memory = memory
+        self.memory_top = memory_top
+        self.start()
+
+    def start(self):
+        """Clears the recorded data; called by BaseGA at the start of a run"""
+        self.totals = {}
+        self.calls = {}
+        self.counters = {}
+        self.generations = []
+        self.events = []
+        self.generation = 0
+        self.memory_snapshot = None
+        self._stack = []
+        self._current = {"generation": 0, "timings": {}, "counters": {}}
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def phase(self, name):
+        """Context manager timing the enclosed block as the given phase"""
+        return _Phase(self, name)
+
+    def count(self, name, n=1):
+        """Adds n to the named counter"""
+        self.counters[name] = self.counters.get(name, 0) + n
+        counters = self._current["counters"]
+        counters[name] = counters.get(name, 0) + n
+
+    def next_generation(self, generation):
+        """Closes the record of the current generation and starts the next one"""
+        self._close_generation()
+        self.generation = generation
+        self._current = {"generation": generation, "timings": {}, "counters": {}}
+
+    def _close_generation(self):
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self._current["memory"] = {"current": current, "peak": peak}
+        self.generations.append(self._current)
+
+    def stop(self):
+        """Closes the last generation and takes the memory snapshot"""
+        self._close_generation()
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            self.memory_snapshot = [
+                {"location": str(stat.traceback), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[: self.memory_top]
+            ]
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    def report(self):
+        """
+        :return: a JSON-serializable dict of the recorded data; generation 0 is the
+        initial population
+        """
+        report = {
+            "totals": dict(self.totals),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+            "generations": self.generations,
+        }
+        if self.memory:
+            report["memory_top"] = self.memory_snapshot
+        return report
+
+    def chrome_trace(self):
+        """
+        :return: the recorded phases as a Chrome trace event list
+        """
+        return [
+            {
+                "name": path.rsplit(";", 1)[-1],
+                "cat": "ga",
+                "ph": "X",
+                "ts": begin * 1e6,
+                "dur": duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": {"generation": generation},
+            }
+            for path, begin, duration, generation in self.events
+        ]
+
+    def folded_stacks(self):
+        """
+        :return: "phase;subphase microseconds" lines of self time, the input format of
+        flamegraph.pl
+        """
+        totals = {}
+        for path, _, duration, _ in self.events:
+            totals[path] = totals.get(path, 0.0) + duration
+        self_times = dict(totals)
+        for path, duration in totals.items():
+            if ";" in path:
+                parent = path.rsplit(";", 1)[0]
+                self_times[parent] = self_times.get(parent, 0.0) - duration
+        return [
+            f"{path} {max(round(duration * 1e6), 0)}"
+            for path, duration in sorted(self_times.items())
+        ]
+
+    def write_trace(self, path):
+        """
+        Writes the recorded phases to path: folded stacks for a .folded/.txt file,
+        a Chrome trace (JSON) otherwise
+        """
+        with open(path, "w") as f:
+            if path.endswith((".folded", ".txt")):
+                f.write("\n".join(self.folded_stacks()) + "\n")
+            else:
+                json.dump({"traceEvents": self.chrome_trace()}, f)
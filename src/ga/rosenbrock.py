@@ -5,5 +5,10 @@ rosenbrock = RosenbrockProblem()
 
 
 # fitness calculation
-def rosenbrock_fitness(individual):
-    return rosenbrock.fitness(individual)
+def rosenbrock_fitness(individual, problem=rosenbrock):
+    return problem.fitness(individual)
+
+
+# fitness calculation of a whole population in one call
+def rosenbrock_batch_fitness(population, problem=rosenbrock):
+    return problem.fitnessBatch(population)
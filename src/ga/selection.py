@@ -0,0 +1,64 @@
+"""
+Vectorized selection schemes. Each one takes a numpy Generator, the weighted
+fitness vector of the population (fitness.wvalues[0], so larger is always
+better) and the number of individuals to select, and returns an index array
+into the population.
+"""
+
+import numpy as np
+
+
+def tournament(rng, fitness, count, size=3):
+    """Best of size uniformly drawn contestants (with replacement), count times"""
+    contestants = rng.integers(len(fitness), size=(count, size))
+    winners = np.argmax(fitness[contestants], axis=1)
+    return contestants[np.arange(count), winners]
+
+
+def _sus_indices(rng, weights, count):
+    """Stochastic universal sampling of count indices proportionally to weights"""
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1]
+    if not total > 0:
+        return rng.integers(len(weights), size=count)
+    step = total / count
+    pointers = rng.uniform(0.0, step) + step * np.arange(count)
+    indices = np.searchsorted(cumulative, pointers, side="right")
+    # sampling order is otherwise sorted by index, which would bias mating pairs
+    return rng.permutation(np.minimum(indices, len(weights) - 1))
+
+
+def sus(rng, fitness, count):
+    """
+    Stochastic universal sampling, proportional to the fitness above the worst one
+    (so it works for minimization and negative fitness too)
+    """
+    return _sus_indices(rng, fitness - fitness.min(), count)
+
+
+def rank(rng, fitness, count, pressure=1.5):
+    """
+    Linear ranking: the best individual gets pressure (1 < pressure <= 2) times the
+    average selection probability, the worst one 2 - pressure times; sampled with SUS
+    """
+    n = len(fitness)
+    ranks = np.empty(n)
+    ranks[np.argsort(fitness, kind="stable")] = np.arange(n)
+    weights = (2.0 - pressure) + 2.0 * (pressure - 1.0) * ranks / max(n - 1, 1)
+    return _sus_indices(rng, weights, count)
+
+
+def truncation(rng, fitness, count, fraction=0.5):
+    """Uniform selection among the best fraction of the population"""
+    top = max(1, int(np.ceil(fraction * len(fitness))))
+    best = np.argpartition(-fitness, top - 1)[:top]
+    return best[rng.integers(top, size=count)]
+
+
+# selection schemes by BaseGA(selection=...) name
+SELECTION_SCHEMES = {
+    "tournament": tournament,
+    "sus": sus,
+    "rank": rank,
+    "truncation": truncation,
+}
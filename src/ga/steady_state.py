@@ -0,0 +1,98 @@
+"""
+Asynchronous steady-state evaluation for BaseGA(steady_state=...).
+
+The workers always have evaluations outstanding: as soon as any of them returns,
+its individual is inserted into the population by a replacement policy and a new
+offspring, bred from the current population, is submitted in its place, so slow
+evaluations never hold the others up. Completion order, and therefore the run,
+depends on the evaluation times: steady-state runs are not reproducible from the
+seed alone.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+# fitness function of a process worker, set once by its initializer
+_fitness_func = None
+
+
+def _init_worker(fitness_func):
+    global _fitness_func
+    _fitness_func = fitness_func
+
+
+def _timed_evaluate(individual, fitness_func=None):
+    """:return: (fitness values, seconds spent in the fitness function)"""
+    start = time.perf_counter()
+    values = (fitness_func or _fitness_func)(individual)
+    return values, time.perf_counter() - start
+
+
+def make_executor(kind, workers, fitness_func):
+    """
+    :param kind: "process" (the fitness function is sent once per worker) or "thread"
+    :return: (executor, submit(individual) -> future of _timed_evaluate)
+    """
+    if kind == "process":
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(fitness_func,)
+        )
+        return executor, lambda individual: executor.submit(_timed_evaluate, individual)
+    if kind == "thread":
+        executor = ThreadPoolExecutor(max_workers=workers)
+        return executor, lambda individual: executor.submit(_timed_evaluate, individual, fitness_func)
+    raise ValueError(f"Unsupported executor {kind!r}")
+
+
+# Replacement policies: each one takes the numpy Generator, the weighted fitness
+# vector of the population (larger is better), the weighted fitness of the newcomer
+# and the insertion order of the members, and returns the index of the member to
+# replace, or -1 to discard the newcomer.
+
+def replace_worst(rng, fitness, child, ages):
+    """The worst member, if the newcomer is at least as good"""
+    worst = int(np.argmin(fitness))
+    return worst if child >= fitness[worst] else -1
+
+
+def replace_inverse_tournament(rng, fitness, child, ages, size=3):
+    """The worst of size random members, if the newcomer is at least as good"""
+    contestants = rng.integers(len(fitness), size=size)
+    loser = int(contestants[np.argmin(fitness[contestants])])
+    return loser if child >= fitness[loser] else -1
+
+
+def replace_oldest(rng, fitness, child, ages):
+    """The longest-standing member, unconditionally (first in, first out)"""
+    return int(np.argmin(ages))
+
+
+# replacement policies by steady_state={"replacement": ...} name
+REPLACEMENT_POLICIES = {
+    "worst": replace_worst,
+    "inverse_tournament": replace_inverse_tournament,
+    "oldest": replace_oldest,
+}
+
+
+def steady_state_options(options):
+    """
+    Normalizes BaseGA(steady_state=...): True or a dict of "workers" (default: CPU
+    count), "executor" ("process" or "thread"), "replacement" and "replacement_params"
+    """
+    options = dict(options) if isinstance(options, dict) else {}
+    unknown = set(options) - {"workers", "executor", "replacement", "replacement_params"}
+    if unknown:
+        raise ValueError(f"Unsupported steady-state options {sorted(unknown)}")
+    options.setdefault("workers", os.cpu_count() or 1)
+    options.setdefault("executor", "process")
+    options.setdefault("replacement", "worst")
+    options.setdefault("replacement_params", {})
+    if options["replacement"] not in REPLACEMENT_POLICIES:
+        raise ValueError(f"Unsupported replacement policy {options['replacement']!r}")
+    if options["executor"] not in ("process", "thread"):
+        raise ValueError(f"Unsupported executor {options['executor']!r}")
+    return options
@@ -0,0 +1,107 @@
+"""
+Streams BaseGA.run_iter() snapshots to a file while the run goes on, one record
+per generation, so dashboards or early-stopping controllers can follow a run
+(e.g. with tail -f) without the whole history being buffered.
+
+    with SnapshotWriter("run.ndjson") as writer:
+        results = ga.run(progress=writer.write)
+
+    for snapshot in stream_run(ga.run_iter(), "run.csv"):
+        if snapshot["best_fitness"] < 1e-6:
+            break
+"""
+
+import csv
+import json
+
+# scalar snapshot fields written by default
+SNAPSHOT_FIELDS = (
+    "generation",
+    "stage",
+    "best_fitness",
+    "mean_fitness",
+    "entropy",
+    "evaluations",
+    "elapsed",
+    "generation_time",
+    "evaluations_to_target",
+    "time_to_target",
+)
+
+
+class SnapshotWriter:
+    """
+    Appends snapshots to an NDJSON file (one JSON object per line, for .ndjson and
+    .jsonl paths) or to a CSV file (one column per field, for .csv paths).
+    """
+
+    def __init__(self, path, fields=SNAPSHOT_FIELDS, include_best=False, append=False, flush_every=1):
+        """
+        :param path: the file to write
+        :param fields: the snapshot fields to write
+        :param include_best: also write the genome of the best individual ("best")
+        :param append: append to an existing file instead of overwriting it
+        :param flush_every: flush the file every that many snapshots
+        """
+        if path.endswith((".ndjson", ".jsonl")):
+            self.format = "ndjson"
+        elif path.endswith(".csv"):
+            self.format = "csv"
+        else:
+            raise ValueError(f"Unsupported snapshot file {path!r} (use .ndjson, .jsonl or .csv)")
+
+        self.fields = tuple(fields) + (("best",) if include_best else ())
+        self.flush_every = flush_every
+        self.count = 0
+        self.file = open(path, "a" if append else "w", newline="")
+        if self.format == "csv":
+            self.csv = csv.writer(self.file)
+            if self.file.tell() == 0:
+                self.csv.writerow(self.fields)
+
+    def write(self, snapshot):
+        """Writes one snapshot; returns None, so it can serve as a run(progress=...) callback"""
+        record = [snapshot.get(field) for field in self.fields]
+        if "best" in snapshot and self.fields[-1] == "best":
+            record[-1] = list(snapshot["best"])
+
+        if self.format == "ndjson":
+            self.file.write(json.dumps(dict(zip(self.fields, record)), default=_to_json) + "\n")
+        else:
+            self.csv.writerow(
+                "" if value is None else json.dumps(value) if isinstance(value, list) else value
+                for value in record
+            )
+
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _to_json(value):
+    # numpy scalars
+    return value.item()
+
+
+def stream_run(snapshots, path, **kwargs):
+    """
+    Writes every snapshot of a run_iter() generator to path while passing it on;
+    breaking out of the loop closes both the file and the run.
+    :param kwargs: SnapshotWriter arguments
+    """
+    try:
+        with SnapshotWriter(path, **kwargs) as writer:
+            for snapshot in snapshots:
+                writer.write(snapshot)
+                yield snapshot
+    finally:
+        snapshots.close()
@@ -0,0 +1,244 @@
+"""
+Surrogate-assisted pre-screening of offspring, for expensive fitness functions.
+
+A cheap model, trained online on every individual evaluated so far (genomes as
+feature vectors, weighted fitness as target, so larger is better), predicts the
+fitness of the new offspring; only the most promising fraction of them, plus a
+few random ones that keep the model honest, goes to the real fitness function.
+BaseGA replaces the other offspring by copies of their parents, so the population
+only ever holds real fitness values.
+
+    ga = BaseGA.from_problem(cfg, surrogate={"model": "knn", "fraction": 0.3})
+    results = ga.run()
+    results["surrogate"]["saved_evaluations"]
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+
+
+class KNNSurrogate:
+    """Inverse-distance weighted mean fitness of the k nearest archived genomes"""
+
+    def __init__(self, k=5):
+        self.k = k
+
+    def fit(self, features, targets):
+        self.features = features
+        self.targets = targets
+        self.norms = np.einsum("ij,ij->i", features, features)
+
+    def predict(self, features):
+        distances = (
+            np.einsum("ij,ij->i", features, features)[:, None]
+            + self.norms[None, :]
+            - 2.0 * features @ self.features.T
+        )
+        np.maximum(distances, 0.0, out=distances)
+        k = min(self.k, len(self.targets))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        weights = 1.0 / (np.sqrt(np.take_along_axis(distances, nearest, axis=1)) + 1e-12)
+        return (weights * self.targets[nearest]).sum(axis=1) / weights.sum(axis=1)
+
+
+class RidgeSurrogate:
+    """Ridge regression on standardized genes, solved in the primal or dual form, whichever is smaller"""
+
+    def __init__(self, alpha=1.0):
+        self.alpha = alpha
+
+    def fit(self, features, targets):
+        self.mean = features.mean(axis=0)
+        self.scale = features.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        self.offset = targets.mean()
+        x = (features - self.mean) / self.scale
+        y = targets - self.offset
+        n, d = x.shape
+        if n >= d:
+            self.coef = np.linalg.solve(x.T @ x + self.alpha * np.eye(d), x.T @ y)
+        else:
+            self.coef = x.T @ np.linalg.solve(x @ x.T + self.alpha * np.eye(n), y)
+
+    def predict(self, features):
+        return ((features - self.mean) / self.scale) @ self.coef + self.offset
+
+
+# surrogate models by SurrogateScreen(model=...) name
+SURROGATE_MODELS = {
+    "knn": KNNSurrogate,
+    "ridge": RidgeSurrogate,
+}
+
+
+class SurrogateScreen:
+    """
+    Archive of evaluated individuals, the model trained on it, and the screening of
+    offspring with its evaluation-saving statistics
+    """
+
+    def __init__(
+        self,
+        model="knn",
+        fraction=0.5,
+        explore=0.1,
+        retrain_every=1,
+        min_samples=20,
+        archive_size=2000,
+        **model_params,
+    ):
+        """
+        :param model: "knn", "ridge" or an object with fit(features, targets) and
+        predict(features) methods
+        :param fraction: share of the screened offspring sent to the real fitness function
+        :param explore: share of those evaluations given to random rejected offspring
+        :param retrain_every: retrain the model every that many screenings
+        :param min_samples: archive size below which every offspring is evaluated
+        :param archive_size: number of most recent evaluated individuals trained on
+        :param model_params: arguments of the named model (k, alpha)
+        """
+        if not 0.0 < fraction <= 1.0:
+            raise ValueError("The surrogate fraction must be in (0, 1]")
+        if isinstance(model, str):
+            if model not in SURROGATE_MODELS:
+                raise ValueError(f"Unsupported surrogate model {model!r}")
+            self._model_factory = lambda: SURROGATE_MODELS[model](**model_params)
+        else:
+            self._model_factory = lambda: model
+        self.fraction = fraction
+        self.explore = explore
+        self.retrain_every = retrain_every
+        self.min_samples = min_samples
+        self.archive_size = archive_size
+        self.reset()
+
+    def reset(self):
+        """Empties the archive and the statistics; called at the start of a run"""
+        self.model = self._model_factory()
+        self.trained = False
+        self._features = None
+        self._targets = np.empty(self.archive_size)
+        self._count = 0  # individuals archived so far, the archive is a ring buffer
+        self._screens_since_training = 0
+        self._new_samples = 0
+        self.screenings = 0
+        self.candidates = 0
+        self.evaluated = 0
+        self.retrains = 0
+        self.training_time = 0.0
+        self.prediction_time = 0.0
+        self.rank_correlations = []
+        self._chosen = None
+
+    def observe(self, individuals):
+        """Archives evaluated individuals (genome and weighted fitness)"""
+        if not individuals:
+            return
+        features = np.asarray(individuals, dtype=float).reshape(len(individuals), -1)
+        targets = np.fromiter((ind.fitness.wvalues[0] for ind in individuals), float, len(individuals))
+        if self._features is None:
+            self._features = np.empty((self.archive_size, features.shape[1]))
+        features, targets = features[-self.archive_size:], targets[-self.archive_size:]
+        slots = (self._count + np.arange(len(targets))) % self.archive_size
+        self._features[slots] = features
+        self._targets[slots] = targets
+        self._count += len(targets)
+        self._new_samples += len(targets)
+
+    def _train(self):
+        size = min(self._count, self.archive_size)
+        start = time.perf_counter()
+        self.model.fit(self._features[:size].copy(), self._targets[:size].copy())
+        self.training_time += time.perf_counter() - start
+        self.trained = True
+        self.retrains += 1
+        self._screens_since_training = 0
+        self._new_samples = 0
+
+    def screen(self, rng, candidates):
+        """
+        :param rng: numpy Generator, for the exploration picks
+        :param candidates: unevaluated individuals
+        :return: the positions of the candidates to evaluate with the real fitness function
+        """
+        self.screenings += 1
+        self.candidates += len(candidates)
+        self._screens_since_training += 1
+        self._chosen = None
+        if min(self._count, self.archive_size) < self.min_samples:
+            self.evaluated += len(candidates)
+            return np.arange(len(candidates))
+        if not self.trained or (
+            self._new_samples and self._screens_since_training >= self.retrain_every
+        ):
+            self._train()
+
+        start = time.perf_counter()
+        features = np.asarray(candidates, dtype=float).reshape(len(candidates), -1)
+        self._predicted = self.model.predict(features)
+        self.prediction_time += time.perf_counter() - start
+
+        budget = max(1, math.ceil(self.fraction * len(candidates)))
+        explored = min(int(self.explore * budget), len(candidates) - budget)
+        order = np.argsort(-self._predicted, kind="stable")
+        chosen = order[:budget - explored]
+        if explored:
+            chosen = np.concatenate((chosen, rng.choice(order[budget - explored:], explored, replace=False)))
+        self._chosen = chosen
+        self.evaluated += len(chosen)
+        return chosen
+
+    def record(self, evaluated):
+        """
+        Scores the last predictions against the real fitness of the evaluated candidates
+        (Spearman rank correlation)
+        :param evaluated: the candidates at the positions screen() returned, evaluated
+        """
+        if len(evaluated) < 3 or not self.trained or self._chosen is None:
+            return
+        actual = np.fromiter((ind.fitness.wvalues[0] for ind in evaluated), float, len(evaluated))
+        predicted = self._predicted[self._chosen]
+        ranks = [np.argsort(np.argsort(values, kind="stable")) for values in (predicted, actual)]
+        if ranks[0].std() > 0 and ranks[1].std() > 0:
+            self.rank_correlations.append(float(np.corrcoef(*ranks)[0, 1]))
+        self._chosen = None
+
+    def report(self):
+        """:return: the evaluation savings and the model statistics of the run"""
+        saved = self.candidates - self.evaluated
+        return {
+            "screenings": self.screenings,
+            "candidates": self.candidates,
+            "evaluated": self.evaluated,
+            "saved_evaluations": saved,
+            "saving_ratio": saved / self.candidates if self.candidates else 0.0,
+            "retrains": self.retrains,
+            "training_time": self.training_time,
+            "prediction_time": self.prediction_time,
+            "mean_rank_correlation": (
+                float(np.mean(self.rank_correlations)) if self.rank_correlations else None
+            ),
+        }
+
+
+class DelayedFitness:
+    """
+    A fitness function slowed down by a delay per call, to emulate an expensive one on
+    the bundled problems (picklable, so it also works with process pools). With jitter,
+    the delay is drawn uniformly from delay * (1 +/- jitter), for uneven evaluation times.
+    """
+
+    def __init__(self, fitness_func, delay, jitter=0.0):
+        self.fitness_func = fitness_func
+        self.delay = delay
+        self.jitter = jitter
+
+    def __call__(self, individual):
+        delay = self.delay
+        if self.jitter:
+            delay *= 1.0 + self.jitter * random.uniform(-1.0, 1.0)
+        time.sleep(delay)
+        return self.fitness_func(individual)
@@ -1,11 +1,85 @@
+import os
+import random
+
 from src.problems.timetabling import TimetablingProblem
+from src.ga.local_search import simulated_annealing, tabu_search
 
 HARD_CONSTRAINT_PENALTY = 10
 
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../../data/timetabling"
+)
+
 # create instance
 timetable_instance = TimetablingProblem(HARD_CONSTRAINT_PENALTY)
 
 
 # fitness calculation
-def timetable_fitness(individual):
-    return (timetable_instance.getCost(individual),)
+def timetable_fitness(individual, problem=timetable_instance):
+    return (problem.getCost(individual),)
+
+
+# fitness calculation of a whole population in one call
+def timetable_batch_fitness(population, problem=timetable_instance):
+    return problem.getCosts(population)
+
+
+# (hard constraint violations, soft cost), for multi-objective runs
+def timetable_objectives(individual, problem=timetable_instance):
+    return problem.getObjectives(individual)
+
+
+# (hard, soft) rows of a whole population in one call
+def timetable_batch_objectives(population, problem=timetable_instance):
+    return problem.getObjectivesBatch(population)
+
+
+# constructive initial timetable in saturation-degree order
+def timetable_init(seed, problem=timetable_instance):
+    return problem.constructTimetable(seed)
+
+
+# module-move mutation evaluated incrementally: the first move builds a TimetableState, whose
+# occupancy counts give the repair moves and their cost deltas without rescanning the genome;
+# the state build is a full evaluation, as is a crossed child (no valid fitness) left unmoved
+def timetable_mutate(individual, indpb=0.05, problem=timetable_instance):
+    state = None
+    for module in range(len(individual)):
+        if random.random() < indpb:
+            if state is None:
+                state = problem.getState(individual)
+            _, gene = move = state.repairMove(module, random)
+            state.apply(move)
+            individual[module] = gene
+    if state is not None:
+        individual.fitness.values = (state.cost,)
+    elif not individual.fitness.valid:
+        individual.fitness.values = (problem.getCost(individual),)
+    else:
+        return individual, False
+    return individual, True
+
+
+# module-move local search applied to the best offspring
+def timetable_local_search(individual, method="annealing", problem=timetable_instance):
+    state = problem.getState(individual)
+    if method == "tabu":
+        tabu_search(state)
+    else:
+        simulated_annealing(state, max_iters=500)
+    individual[:] = state.toList()
+    individual.fitness.values = (state.cost,)
+
+
+# file-based instance, e.g. "synthetic_1000" for data/timetabling/synthetic_1000.json
+def load_timetable(name):
+    return TimetablingProblem.fromFile(
+        os.path.join(DATA_PATH, f"{name}.json"), HARD_CONSTRAINT_PENALTY
+    )
+
+
+# synthetic instance of a given size, for scaling runs
+def synthetic_timetable(num_modules=1000, seed=0):
+    return TimetablingProblem.generate(
+        HARD_CONSTRAINT_PENALTY, numModules=num_modules, seed=seed
+    )
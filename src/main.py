@@ -1,16 +1,33 @@
-from ga.base_ga import BaseGA
-import seaborn as sns
-import matplotlib.pyplot as plt
-from config.setting import PROBLEMS, DEFAULT_GA_PARAMS
+import argparse
+import ast
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-PROBLEM = "timetabling"  # options: "tsp", "knapsack", "nurses", "timetabling", "rosenbrock, "integer", "real"
+from src.ga.base_ga import BaseGA
+from src.ga.streaming import SnapshotWriter
+from src.ga.surrogate import DelayedFitness
+from src.config.setting import PROBLEMS, get_problem, DEFAULT_GA_PARAMS, PROBLEM_GA_PARAMS
 
+PROBLEM = "timetabling"  # default of --problem; options: the PROBLEMS keys in config/setting.py
 
-def plot_fitness(max_fitness_values, mean_fitness_values, maximize=True):
+
+def plot_fitness(max_fitness_values, mean_fitness_values, maximize=True, path=None):
     """
     Dynamically plot fitness evolution for GA runs.
     Automatically handles minimization or maximization.
+    The figure is saved to path if given, otherwise shown in a window.
     """
+    # plotting libraries are only imported when a plot is requested
+    import matplotlib
+
+    if path is not None:
+        matplotlib.use("Agg")
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     sns.set_style("whitegrid")
     plt.figure()
 
@@ -35,38 +52,218 @@ def plot_fitness(max_fitness_values, mean_fitness_values, maximize=True):
         f"{main_label} and {avg_label} over Generations\n(Better = {better_text})"
     )
     plt.legend()
-    plt.show()
+    if path is None:
+        plt.show()
+    else:
+        plt.savefig(path)
+        plt.close()
+
+
+def parse_value(text):
+    """A Python literal (number, bool, tuple, ...), or the text itself"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
 
+def parse_assignments(assignments):
+    """["key=value", ...] -> {key: parsed value}"""
+    params = {}
+    for assignment in assignments:
+        key, sep, value = assignment.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected key=value, got {assignment!r}")
+        params[key] = parse_value(value)
+    return params
 
-def main():
-    cfg = PROBLEMS[PROBLEM]
-    ga_params = DEFAULT_GA_PARAMS
 
-    extra = cfg.get("extra_params", lambda: {})()
+def parse_seeds(tokens):
+    """["1", "5-8"] -> [1, 5, 6, 7, 8]"""
+    seeds = []
+    for token in tokens:
+        first, sep, last = token.partition("-")
+        seeds.extend(range(int(first), int(last) + 1) if sep else [int(token)])
+    return seeds
 
-    ga = BaseGA(
-        fitness_func=cfg["fitness_func"],
-        individual_size=cfg["individual_size"],
-        chromosome_type=cfg["chromosome_type"],
+
+def fitness_curves(ga, results):
+    """
+    (maximize, best fitness curve, mean fitness curve) of a run as plain floats;
+    multi-objective runs follow their first objective
+    """
+    if ga.objectives is not None:
+        return (
+            ga.objectives[0] > 0,
+            [float(values[0]) for values in results["best_fitness_values"]],
+            [float(values[0]) for values in results["mean_fitness_values"]],
+        )
+    curve = results["max_fitness_values" if ga.maximize else "min_fitness_values"]
+    return ga.maximize, [float(value) for value in curve], [
+        float(value) for value in results["mean_fitness_values"]
+    ]
+
+
+def run_seed(job):
+    """Runs the GA once with the given seed; executed in a worker process"""
+    problem, instance_params, ga_params, tuned_options, ga_options, seed, stream_path, eval_delay = job
+    cfg = get_problem(problem, **instance_params)
+    if eval_delay:
+        # emulate an expensive fitness function: per-individual calls, each one delayed
+        cfg = dict(cfg, fitness_func=DelayedFitness(cfg["fitness_func"], eval_delay))
+        ga_options = dict(ga_options, batch_fitness_func=None)
+    ga = BaseGA.from_problem(
+        cfg,
         population_size=ga_params["POPULATION_SIZE"],
         ngen=ga_params["MAX_GENERATIONS"],
         crossover_prob=ga_params["P_CROSSOVER"],
         mutation_prob=ga_params["P_MUTATION"],
-        maximize=cfg["maximize"],
-        **extra,
+        seed=seed,
+        defaults=tuned_options,
+        **ga_options,
     )
 
-    results = ga.run()
+    start = time.perf_counter()
+    if stream_path is None:
+        results = ga.run()
+    else:
+        with SnapshotWriter(stream_path) as writer:
+            results = ga.run(progress=writer.write)
+    runtime = time.perf_counter() - start
 
-    if ga.maximize:
-        fitness_curve = results["max_fitness_values"]
+    maximize, fitness_curve, mean_curve = fitness_curves(ga, results)
+    if ga.objectives is not None:
+        # multi-objective: summaries and plots follow the first objective, the
+        # per-objective curves and the Pareto front are kept as they are
+        results["objective_best_values"] = results.pop("best_fitness_values")
+        results["objective_mean_values"] = results.pop("mean_fitness_values")
+        results["best_fitness"] = results["best_fitness"][0]
     else:
-        fitness_curve = results["min_fitness_values"]
+        results.pop("max_fitness_values" if maximize else "min_fitness_values")
+    results.update(
+        seed=seed,
+        maximize=maximize,
+        runtime=runtime,
+        best_fitness=float(results["best_fitness"]),
+        best_fitness_values=fitness_curve,
+        mean_fitness_values=mean_curve,
+    )
+    return results
+
+
+def median_iqr(values):
+    """(median, interquartile range) of the values"""
+    if len(values) < 2:
+        return values[0], 0.0
+    q1, _, q3 = statistics.quantiles(values, n=4)
+    return statistics.median(values), q3 - q1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the GA on a registered problem over one or more seeds"
+    )
+    parser.add_argument("--problem", default=PROBLEM, choices=sorted(PROBLEMS))
+    parser.add_argument("--param", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="instance parameters of the problem, e.g. dimensions=100")
+    # defaults: the problem's PROBLEM_GA_PARAMS entry, then DEFAULT_GA_PARAMS
+    parser.add_argument("--population-size", type=int)
+    parser.add_argument("--generations", type=int)
+    parser.add_argument("--crossover-prob", type=float)
+    parser.add_argument("--mutation-prob", type=float)
+    parser.add_argument("--ga-option", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="further BaseGA arguments, e.g. variation=mixed verbose=False")
+    parser.add_argument("--seeds", nargs="+", default=[str(DEFAULT_GA_PARAMS["SEED"])],
+                        help="seeds and inclusive seed ranges, e.g. 1 2 10-20")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes running seeds in parallel")
+    parser.add_argument("--output-dir", help="directory for results.json (and plots)")
+    parser.add_argument("--plot", action="store_true",
+                        help="save a fitness plot per seed to the output directory")
+    parser.add_argument("--stream", action="store_true",
+                        help="write each seed's per-generation snapshots to the output directory as they come")
+    parser.add_argument("--show", action="store_true",
+                        help="show the fitness plot of the first seed in a window")
+    parser.add_argument("--eval-delay", type=float, default=0.0, metavar="SECONDS",
+                        help="artificial delay per fitness evaluation, e.g. to try surrogate=True")
+    args = parser.parse_args(argv)
+    if args.eval_delay and any(option.startswith("multi_objective=") for option in args.ga_option):
+        parser.error("--eval-delay applies to the single-objective fitness function only")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seeds = parse_seeds(args.seeds)
+    instance_params = parse_assignments(args.param)
+    defaults = {**DEFAULT_GA_PARAMS, **PROBLEM_GA_PARAMS.get(args.problem, {})}
+    # the tuned GA_OPTIONS an engine mode cannot use are dropped by BaseGA.from_problem
+    tuned_options = defaults.get("GA_OPTIONS", {})
+    ga_options = parse_assignments(args.ga_option)
+    ga_params = {
+        "POPULATION_SIZE": args.population_size or defaults["POPULATION_SIZE"],
+        "MAX_GENERATIONS": args.generations or defaults["MAX_GENERATIONS"],
+        "P_CROSSOVER": defaults["P_CROSSOVER"] if args.crossover_prob is None else args.crossover_prob,
+        "P_MUTATION": defaults["P_MUTATION"] if args.mutation_prob is None else args.mutation_prob,
+    }
+    if len(seeds) > 1:
+        # interleaved per-generation printouts of parallel runs are unreadable
+        ga_options.setdefault("verbose", False)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def stream_path(seed):
+        if args.stream and args.output_dir:
+            return os.path.join(args.output_dir, f"generations_seed{seed}.ndjson")
+        return None
+
+    jobs = [
+        (args.problem, instance_params, ga_params, tuned_options, ga_options, seed,
+         stream_path(seed), args.eval_delay)
+        for seed in seeds
+    ]
+    workers = min(args.workers or 1, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            runs = list(executor.map(run_seed, jobs))
+    else:
+        runs = [run_seed(job) for job in jobs]
+
+    # --- Aggregate statistics ---
+    best_median, best_iqr = median_iqr([run["best_fitness"] for run in runs])
+    time_median, time_iqr = median_iqr([run["runtime"] for run in runs])
+    best = (max if runs[0]["maximize"] else min)(runs, key=lambda run: run["best_fitness"])
+    print(f"{args.problem}: {len(runs)} run(s), seeds {seeds[0]}..{seeds[-1]}")
+    print(f" - best fitness: median {best_median:.6g}, IQR {best_iqr:.6g}, best {best['best_fitness']:.6g} (seed {best['seed']})")
+    print(f" - runtime:      median {time_median:.3f}s, IQR {time_iqr:.3f}s")
+
+    if args.output_dir:
+        summary = {
+            "problem": args.problem,
+            "instance_params": instance_params,
+            "ga_params": ga_params,
+            "tuned_ga_options": tuned_options,
+            "ga_options": ga_options,
+            "seeds": seeds,
+            "best_fitness": {"median": best_median, "iqr": best_iqr},
+            "runtime": {"median": time_median, "iqr": time_iqr},
+            "runs": runs,
+        }
+        with open(os.path.join(args.output_dir, "results.json"), "w") as f:
+            json.dump(summary, f, indent=1, default=str)
 
-    mean_curve = results["mean_fitness_values"]
+        if args.plot:
+            for run in runs:
+                plot_fitness(
+                    run["best_fitness_values"],
+                    run["mean_fitness_values"],
+                    maximize=run["maximize"],
+                    path=os.path.join(args.output_dir, f"fitness_seed{run['seed']}.png"),
+                )
 
-    # Plot
-    plot_fitness(fitness_curve, mean_curve, maximize=ga.maximize)
+    if args.show:
+        plot_fitness(runs[0]["best_fitness_values"], runs[0]["mean_fitness_values"], maximize=runs[0]["maximize"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,252 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def rotationMatrix(dimensions, seed):
+    """
+    Random orthogonal matrix (QR of a Gaussian matrix), cached per (dimensions, seed)
+    so every shifted/rotated instance of the same size shares it
+    :param dimensions: size of the matrix
+    :param seed: seed of the random generator
+    :return: a read-only (dimensions, dimensions) ndarray
+    """
+    rng = np.random.default_rng(seed)
+    q, r = np.linalg.qr(rng.standard_normal((dimensions, dimensions)))
+    q *= np.sign(np.diag(r))  # uniform (Haar) distribution
+    q.setflags(write=False)
+    return q
+
+
+class BenchmarkFunction:
+    """This class encapsulates a continuous benchmark function to be minimized.
+
+    Subclasses implement evaluate() on a (populationSize, dimensions) matrix z.
+    With shift and/or rotation (CEC-style), solutions x are mapped to
+    z = R (x - o) + z*, where o is the shifted optimum and z* the optimum of the
+    plain function, so the optimum of the transformed function is at x = o.
+    """
+
+    name = None
+    lowerBound, upperBound = -5.0, 5.0
+    optimumPoint = 0.0  # z*, the same value in every dimension
+
+    def __init__(self, dimensions=10, shift=False, rotate=False, seed=0):
+        """
+        :param dimensions: number of dimensions (variables)
+        :param shift: move the optimum to a random point inside 80% of the bounds
+        :param rotate: rotate the landscape by a random orthogonal matrix
+        :param seed: seed of the random shift and rotation
+        """
+        self.dimensions = dimensions
+        self.bounds = [(self.lowerBound, self.upperBound)] * dimensions
+        self.shifted = shift
+        self.rotated = rotate
+
+        center = np.full(dimensions, float(self.optimumPoint))
+        if shift:
+            rng = np.random.default_rng(seed)
+            half = 0.4 * (self.upperBound - self.lowerBound)
+            middle = 0.5 * (self.upperBound + self.lowerBound)
+            self.shift = rng.uniform(middle - half, middle + half, size=dimensions)
+        else:
+            self.shift = center
+        self.rotation = rotationMatrix(dimensions, seed) if rotate else None
+
+        # known optimum:
+        self.optimum = self.shift.tolist()
+        self.optimumValue = float(self.evaluate(center[None, :])[0])
+
+    def __len__(self):
+        """
+        :return: the number of dimensions (variables) in the problem
+        """
+        return self.dimensions
+
+    def transform(self, x):
+        """
+        Maps solutions to the coordinates of the plain function
+        :param x: a (populationSize, dimensions) array
+        :return: the transformed array z
+        """
+        if not self.shifted and not self.rotated:
+            return x
+        z = x - self.shift
+        if self.rotated:
+            z = z @ self.rotation.T
+        return z + self.optimumPoint
+
+    def evaluate(self, z):
+        """
+        :param z: a (populationSize, dimensions) array in the plain function's coordinates
+        :return: ndarray of function values
+        """
+        raise NotImplementedError
+
+    def fitnessBatch(self, population):
+        """
+        Calculates the function value of a whole population at once
+        :param population: a (populationSize, dimensions) array, or a list of solutions
+        :return: ndarray of function values (to be minimized)
+        """
+        x = np.asarray(population, dtype=float)
+        if x.ndim != 2 or x.shape[1] != self.dimensions:
+            raise ValueError(f"Solutions must have {self.dimensions} dimensions")
+        return self.evaluate(self.transform(x))
+
+    def fitness(self, solution):
+        """
+        Calculates the function value for the given solution
+        :param solution: a list of real values representing the point in n-dimensional space
+        :return: the calculated function value, as a tuple for DEAP
+        """
+        if len(solution) != self.dimensions:
+            raise ValueError(f"Solution must have {self.dimensions} dimensions")
+        return (float(self.fitnessBatch([solution])[0]),)
+
+    def printSolution(self, solution):
+        """
+        Prints information about the solution and its fitness
+        :param solution: a list of real values representing the point
+        """
+        variant = " (shifted)" * self.shifted + " (rotated)" * self.rotated
+        print(f"{self.name} Function Solution{variant}:")
+        print(f" - Dimensions: {self.dimensions}")
+        print(f" - Bounds: [{self.lowerBound}, {self.upperBound}]")
+        print(f" - Solution point: {list(solution)}")
+        print(f" - Function value: {self.fitness(solution)[0]:.6f}")
+        print(f" - Global minimum value: {self.optimumValue:.6f}")
+
+
+class SphereProblem(BenchmarkFunction):
+    """f(z) = Σ z_i²"""
+
+    name = "Sphere"
+    lowerBound, upperBound = -5.12, 5.12
+
+    def evaluate(self, z):
+        return np.einsum("ij,ij->i", z, z)
+
+
+class RastriginProblem(BenchmarkFunction):
+    """f(z) = 10n + Σ [z_i² - 10 cos(2π z_i)]"""
+
+    name = "Rastrigin"
+    lowerBound, upperBound = -5.12, 5.12
+
+    def evaluate(self, z):
+        return 10.0 * z.shape[1] + np.sum(
+            z * z - 10.0 * np.cos(2.0 * np.pi * z), axis=1
+        )
+
+
+class AckleyProblem(BenchmarkFunction):
+    """f(z) = -20 exp(-0.2 sqrt(mean z_i²)) - exp(mean cos(2π z_i)) + 20 + e"""
+
+    name = "Ackley"
+    lowerBound, upperBound = -32.768, 32.768
+
+    def evaluate(self, z):
+        return (
+            -20.0 * np.exp(-0.2 * np.sqrt(np.mean(z * z, axis=1)))
+            - np.exp(np.mean(np.cos(2.0 * np.pi * z), axis=1))
+            + 20.0
+            + np.e
+        )
+
+
+class GriewankProblem(BenchmarkFunction):
+    """f(z) = 1 + Σ z_i² / 4000 - Π cos(z_i / sqrt(i))"""
+
+    name = "Griewank"
+    lowerBound, upperBound = -600.0, 600.0
+
+    def evaluate(self, z):
+        scale = np.sqrt(np.arange(1, z.shape[1] + 1))
+        return 1.0 + np.sum(z * z, axis=1) / 4000.0 - np.prod(np.cos(z / scale), axis=1)
+
+
+class SchwefelProblem(BenchmarkFunction):
+    """f(z) = 418.9829n - Σ z_i sin(sqrt|z_i|)
+
+    Shifted or rotated, z leaves [-500, 500] for some x inside the bounds, where the
+    plain function drops below its optimum. Outside the domain, z_i is mirrored back
+    into it and a quadratic penalty added, as in CEC 2014, so x = o stays the global
+    minimum."""
+
+    name = "Schwefel"
+    lowerBound, upperBound = -500.0, 500.0
+    optimumPoint = 420.968746
+
+    def evaluate(self, z):
+        outside = np.abs(z) > 500.0
+        mirrored = np.where(z > 0.0, 500.0 - np.mod(z, 500.0), np.mod(np.abs(z), 500.0) - 500.0)
+        y = np.where(outside, mirrored, z)
+        penalty = np.where(outside, (np.abs(z) - 500.0) ** 2 / (10000.0 * z.shape[1]), 0.0)
+        return 418.9828872724339 * z.shape[1] - np.sum(
+            y * np.sin(np.sqrt(np.abs(y))) - penalty, axis=1
+        )
+
+
+class LevyProblem(BenchmarkFunction):
+    """f(z) = sin²(πw_1) + Σ (w_i - 1)² [1 + 10 sin²(πw_i + 1)] + (w_n - 1)² [1 + sin²(2πw_n)],
+    with w_i = 1 + (z_i - 1) / 4"""
+
+    name = "Levy"
+    lowerBound, upperBound = -10.0, 10.0
+    optimumPoint = 1.0
+
+    def evaluate(self, z):
+        w = 1.0 + (z - 1.0) / 4.0
+        head, last = w[:, :-1], w[:, -1]
+        return (
+            np.sin(np.pi * w[:, 0]) ** 2
+            + np.sum(
+                (head - 1.0) ** 2 * (1.0 + 10.0 * np.sin(np.pi * head + 1.0) ** 2),
+                axis=1,
+            )
+            + (last - 1.0) ** 2 * (1.0 + np.sin(2.0 * np.pi * last) ** 2)
+        )
+
+
+class ZakharovProblem(BenchmarkFunction):
+    """f(z) = Σ z_i² + (Σ 0.5 i z_i)² + (Σ 0.5 i z_i)⁴"""
+
+    name = "Zakharov"
+    lowerBound, upperBound = -5.0, 10.0
+
+    def evaluate(self, z):
+        weighted = z @ (0.5 * np.arange(1, z.shape[1] + 1))
+        return np.einsum("ij,ij->i", z, z) + weighted**2 + weighted**4
+
+
+# benchmark functions by registry name:
+BENCHMARKS = {
+    "sphere": SphereProblem,
+    "rastrigin": RastriginProblem,
+    "ackley": AckleyProblem,
+    "griewank": GriewankProblem,
+    "schwefel": SchwefelProblem,
+    "levy": LevyProblem,
+    "zakharov": ZakharovProblem,
+}
+
+
+# testing the classes:
+def main():
+    for name, problemClass in BENCHMARKS.items():
+        for shift, rotate in ((False, False), (True, True)):
+            problem = problemClass(dimensions=30, shift=shift, rotate=rotate, seed=1)
+            population = np.random.uniform(
+                problem.lowerBound, problem.upperBound, size=(1000, 30)
+            )
+            print(
+                f"{problem.name:10s} shift={shift!s:5s} rotate={rotate!s:5s} "
+                f"optimum value = {problem.fitness(problem.optimum)[0]:.6f}, "
+                f"best of 1000 random = {problem.fitnessBatch(population).min():.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
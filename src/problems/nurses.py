@@ -4,41 +4,186 @@ import numpy as np
 class NurseSchedulingProblem:
     """This class encapsulates the Nurse Scheduling problem"""
 
-    def __init__(self, hardConstraintPenalty):
+    def __init__(
+        self,
+        hardConstraintPenalty,
+        nurses=None,
+        shiftPreference=None,
+        shiftMin=None,
+        shiftMax=None,
+        maxShiftsPerWeek=5,
+        weeks=1,
+    ):
         """
         :param hardConstraintPenalty: the penalty factor for a hard-constraint violation
+        :param nurses: names of the nurses (default: the 8-nurse textbook instance)
+        :param shiftPreference: per-nurse 0/1 preference for each daily shift
+        :param shiftMin: min number of nurses required for each daily shift
+        :param shiftMax: max number of nurses allowed for each daily shift
+        :param maxShiftsPerWeek: max shifts per week allowed for each nurse
+        :param weeks: number of weeks we create a schedule for
         """
         self.hardConstraintPenalty = hardConstraintPenalty
 
         # list of nurses:
-        self.nurses = ["A", "B", "C", "D", "E", "F", "G", "H"]
+        if nurses is None:
+            nurses = ["A", "B", "C", "D", "E", "F", "G", "H"]
+        self.nurses = np.asarray(nurses, dtype=str)
 
         # nurses' respective shift preferences - morning, evening, night:
-        self.shiftPreference = [
-            [1, 0, 0],
-            [1, 1, 0],
-            [0, 0, 1],
-            [0, 1, 0],
-            [0, 0, 1],
-            [1, 1, 1],
-            [0, 1, 1],
-            [1, 1, 1],
-        ]
+        if shiftPreference is None:
+            shiftPreference = [
+                [1, 0, 0],
+                [1, 1, 0],
+                [0, 0, 1],
+                [0, 1, 0],
+                [0, 0, 1],
+                [1, 1, 1],
+                [0, 1, 1],
+                [1, 1, 1],
+            ]
+        self.shiftPreference = np.asarray(shiftPreference, dtype=np.int8)
 
         # min and max number of nurses allowed for each shift - morning, evening, night:
-        self.shiftMin = [2, 2, 1]
-        self.shiftMax = [3, 4, 2]
+        self.shiftMin = np.asarray([2, 2, 1] if shiftMin is None else shiftMin)
+        self.shiftMax = np.asarray([3, 4, 2] if shiftMax is None else shiftMax)
 
         # max shifts per week allowed for each nurse
-        self.maxShiftsPerWeek = 5
+        self.maxShiftsPerWeek = maxShiftsPerWeek
 
         # number of weeks we create a schedule for:
-        self.weeks = 1
+        self.weeks = weeks
 
         # useful values:
         self.shiftPerDay = len(self.shiftMin)
         self.shiftsPerWeek = 7 * self.shiftPerDay
 
+        if self.shiftPreference.shape != (len(self.nurses), self.shiftPerDay):
+            raise ValueError(
+                "shiftPreference must hold one row of", self.shiftPerDay, "per nurse"
+            )
+
+        # per-shift lookup tables used by the incremental evaluator:
+        shiftsPerNurse = self.shiftsPerWeek * self.weeks
+        self.slotMin = np.resize(self.shiftMin, shiftsPerNurse)
+        self.slotMax = np.resize(self.shiftMax, shiftsPerNurse)
+        self.forbiddenShifts = np.tile(
+            self.shiftPreference == 0, (1, shiftsPerNurse // self.shiftPerDay)
+        )
+
+    @classmethod
+    def fromFile(cls, path, hardConstraintPenalty):
+        """
+        Reads an instance from a compact whitespace-delimited text file:
+
+            # comment
+            weeks 4
+            max_shifts_per_week 5
+            shift_min 2 2 1
+            shift_max 3 4 2
+            A 100
+            B 110
+            ...
+
+        Every line that is not a keyword holds a nurse name followed by its
+        shift-preference bits (one digit per daily shift).
+        :param path: path of the instance file
+        :param hardConstraintPenalty: the penalty factor for a hard-constraint violation
+        :return: the loaded NurseSchedulingProblem
+        """
+        params = {}
+        nurses = []
+        preferences = []
+        with open(path) as f:
+            for line in f:
+                row = line.split("#", 1)[0].split()
+                if not row:
+                    continue
+                if row[0] == "weeks":
+                    params["weeks"] = int(row[1])
+                elif row[0] == "max_shifts_per_week":
+                    params["maxShiftsPerWeek"] = int(row[1])
+                elif row[0] == "shift_min":
+                    params["shiftMin"] = [int(v) for v in row[1:]]
+                elif row[0] == "shift_max":
+                    params["shiftMax"] = [int(v) for v in row[1:]]
+                else:
+                    nurses.append(row[0])
+                    preferences.append([int(bit) for bit in row[1]])
+
+        return cls(
+            hardConstraintPenalty, nurses=nurses, shiftPreference=preferences, **params
+        )
+
+    def saveToFile(self, path):
+        """
+        Writes the instance in the format read by fromFile()
+        :param path: path of the instance file
+        """
+        with open(path, "w") as f:
+            f.write(f"weeks {self.weeks}\n")
+            f.write(f"max_shifts_per_week {self.maxShiftsPerWeek}\n")
+            f.write("shift_min " + " ".join(map(str, self.shiftMin)) + "\n")
+            f.write("shift_max " + " ".join(map(str, self.shiftMax)) + "\n")
+            for nurse, preference in zip(self.nurses, self.shiftPreference):
+                f.write(f"{nurse} {''.join(map(str, preference))}\n")
+
+    @classmethod
+    def generate(
+        cls,
+        hardConstraintPenalty,
+        numNurses=200,
+        weeks=4,
+        shiftPerDay=3,
+        maxShiftsPerWeek=5,
+        tightness=0.5,
+        preferenceDensity=0.5,
+        seed=None,
+    ):
+        """
+        Creates a seeded synthetic instance
+        :param numNurses: number of nurses
+        :param weeks: number of weeks we create a schedule for
+        :param shiftPerDay: number of shifts per day
+        :param maxShiftsPerWeek: max shifts per week allowed for each nurse
+        :param tightness: 0..1, the share of the nurses' weekly capacity the minimal coverage requires;
+        higher values also narrow the gap between shiftMin and shiftMax
+        :param preferenceDensity: probability that a nurse likes a given shift
+        :param seed: seed of the random generator
+        :return: the generated NurseSchedulingProblem
+        """
+        rng = np.random.default_rng(seed)
+
+        # nurse-shifts available per shift slot if everybody works the max:
+        capacity = numNurses * maxShiftsPerWeek / (7 * shiftPerDay)
+
+        # spread the demand unevenly over the daily shifts:
+        weights = rng.uniform(0.7, 1.3, size=shiftPerDay)
+        weights /= weights.mean()
+        shiftMin = np.maximum(np.rint(tightness * capacity * weights), 1).astype(int)
+        slack = max(int(round((1.0 - tightness) * capacity)), 1)
+        shiftMax = shiftMin + slack
+
+        # every nurse likes at least one shift:
+        shiftPreference = (
+            rng.random((numNurses, shiftPerDay)) < preferenceDensity
+        ).astype(np.int8)
+        noPreference = shiftPreference.sum(axis=1) == 0
+        shiftPreference[
+            noPreference, rng.integers(shiftPerDay, size=noPreference.sum())
+        ] = 1
+
+        nurses = [f"N{i}" for i in range(numNurses)]
+        return cls(
+            hardConstraintPenalty,
+            nurses=nurses,
+            shiftPreference=shiftPreference,
+            shiftMin=shiftMin,
+            shiftMax=shiftMax,
+            maxShiftsPerWeek=maxShiftsPerWeek,
+            weeks=weeks,
+        )
+
     def __len__(self):
         """
         :return: the number of shifts in the schedule
@@ -53,35 +198,97 @@ class NurseSchedulingProblem:
         :return: the calculated cost
         """
 
-        if len(schedule) != self.__len__():
-            raise ValueError(
-                "size of schedule list should be equal to ", self.__len__()
+        # the counts are vectorized over the whole roster by the incremental evaluator;
+        # the count...() methods below give the same numbers for a single nurse dictionary:
+        return NurseScheduleState(self, schedule).cost
+
+    def getObjectives(self, schedule):
+        """
+        Counts the hard and soft violations of the given schedule separately, for
+        multi-objective optimization (no penalty weighting)
+        :param schedule: a list of binary values describing the given schedule
+        :return: (hard violations, soft violations)
+        """
+        return NurseScheduleState(self, schedule).objectives
+
+    def constructSchedule(self, seed=None):
+        """
+        Builds a roster shift by shift: each shift is staffed with between shiftMin and
+        shiftMax nurses, picked among those who did not work the previous shift and are
+        still under maxShiftsPerWeek, preferring nurses who like the shift and have
+        worked the fewest shifts that week. Ties are broken randomly.
+        :param seed: seed of the random generator
+        :return: a flat list of binary values describing the schedule
+        """
+        rng = np.random.default_rng(seed)
+        numNurses = len(self.nurses)
+        shiftsPerNurse = self.shiftsPerWeek * self.weeks
+        schedule = np.zeros((numNurses, shiftsPerNurse), dtype=np.int8)
+        weekly = np.zeros(numNurses, dtype=np.int64)
+
+        for shift in range(shiftsPerNurse):
+            if shift % self.shiftsPerWeek == 0:
+                weekly[:] = 0
+
+            eligible = weekly < self.maxShiftsPerWeek
+            if shift > 0:
+                eligible &= schedule[:, shift - 1] == 0
+            candidates = np.flatnonzero(eligible)
+
+            # staff the minimum, plus a random share of the allowed extra:
+            low, high = int(self.slotMin[shift]), int(self.slotMax[shift])
+            wanted = low + int(rng.integers(0, max(high - low, 0) + 1) // 2)
+
+            # disliked shifts last, then the nurses with the fewest shifts this week:
+            order = np.lexsort(
+                (
+                    rng.random(len(candidates)),
+                    weekly[candidates],
+                    self.forbiddenShifts[candidates, shift],
+                )
             )
+            chosen = candidates[order[:wanted]]
+            schedule[chosen, shift] = 1
+            weekly[chosen] += 1
 
-        # convert entire schedule into a dictionary with a separate schedule for each nurse:
-        nurseShiftsDict = self.getNurseShifts(schedule)
+        return schedule.ravel().tolist()
 
-        # count the various violations:
-        consecutiveShiftViolations = self.countConsecutiveShiftViolations(
-            nurseShiftsDict
-        )
-        shiftsPerWeekViolations = self.countShiftsPerWeekViolations(nurseShiftsDict)[1]
-        nursesPerShiftViolations = self.countNursesPerShiftViolations(nurseShiftsDict)[
-            1
-        ]
-        shiftPreferenceViolations = self.countShiftPreferenceViolations(nurseShiftsDict)
+    def getState(self, schedule):
+        """
+        Creates an incremental evaluator for the given schedule
+        :param schedule: a list of binary values describing the given schedule
+        :return: a NurseScheduleState holding the schedule's violation counts
+        """
+        return NurseScheduleState(self, schedule)
 
-        # calculate the cost of the violations:
-        hardContstraintViolations = (
-            consecutiveShiftViolations
-            + nursesPerShiftViolations
-            + shiftsPerWeekViolations
+    def flipDelta(self, schedule, index):
+        """
+        Calculates the cost change of flipping a single bit of the given schedule from the
+        nurse's week and the shift's column only, in O(nurses + shifts per week), without
+        building a NurseScheduleState
+        :param schedule: a list of binary values describing the given schedule
+        :param index: the index of the bit in the flat schedule
+        :return: the change in cost
+        """
+        shiftsPerNurse = len(self) // len(self.nurses)
+        nurse, shift = divmod(index, shiftsPerNurse)
+        neighbours = 0
+        if shift > 0:
+            neighbours += schedule[index - 1]
+        if shift < shiftsPerNurse - 1:
+            neighbours += schedule[index + 1]
+        weekStart = index - shift % self.shiftsPerWeek
+        consecutive, perWeek, perShift, preference = flipViolationDeltas(
+            self,
+            nurse,
+            shift,
+            1 - 2 * int(schedule[index]),
+            int(neighbours),
+            int(sum(schedule[weekStart : weekStart + self.shiftsPerWeek])),
+            int(sum(schedule[shift::shiftsPerNurse])),
         )
-        softContstraintViolations = shiftPreferenceViolations
-
         return (
-            self.hardConstraintPenalty * hardContstraintViolations
-            + softContstraintViolations
+            self.hardConstraintPenalty * (consecutive + perWeek + perShift) + preference
         )
 
     def getNurseShifts(self, schedule):
@@ -164,14 +371,10 @@ class NurseSchedulingProblem:
         :return: count of violations found
         """
         violations = 0
-        for nurseIndex, shiftPreference in enumerate(self.shiftPreference):
-            # duplicate the shift-preference over the days of the period
-            preference = shiftPreference * (self.shiftsPerWeek // self.shiftPerDay)
-            # iterate over the shifts and compare to preferences:
-            shifts = nurseShiftsDict[self.nurses[nurseIndex]]
-            for pref, shift in zip(preference, shifts):
-                if pref == 0 and shift == 1:
-                    violations += 1
+        for nurseIndex, nurse in enumerate(self.nurses):
+            # compare the shifts to the preferences duplicated over the days of the period:
+            shifts = np.asarray(nurseShiftsDict[nurse])
+            violations += int(np.sum(shifts[self.forbiddenShifts[nurseIndex]]))
 
         return violations
 
@@ -211,6 +414,191 @@ class NurseSchedulingProblem:
         print()
 
 
+def flipViolationDeltas(problem, nurse, shift, change, neighbours, weekly, count):
+    """
+    Calculates the change of each violation count caused by flipping a single bit
+    :param problem: the NurseSchedulingProblem the schedule belongs to
+    :param change: +1 if the bit is set by the flip, -1 if it is cleared
+    :param neighbours: number of '1' shifts adjacent to the bit for the same nurse
+    :param weekly: the nurse's total in the bit's week, before the flip
+    :param count: the number of nurses in the bit's shift, before the flip
+    :return: tuple of (consecutive, perWeek, perShift, preference)
+    """
+    consecutive = change * neighbours
+
+    # weekly total of the nurse:
+    perWeek = max(weekly + change - problem.maxShiftsPerWeek, 0) - max(
+        weekly - problem.maxShiftsPerWeek, 0
+    )
+
+    # number of nurses in the shift:
+    low, high = int(problem.slotMin[shift]), int(problem.slotMax[shift])
+    perShift = (
+        max(count + change - high, 0)
+        + max(low - count - change, 0)
+        - max(count - high, 0)
+        - max(low - count, 0)
+    )
+
+    preference = change * int(problem.forbiddenShifts[nurse, shift])
+
+    return consecutive, perWeek, perShift, preference
+
+
+class NurseScheduleState:
+    """Keeps the violation counts of a single schedule up to date under single-bit flips.
+
+    The per-shift nurse counts, the per-nurse weekly totals and the number of adjacent
+    '1' pairs are stored, so the cost change of flipping one shift is found in O(1).
+    A move is the index of a bit in the flat schedule.
+    """
+
+    def __init__(self, problem, schedule):
+        """
+        :param problem: the NurseSchedulingProblem the schedule belongs to
+        :param schedule: a list of binary values describing the given schedule
+        """
+        self.problem = problem
+        self.reset(schedule)
+
+    def reset(self, schedule):
+        """
+        Recomputes all the counts from scratch for the given schedule
+        :param schedule: a list of binary values describing the given schedule
+        """
+        problem = self.problem
+        if len(schedule) != len(problem):
+            raise ValueError("size of schedule list should be equal to ", len(problem))
+
+        self.shiftsPerNurse = len(problem) // len(problem.nurses)
+        self.schedule = np.array(schedule, dtype=np.int8).reshape(
+            len(problem.nurses), self.shiftsPerNurse
+        )
+
+        # per-shift nurse counts and per-nurse weekly totals:
+        self.shiftCounts = self.schedule.sum(axis=0, dtype=np.int64)
+        self.weeklyShifts = self.schedule.reshape(
+            len(problem.nurses), problem.weeks, problem.shiftsPerWeek
+        ).sum(axis=2, dtype=np.int64)
+
+        # violation counts:
+        self.consecutiveViolations = int(
+            np.sum(self.schedule[:, :-1] & self.schedule[:, 1:])
+        )
+        self.shiftsPerWeekViolations = int(
+            np.sum(np.maximum(self.weeklyShifts - problem.maxShiftsPerWeek, 0))
+        )
+        self.nursesPerShiftViolations = int(
+            np.sum(np.maximum(self.shiftCounts - problem.slotMax, 0))
+            + np.sum(np.maximum(problem.slotMin - self.shiftCounts, 0))
+        )
+        self.shiftPreferenceViolations = int(
+            np.sum(self.schedule[problem.forbiddenShifts])
+        )
+
+    @property
+    def cost(self):
+        """
+        :return: the cost of the current schedule, identical to problem.getCost()
+        """
+        hardViolations, softViolations = self.objectives
+        return self.problem.hardConstraintPenalty * hardViolations + softViolations
+
+    @property
+    def objectives(self):
+        """
+        :return: (hard violations, soft violations) of the current schedule
+        """
+        hardViolations = (
+            self.consecutiveViolations
+            + self.shiftsPerWeekViolations
+            + self.nursesPerShiftViolations
+        )
+        return hardViolations, self.shiftPreferenceViolations
+
+    def __violationDeltas(self, index):
+        """
+        Calculates the change of each violation count caused by flipping a single bit
+        :param index: the index of the bit in the flat schedule
+        :return: tuple of (nurse, shift, change, consecutive, perWeek, perShift, preference)
+        """
+        nurse, shift = divmod(index, self.shiftsPerNurse)
+        nurseShifts = self.schedule[nurse]
+        change = 1 - 2 * int(nurseShifts[shift])
+
+        # adjacency with the neighbouring shifts of the same nurse:
+        neighbours = 0
+        if shift > 0:
+            neighbours += nurseShifts[shift - 1]
+        if shift < self.shiftsPerNurse - 1:
+            neighbours += nurseShifts[shift + 1]
+
+        week = shift // self.problem.shiftsPerWeek
+        return (nurse, shift, change) + flipViolationDeltas(
+            self.problem,
+            nurse,
+            shift,
+            change,
+            int(neighbours),
+            int(self.weeklyShifts[nurse, week]),
+            int(self.shiftCounts[shift]),
+        )
+
+    def delta(self, index):
+        """
+        Calculates the cost change of flipping a single bit, without applying it
+        :param index: the index of the bit in the flat schedule
+        :return: the change in cost
+        """
+        _, _, _, consecutive, perWeek, perShift, preference = self.__violationDeltas(
+            index
+        )
+        return (
+            self.problem.hardConstraintPenalty * (consecutive + perWeek + perShift)
+            + preference
+        )
+
+    def apply(self, index):
+        """
+        Flips a single bit and updates all the counts
+        :param index: the index of the bit in the flat schedule
+        :return: the change in cost
+        """
+        nurse, shift, change, consecutive, perWeek, perShift, preference = (
+            self.__violationDeltas(index)
+        )
+        self.schedule[nurse, shift] += change
+        self.shiftCounts[shift] += change
+        self.weeklyShifts[nurse, shift // self.problem.shiftsPerWeek] += change
+        self.consecutiveViolations += consecutive
+        self.shiftsPerWeekViolations += perWeek
+        self.nursesPerShiftViolations += perShift
+        self.shiftPreferenceViolations += preference
+        return (
+            self.problem.hardConstraintPenalty * (consecutive + perWeek + perShift)
+            + preference
+        )
+
+    def randomMove(self, rng):
+        """
+        :param rng: a random.Random-like generator
+        :return: a random bit index
+        """
+        return rng.randrange(self.schedule.size)
+
+    def moveAttribute(self, index):
+        """
+        :return: the attribute made tabu after the move is applied
+        """
+        return index
+
+    def toList(self):
+        """
+        :return: the current schedule as a flat list of binary values
+        """
+        return self.schedule.ravel().tolist()
+
+
 # testing the class:
 def main():
 
@@ -227,6 +615,17 @@ def main():
 
     print("Total Cost = ", nurses.getCost(randomSolution))
 
+    # flip a few bits incrementally and compare against a full evaluation:
+    state = nurses.getState(randomSolution)
+    for index in np.random.randint(len(nurses), size=10):
+        state.apply(index)
+        randomSolution[index] = 1 - randomSolution[index]
+    print("Incremental Cost = ", state.cost, ", Full Cost = ", nurses.getCost(randomSolution))
+
+    # a seeded synthetic instance of realistic size:
+    large = NurseSchedulingProblem.generate(10, numNurses=200, weeks=4, seed=0)
+    print("Synthetic instance:", len(large.nurses), "nurses,", large.weeks, "weeks,", len(large), "shifts")
+
 
 if __name__ == "__main__":
     main()
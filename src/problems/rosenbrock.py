@@ -1,5 +1,6 @@
+import threading
+
 import numpy as np
-from matplotlib import pyplot as plt
 
 
 class RosenbrockProblem:
@@ -23,6 +24,22 @@ class RosenbrockProblem:
         self.b = b
         self.bounds = [(-5, 5)] * dimensions  # Default bounds for each dimension
 
+        # known optimum:
+        self.optimum = [a] * dimensions
+        self.optimumValue = 0.0
+
+        # scratch rows reused by fitnessBatch(), one set per thread, grown on demand:
+        self.__scratch = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_RosenbrockProblem__scratch"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__scratch = threading.local()
+
     def __len__(self):
         """
         :return: the number of dimensions (variables) in the problem
@@ -38,11 +55,36 @@ class RosenbrockProblem:
         if len(solution) != self.dimensions:
             raise ValueError(f"Solution must have {self.dimensions} dimensions")
 
-        x = np.array(solution)
-        result = 0
-        for i in range(len(x) - 1):
-            result += self.b * (x[i + 1] - x[i] ** 2) ** 2 + (self.a - x[i]) ** 2
-        return (result,)
+        return (float(self.fitnessBatch([solution])[0]),)
+
+    def fitnessBatch(self, population, out=None):
+        """
+        Calculates the Rosenbrock function value of a whole population at once
+        :param population: a (populationSize, dimensions) array, or a list of solutions
+        :param out: optional (populationSize,) array receiving the values
+        :return: ndarray of function values (to be minimized)
+        """
+        x = np.asarray(population, dtype=float)
+        if x.ndim != 2 or x.shape[1] != self.dimensions:
+            raise ValueError(f"Solutions must have {self.dimensions} dimensions")
+
+        # intermediate terms go into the calling thread's scratch rows, only the output
+        # is allocated:
+        n = x.shape[0]
+        work = getattr(self.__scratch, "work", None)
+        if work is None or work.shape[0] < n:
+            work = self.__scratch.work = np.empty((n, 2, self.dimensions - 1))
+        square, linear = work[:n, 0], work[:n, 1]
+
+        head, tail = x[:, :-1], x[:, 1:]
+        np.multiply(head, head, out=square)
+        np.subtract(tail, square, out=square)  # x_{i+1} - x_i²
+        np.multiply(square, square, out=square)
+        np.subtract(self.a, head, out=linear)  # a - x_i
+        np.multiply(linear, linear, out=linear)
+        square *= self.b
+        square += linear
+        return np.sum(square, axis=1, out=out)
 
     def printSolution(self, solution):
         """
@@ -97,6 +139,13 @@ def main():
     print(f"   Random: {rosenbrock.fitness(random_solution)[0]:.6f}")
     print(f"   Origin: {rosenbrock.fitness(test_solution)[0]:.6f}")
 
+    # Evaluate a population of 1000-D points in one call
+    rosenbrock1000 = RosenbrockProblem(dimensions=1000)
+    population = np.random.uniform(-5, 5, size=(500, 1000))
+    print("\n5. Batch of 500 points in 1000-D:")
+    print(f"   Best: {rosenbrock1000.fitnessBatch(population).min():.6f}")
+    print(f"   Optimum: {rosenbrock1000.fitnessBatch(np.ones((1, 1000)))[0]:.6f}")
+
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,23 @@
+import heapq
+import json
+import os
+import random
+from functools import cached_property
+
 import numpy as np
 
 
 class Lecturer:
+    __slots__ = ("id", "name")
+
     def __init__(self, id, name):
         self.id = id
         self.name = name
 
 
 class StudentGroup:
+    __slots__ = ("id", "name", "size")
+
     def __init__(self, id, name, size):
         self.id = id
         self.name = name
@@ -15,6 +25,8 @@ class StudentGroup:
 
 
 class Room:
+    __slots__ = ("id", "name", "capacity")
+
     def __init__(self, id, name, capacity):
         self.id = id
         self.name = name
@@ -22,6 +34,8 @@ class Room:
 
 
 class Module:
+    __slots__ = ("id", "name", "lecturer", "student_group")
+
     def __init__(self, id, name, lecturer, student_group):
         self.id = id
         self.name = name
@@ -29,8 +43,21 @@ class Module:
         self.student_group = student_group
 
 
+# the toy instance, in the columnar schema read by TimetablingProblem.fromFile():
+# every entity is a dict of equally long columns, modules refer to lecturers and
+# student groups by index, and a timeslot's day is its "day" entry or, if there is
+# none, the part of its name before '-'
+DEFAULT_INSTANCE_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../../data/timetabling/toy.json"
+)
+
+
 class TimetablingProblem:
-    """This class encapsulates the University Timetabling Problem (UTP)"""
+    """This class encapsulates the University Timetabling Problem (UTP)
+
+    Entities are kept in struct-of-arrays form (one ndarray per attribute); the
+    Lecturer/StudentGroup/Room/Module object lists are only built on first access.
+    """
 
     def convert_to_timetable_format(self, chromosome):
         """Decode integer chromosome into (module_idx, room_idx, timeslot_idx) list"""
@@ -44,96 +71,511 @@ class TimetablingProblem:
             timetable.append((module_idx, room_idx, timeslot_idx))
         return timetable
 
-    def __init__(self, hardConstraintPenalty):
+    def __init__(self, hardConstraintPenalty, instance=None):
+        """
+        :param hardConstraintPenalty: the penalty factor for a hard-constraint violation
+        :param instance: the instance data in the columnar schema of the DEFAULT_INSTANCE_PATH file
+        (default: the toy instance read from that file)
+        """
         self.hardConstraintPenalty = hardConstraintPenalty
+        if instance is None:
+            with open(DEFAULT_INSTANCE_PATH) as f:
+                instance = json.load(f)
+
+        # lecturers and student groups
+        self.lecturerNames = np.asarray(instance["lecturers"]["name"], dtype=str)
+        self.groupNames = np.asarray(instance["student_groups"]["name"], dtype=str)
+        self.groupSize = np.asarray(instance["student_groups"]["size"], dtype=np.int64)
+
+        # modules with their assigned lecturers and student groups
+        self.moduleNames = np.asarray(instance["modules"]["name"], dtype=str)
+        self.moduleLecturer = np.asarray(instance["modules"]["lecturer"], dtype=np.int64)
+        self.moduleGroup = np.asarray(
+            instance["modules"]["student_group"], dtype=np.int64
+        )
 
-        # Create lecturers
-        self.lecturers = [
-            Lecturer(0, "Dr. Smith"),
-            Lecturer(1, "Prof. Johnson"),
-            Lecturer(2, "Dr. Williams"),
-            Lecturer(3, "Prof. Brown"),
-        ]
+        # rooms
+        self.roomNames = np.asarray(instance["rooms"]["name"], dtype=str)
+        self.roomCapacity = np.asarray(instance["rooms"]["capacity"], dtype=np.int64)
 
-        # Create student groups
-        self.student_groups = [
-            StudentGroup(0, "G1", 40),
-            StudentGroup(1, "G2", 35),
-            StudentGroup(2, "G3", 40),
-            StudentGroup(3, "G4", 20),
-        ]
+        # timeslots
+        self.timeslots = np.asarray(instance["timeslots"]["name"], dtype=str)
+
+        self.numModules = len(self.moduleNames)
+        self.numRooms = len(self.roomNames)
+        self.numTimeslots = len(self.timeslots)
+        self.numLecturers = len(self.lecturerNames)
+        self.numGroups = len(self.groupNames)
+
+        if not (
+            len(self.moduleLecturer) == len(self.moduleGroup) == self.numModules
+            and len(self.groupSize) == self.numGroups
+            and len(self.roomCapacity) == self.numRooms
+        ):
+            raise ValueError("instance columns of the same entity must be equally long")
+        if self.numModules and (
+            self.moduleLecturer.min() < 0
+            or self.moduleLecturer.max() >= self.numLecturers
+            or self.moduleGroup.min() < 0
+            or self.moduleGroup.max() >= self.numGroups
+        ):
+            raise ValueError("modules refer to unknown lecturers or student groups")
 
-        # Create modules with their assigned lecturers and student groups
-        self.courses = [
-            Module(0, "Math", self.lecturers[0], self.student_groups[0]),
-            Module(1, "Physics", self.lecturers[1], self.student_groups[1]),
-            Module(2, "Chemistry", self.lecturers[2], self.student_groups[0]),
-            Module(3, "CS", self.lecturers[3], self.student_groups[2]),
-            Module(4, "IS", self.lecturers[3], self.student_groups[3]),
-            Module(5, "History", self.lecturers[0], self.student_groups[3]),
+        # day boundaries, derived from the timeslot names (e.g. 'Sat-08:30' -> 'Sat')
+        slotDays = instance["timeslots"].get(
+            "day", [name.split("-", 1)[0] for name in self.timeslots]
+        )
+        days, firstSlot, slotDay = np.unique(
+            slotDays, return_index=True, return_inverse=True
+        )
+        order = np.argsort(firstSlot)  # days in order of appearance
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        self.days = days[order]
+        self.slotDay = rank[slotDay]
+        self.daySlotCount = np.bincount(self.slotDay, minlength=len(self.days))
+
+        # student group size of each module
+        self.moduleGroupSize = self.groupSize[self.moduleGroup]
+
+    @classmethod
+    def fromFile(cls, path, hardConstraintPenalty):
+        """
+        Loads an instance from a JSON file in the columnar schema of the DEFAULT_INSTANCE_PATH file
+        :param path: path of the JSON file
+        :param hardConstraintPenalty: the penalty factor for a hard-constraint violation
+        :return: the loaded TimetablingProblem
+        """
+        with open(path) as f:
+            return cls(hardConstraintPenalty, json.load(f))
+
+    def toInstance(self):
+        """
+        :return: the instance data in the columnar schema of the DEFAULT_INSTANCE_PATH file
+        """
+        return {
+            "lecturers": {"name": self.lecturerNames.tolist()},
+            "student_groups": {
+                "name": self.groupNames.tolist(),
+                "size": self.groupSize.tolist(),
+            },
+            "modules": {
+                "name": self.moduleNames.tolist(),
+                "lecturer": self.moduleLecturer.tolist(),
+                "student_group": self.moduleGroup.tolist(),
+            },
+            "rooms": {
+                "name": self.roomNames.tolist(),
+                "capacity": self.roomCapacity.tolist(),
+            },
+            "timeslots": {
+                "name": self.timeslots.tolist(),
+                "day": self.days[self.slotDay].tolist(),
+            },
+        }
+
+    def saveToFile(self, path):
+        """
+        Writes the instance as a JSON file readable by fromFile()
+        :param path: path of the JSON file
+        """
+        with open(path, "w") as f:
+            json.dump(self.toInstance(), f, separators=(",", ":"))
+
+    @classmethod
+    def generate(
+        cls,
+        hardConstraintPenalty,
+        numModules=1000,
+        modulesPerLecturer=4,
+        modulesPerGroup=6,
+        days=5,
+        slotsPerDay=4,
+        roomOccupancy=0.7,
+        seed=None,
+    ):
+        """
+        Creates a seeded synthetic instance
+        :param numModules: number of modules (events) to schedule
+        :param modulesPerLecturer: average number of modules taught by a lecturer
+        :param modulesPerGroup: average number of modules attended by a student group
+        :param days: number of teaching days
+        :param slotsPerDay: number of timeslots per day
+        :param roomOccupancy: share of all room-slots the modules would fill
+        :param seed: seed of the random generator
+        :return: the generated TimetablingProblem
+        """
+        rng = np.random.default_rng(seed)
+        numTimeslots = days * slotsPerDay
+        numLecturers = max(numModules // modulesPerLecturer, 1)
+        numGroups = max(numModules // modulesPerGroup, 1)
+        numRooms = max(int(np.ceil(numModules / (numTimeslots * roomOccupancy))), 1)
+
+        dayNames = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        if days > len(dayNames):
+            dayNames = [f"D{d + 1}" for d in range(days)]
+        slotNames = [
+            f"{dayNames[d]}-{8 + 2 * s:02d}:00"
+            for d in range(days)
+            for s in range(slotsPerDay)
         ]
 
-        # Create rooms
-        self.rooms = [
-            Room(0, "R1", 50),
-            Room(1, "R2", 30),
-            Room(2, "R3", 40),
-            Room(3, "R4", 35),
+        roomCapacity = rng.choice([30, 40, 50, 80, 120, 200], size=numRooms)
+        # every group fits a randomly picked room, so large rooms are not over-demanded:
+        groupSize = rng.integers(10, rng.choice(roomCapacity, size=numGroups) + 1)
+
+        return cls(
+            hardConstraintPenalty,
+            {
+                "lecturers": {"name": [f"L{i}" for i in range(numLecturers)]},
+                "student_groups": {
+                    "name": [f"G{i}" for i in range(numGroups)],
+                    "size": groupSize.tolist(),
+                },
+                "modules": {
+                    "name": [f"M{i}" for i in range(numModules)],
+                    "lecturer": rng.integers(numLecturers, size=numModules).tolist(),
+                    "student_group": rng.integers(numGroups, size=numModules).tolist(),
+                },
+                "rooms": {
+                    "name": [f"R{i}" for i in range(numRooms)],
+                    "capacity": roomCapacity.tolist(),
+                },
+                "timeslots": {"name": slotNames},
+            },
+        )
+
+    # ========== ENTITY OBJECTS ==========
+    @cached_property
+    def lecturers(self):
+        return [Lecturer(i, name) for i, name in enumerate(self.lecturerNames.tolist())]
+
+    @cached_property
+    def student_groups(self):
+        return [
+            StudentGroup(i, name, size)
+            for i, (name, size) in enumerate(
+                zip(self.groupNames.tolist(), self.groupSize.tolist())
+            )
         ]
 
-        # timeslots (4 slots per day: Saturday and Sunday)
-        self.timeslots = [
-            "Sat-08:30",
-            "Sat-10:45",
-            "Sat-13:30",
-            "Sat-15:45",
-            "Sun-08:30",
-            "Sun-10:45",
-            "Sun-13:30",
-            "Sun-15:45",
+    @cached_property
+    def courses(self):
+        return [
+            Module(i, name, self.lecturers[lec], self.student_groups[group])
+            for i, (name, lec, group) in enumerate(
+                zip(
+                    self.moduleNames.tolist(),
+                    self.moduleLecturer.tolist(),
+                    self.moduleGroup.tolist(),
+                )
+            )
         ]
 
-        # Define day boundaries (Saturday: slots 0-3, Sunday: slots 4-7)
-        self.saturday_slots = [0, 1, 2, 3]
-        self.sunday_slots = [4, 5, 6, 7]
+    @cached_property
+    def rooms(self):
+        return [
+            Room(i, name, capacity)
+            for i, (name, capacity) in enumerate(
+                zip(self.roomNames.tolist(), self.roomCapacity.tolist())
+            )
+        ]
 
-        self.numModules = len(self.courses)
-        self.numRooms = len(self.rooms)
-        self.numTimeslots = len(self.timeslots)
+    # ========== CONFLICT GRAPH ==========
+    @cached_property
+    def conflictGraph(self):
+        """
+        Modules sharing a lecturer or a student group, in CSR form:
+        the neighbours of module m are indices[indptr[m]:indptr[m + 1]]
+        :return: tuple of (indptr, indices) ndarrays
+        """
+        pairs = []
+        for keys in (self.moduleLecturer, self.moduleGroup):
+            order = np.argsort(keys, kind="stable")
+            bounds = np.flatnonzero(np.diff(keys[order])) + 1
+            for members in np.split(order, bounds):
+                if len(members) > 1:
+                    first, second = np.meshgrid(members, members, indexing="ij")
+                    pairs.append(first.ravel() * self.numModules + second.ravel())
+
+        edges = np.unique(np.concatenate(pairs)) if pairs else np.empty(0, np.int64)
+        source, target = np.divmod(edges, self.numModules)
+        keep = source != target
+        source, target = source[keep], target[keep]
+
+        indptr = np.zeros(self.numModules + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=self.numModules), out=indptr[1:])
+        return indptr, target
+
+    # ========== CONSTRUCTION ==========
+    def constructTimetable(self, seed=None):
+        """
+        Builds a timetable greedily in saturation-degree (DSATUR) order: the module whose
+        conflicting modules already occupy the most distinct timeslots is placed next, in
+        the earliest-day timeslot none of them occupies, in the smallest free room that
+        fits its group. When no such placement exists, the least violating one is used.
+        Ties are broken randomly, so different seeds give different timetables.
+        :param seed: seed of the random tie-breaking
+        :return: an integer chromosome
+        """
+        rng = random.Random(seed)
+        noise = np.random.default_rng(seed)
+        T = self.numTimeslots
+        indptr, indices = self.conflictGraph
+        degree = np.diff(indptr).tolist()
+
+        # rooms by increasing capacity, and which of their room-slots are still free:
+        roomOrder = np.argsort(self.roomCapacity, kind="stable")
+        sortedCapacity = self.roomCapacity[roomOrder]
+        freeRoomSlots = np.ones((self.numRooms, T), dtype=bool)  # in roomOrder
+
+        genes = [-1] * self.numModules
+        neighbourSlots = [set() for _ in range(self.numModules)]
+        heap = [(0, -degree[m], rng.random(), m) for m in range(self.numModules)]
+        heapq.heapify(heap)
+
+        while heap:
+            saturation, _, _, module = heapq.heappop(heap)
+            if genes[module] >= 0 or -saturation != len(neighbourSlots[module]):
+                continue  # already placed, or a stale heap entry
+
+            # timeslots free of conflicts, earliest day first:
+            slots = sorted(range(T), key=lambda t: (self.slotDay[t], rng.random()))
+            fits = sortedCapacity >= self.moduleGroupSize[module]
+            gene = None
+            for t in slots:
+                if t in neighbourSlots[module]:
+                    continue
+                rooms = np.flatnonzero(fits & freeRoomSlots[:, t])
+                if len(rooms):
+                    gene = rooms[0] * T + t
+                    break
+
+            if gene is None:
+                # fewest clashes + capacity violations, random among the ties:
+                busy = np.zeros(T)
+                busy[list(neighbourSlots[module])] = 1
+                violations = busy + ~fits[:, None] + ~freeRoomSlots
+                gene = np.argmin(violations + 0.5 * noise.random(violations.shape))
+
+            position, t = divmod(int(gene), T)
+            genes[module] = int(roomOrder[position]) * T + t
+            freeRoomSlots[position, t] = False
+
+            # update the saturation of the unplaced neighbours:
+            for neighbour in indices[indptr[module] : indptr[module + 1]].tolist():
+                if genes[neighbour] < 0 and t not in neighbourSlots[neighbour]:
+                    neighbourSlots[neighbour].add(t)
+                    heapq.heappush(
+                        heap,
+                        (
+                            -len(neighbourSlots[neighbour]),
+                            -degree[neighbour],
+                            rng.random(),
+                            neighbour,
+                        ),
+                    )
+
+        return genes
+
+    def getState(self, timetable):
+        """
+        Creates an incremental evaluator for the given chromosome
+        :param timetable: an integer chromosome
+        :return: a TimetableState holding the chromosome's occupancy and violation counts
+        """
+        return TimetableState(self, timetable)
 
     def __len__(self):
         return self.numModules
 
+    # ========== INCREMENTAL MOVES ==========
+    def repairGene(self, timetable, module, rng, roomSlotCount=None):
+        """
+        Proposes a gene for the module in a timeslot none of its conflicting modules
+        (same lecturer or student group) occupy, preferring a free room that fits.
+        Runs in O(conflict degree + number of timeslots), plus a scan of the chromosome
+        per room tried when no roomSlotCount is given.
+        :param timetable: an integer chromosome
+        :param module: index of the module to move
+        :param rng: a random.Random-like generator
+        :param roomSlotCount: occupancy count of every room/timeslot gene, if available
+        :return: the new gene
+        """
+        T = self.numTimeslots
+        indptr, indices = self.conflictGraph
+        neighbours = indices[indptr[module] : indptr[module + 1]].tolist()
+        busy = {int(timetable[j]) % T for j in neighbours}
+        free = [t for t in range(T) if t not in busy]
+        slot = rng.choice(free) if free else rng.randrange(T)
+
+        room = rng.randrange(self.numRooms)
+        for _ in range(5):
+            gene = room * T + slot
+            if self.roomCapacity[room] >= self.moduleGroupSize[module] and (
+                timetable.count(gene) if roomSlotCount is None else roomSlotCount[gene]
+            ) == 0:
+                break
+            room = rng.randrange(self.numRooms)
+        return room * T + slot
+
+    def moveDelta(self, timetable, module, newGene):
+        """
+        Calculates the cost change of moving a module of the given chromosome to a new gene
+        from its conflicting modules and two scans of the chromosome (room-slot occupancy),
+        without building a TimetableState; the same value as TimetableState.delta()
+        :param timetable: an integer chromosome, as a list
+        :param module: index of the module to move
+        :param newGene: the module's new room/timeslot gene
+        :return: the change in cost
+        """
+        T = self.numTimeslots
+        oldGene = int(timetable[module])
+        if newGene == oldGene:
+            return 0
+        oldRoom, oldSlot = divmod(oldGene, T)
+        newRoom, newSlot = divmod(newGene, T)
+
+        size = self.moduleGroupSize[module]
+        hard = (
+            int(timetable.count(newGene) >= 1)
+            - int(timetable.count(oldGene) > 1)
+            + int(size > self.roomCapacity[newRoom])
+            - int(size > self.roomCapacity[oldRoom])
+        )
+        if oldSlot == newSlot:
+            return int(self.hardConstraintPenalty * hard)
+
+        # clashes with the modules of the same lecturer and student group:
+        indptr, indices = self.conflictGraph
+        neighbours = indices[indptr[module] : indptr[module + 1]]
+        slots = np.array([timetable[j] for j in neighbours.tolist()], dtype=np.int64) % T
+        lecturerSlots = slots[self.moduleLecturer[neighbours] == self.moduleLecturer[module]]
+        groupSlots = slots[self.moduleGroup[neighbours] == self.moduleGroup[module]]
+        for otherSlots in (lecturerSlots, groupSlots):
+            hard += int(np.any(otherSlots == newSlot)) - int(np.any(otherSlots == oldSlot))
+
+        # gaps and day order of the student group:
+        before = np.append(groupSlots, oldSlot)
+        after = np.append(groupSlots, newSlot)
+        soft = groupGaps(np.bincount(after, minlength=T)) - groupGaps(
+            np.bincount(before, minlength=T)
+        )
+        if self.slotDay[oldSlot] != self.slotDay[newSlot]:
+            numDays = len(self.days)
+            soft += groupDayViolations(
+                np.bincount(self.slotDay[after], minlength=numDays), self.daySlotCount
+            ) - groupDayViolations(
+                np.bincount(self.slotDay[before], minlength=numDays), self.daySlotCount
+            )
+        return int(self.hardConstraintPenalty * hard + soft)
+
     # ========== COST ==========
     def getCost(self, timetable):
         if len(timetable) != self.numModules:
             raise ValueError("timetable size must equal number of modules")
 
-        cost = 0
+        return int(self.getCosts([timetable])[0])
 
-        formatted_timetable = self.convert_to_timetable_format(timetable)
+    def getGeneMatrix(self, population):
+        """
+        Stacks a population of integer chromosomes into a (populationSize, numModules) array
+        :param population: a sequence of integer chromosomes
+        :return: the gene matrix
+        """
+        try:
+            genes = np.asarray(population, dtype=np.int64)
+        except (TypeError, ValueError):
+            genes = None
+        if genes is None or genes.ndim != 2:
+            # legacy chromosomes holding (gene, ...) tuples
+            genes = np.array(
+                [
+                    [gene[0] if isinstance(gene, tuple) else gene for gene in timetable]
+                    for timetable in population
+                ],
+                dtype=np.int64,
+            )
+        return genes.reshape(len(population), self.numModules)
+
+    def getCosts(self, population):
+        """
+        Calculates the cost of a whole population in one call.
+        Every constraint is counted with array operations over all the chromosomes at once,
+        giving the same values as the per-timetable count...() methods.
+        :param population: a sequence of integer chromosomes (or a gene matrix)
+        :return: ndarray of costs, one per chromosome
+        """
+        objectives = self.getObjectivesBatch(population)
+        return self.hardConstraintPenalty * objectives[:, 0] + objectives[:, 1]
+
+    def getObjectives(self, timetable):
+        """
+        Counts the hard and soft violations of the given timetable separately, for
+        multi-objective optimization (no penalty weighting)
+        :param timetable: list of integers (room * numTimeslots + timeslot per module)
+        :return: (hard violations, soft violations)
+        """
+        hard, soft = self.getObjectivesBatch([timetable])[0]
+        return int(hard), int(soft)
+
+    def getObjectivesBatch(self, population):
+        """
+        Counts the hard and soft violations of a whole population in one call
+        :param population: a sequence of integer chromosomes (or a gene matrix)
+        :return: a (populationSize, 2) ndarray of hard and soft violation counts
+        """
+        genes = self.getGeneMatrix(population)
+        rooms, slots = np.divmod(genes, self.numTimeslots)
 
         # ===== HARD: constraints =====
-        module_indices = [m for m, r, t in formatted_timetable]
-        if len(set(module_indices)) != self.numModules:
-            cost += self.hardConstraintPenalty
-        roomClashes = self.countRoomClashes(formatted_timetable)
-        lecturerClashes = self.countLecturerClashes(formatted_timetable)
-        groupClashes = self.countGroupClashes(formatted_timetable)
-        roomCapacityViolations = self.countRoomCapacityViolations(formatted_timetable)
+        # (every module is scheduled exactly once by construction of the encoding)
+        lecturerKeys = self.moduleLecturer * self.numTimeslots + slots
+        groupKeys = self.moduleGroup * self.numTimeslots + slots
+        roomClashes = self.countRepeatedKeys(genes)
+        lecturerClashes = self.countRepeatedKeys(lecturerKeys)
+        groupClashes = self.countRepeatedKeys(groupKeys)
+        roomCapacityViolations = np.sum(
+            self.moduleGroupSize > self.roomCapacity[rooms], axis=1
+        )
         hardViolations = (
             roomClashes + lecturerClashes + groupClashes + roomCapacityViolations
         )
 
         # SOFT: constraints
-        softViolations = self.countGapsBetweenClasses(formatted_timetable)
-        dayOrderViolations = self.countDayOrderViolations(formatted_timetable)
-
-        return (
-            self.hardConstraintPenalty * hardViolations
-            + softViolations
-            + dayOrderViolations
-        )
+        softViolations = self.countGapsBetweenClassesBatch(groupKeys)
+        dayOrderViolations = self.countDayOrderViolationsBatch(slots)
+
+        return np.column_stack((hardViolations, softViolations + dayOrderViolations))
+
+    # ========== BATCH COUNTS ==========
+    @staticmethod
+    def countRepeatedKeys(keys):
+        """Per row, the number of entries whose key already appeared earlier in the row"""
+        keys = np.sort(keys, axis=1)
+        return np.sum(keys[:, 1:] == keys[:, :-1], axis=1)
+
+    def countGapsBetweenClassesBatch(self, groupKeys):
+        """Per row, the number of empty slots between consecutive classes of each group"""
+        keys = np.sort(groupKeys, axis=1)
+        sameGroup = keys[:, 1:] // self.numTimeslots == keys[:, :-1] // self.numTimeslots
+        gaps = keys[:, 1:] - keys[:, :-1] - 1
+        return np.sum(np.where(sameGroup & (gaps > 0), gaps, 0), axis=1)
+
+    def countDayOrderViolationsBatch(self, slots):
+        """Per row, the later-day-before-earlier-day-filled penalty summed over the groups"""
+        numRows, numDays = slots.shape[0], len(self.days)
+        index = (
+            (np.arange(numRows)[:, None] * self.numGroups + self.moduleGroup) * numDays
+            + self.slotDay[slots]
+        ).ravel()
+        dayCounts = np.bincount(
+            index, minlength=numRows * self.numGroups * numDays
+        ).reshape(numRows, self.numGroups, numDays)
+
+        laterClasses = dayCounts.sum(axis=2, keepdims=True) - np.cumsum(dayCounts, axis=2)
+        emptySlots = np.maximum(self.daySlotCount - dayCounts, 0)
+        return np.sum(laterClasses * emptySlots, axis=(1, 2))
 
     # ========== HARD ==========
     def countRoomClashes(self, timetable):
@@ -150,8 +592,7 @@ class TimetablingProblem:
         used = {}
         violations = 0
         for m, r, t in timetable:
-            module = self.courses[m]
-            lec_id = module.lecturer.id
+            lec_id = self.moduleLecturer[m]
             if (lec_id, t) in used:
                 violations += 1
             else:
@@ -162,8 +603,7 @@ class TimetablingProblem:
         used = {}
         violations = 0
         for m, r, t in timetable:
-            module = self.courses[m]
-            group_id = module.student_group.id
+            group_id = self.moduleGroup[m]
             if (group_id, t) in used:
                 violations += 1
             else:
@@ -173,8 +613,7 @@ class TimetablingProblem:
     def countRoomCapacityViolations(self, timetable):
         violations = 0
         for m, r, t in timetable:
-            module = self.courses[m]
-            if module.student_group.size > self.rooms[r].capacity:
+            if self.moduleGroupSize[m] > self.roomCapacity[r]:
                 violations += 1
         return violations
 
@@ -184,8 +623,7 @@ class TimetablingProblem:
         groupSlots = {}
 
         for m, r, t in timetable:
-            module = self.courses[m]
-            group_id = module.student_group.id
+            group_id = self.moduleGroup[m]
             if group_id not in groupSlots:
                 groupSlots[group_id] = []
             groupSlots[group_id].append(t)
@@ -199,35 +637,32 @@ class TimetablingProblem:
 
     def countDayOrderViolations(self, timetable):
         """
-        Count violations where a student group has classes on Sunday
-        but empty slots on Saturday (should fill Saturday first)
+        Count violations where a student group has classes on a later day
+        but empty slots on an earlier one (should fill earlier days first)
         """
         violations = 0
+        numDays = len(self.days)
 
-        # Group classes by student group
-        group_classes = {}
+        # Count classes per day for each student group
+        group_days = {}
         for m, r, t in timetable:
-            module = self.courses[m]
-            group_id = module.student_group.id
-            if group_id not in group_classes:
-                group_classes[group_id] = []
-            group_classes[group_id].append(t)
+            group_id = self.moduleGroup[m]
+            if group_id not in group_days:
+                group_days[group_id] = [0] * numDays
+            group_days[group_id][self.slotDay[t]] += 1
 
         # Check each group's schedule
-        for group_id, slots in group_classes.items():
-            saturday_classes = [t for t in slots if t in self.saturday_slots]
-            sunday_classes = [t for t in slots if t in self.sunday_slots]
-
-            # Penalize if group has Sunday classes but empty Saturday slots
-            if len(sunday_classes) > 0 and len(saturday_classes) < len(
-                self.saturday_slots
-            ):
-                # More penalty if more Sunday classes and more empty Saturday slots
-                violations += len(sunday_classes) * (
-                    len(self.saturday_slots) - len(saturday_classes)
-                )
+        for group_id, day_classes in group_days.items():
+            later_classes = sum(day_classes)
+            for day in range(numDays):
+                later_classes -= day_classes[day]
+                empty_slots = self.daySlotCount[day] - day_classes[day]
 
-        return violations
+                # More penalty if more later classes and more empty earlier slots
+                if later_classes > 0 and empty_slots > 0:
+                    violations += later_classes * empty_slots
+
+        return int(violations)
 
     # ========== VALIDATION ==========
     def isValidTimetable(self, timetable):
@@ -294,7 +729,8 @@ class TimetablingProblem:
 
         print("Gaps between classes =", softViolations)
         print(
-            "Day order violations (Sunday before Saturday filled) =", dayOrderViolations
+            "Day order violations (later day before earlier day filled) =",
+            dayOrderViolations,
         )
         print()
 
@@ -302,6 +738,250 @@ class TimetablingProblem:
         print("Timetable is valid =", self.isValidTimetable(formatted_timetable))
 
 
+def groupGaps(slotCounts):
+    """Empty slots between the first and last class of a group's slot counts"""
+    occupied = np.flatnonzero(slotCounts)
+    if len(occupied) == 0:
+        return 0
+    return int(occupied[-1] - occupied[0] - (len(occupied) - 1))
+
+
+def groupDayViolations(dayCounts, daySlotCount):
+    """Day-order penalty of a group's per-day class counts"""
+    laterClasses = dayCounts.sum() - np.cumsum(dayCounts)
+    emptySlots = np.maximum(daySlotCount - dayCounts, 0)
+    return int(np.sum(laterClasses * emptySlots))
+
+
+class TimetableState:
+    """Keeps the violation counts of a single timetable up to date under single-module moves.
+
+    Room-slot, lecturer-slot and group-slot occupancy counts are stored together with
+    the per-group gap and day-order penalties, so the cost change of moving one module
+    to a new room/timeslot gene is found without rescanning the other modules.
+    A move is a (module, newGene) tuple.
+    """
+
+    def __init__(self, problem, timetable):
+        """
+        :param problem: the TimetablingProblem the timetable belongs to
+        :param timetable: an integer chromosome
+        """
+        self.problem = problem
+        self.reset(timetable)
+
+    def reset(self, timetable):
+        """
+        Recomputes all the counts from scratch for the given chromosome
+        :param timetable: an integer chromosome
+        """
+        problem = self.problem
+        T = problem.numTimeslots
+        numDays = len(problem.days)
+
+        self.genes = problem.getGeneMatrix([timetable])[0]
+        rooms, slots = np.divmod(self.genes, T)
+
+        # occupancy counts:
+        self.roomSlotCount = np.bincount(self.genes, minlength=problem.numRooms * T)
+        self.lecturerSlotCount = np.bincount(
+            problem.moduleLecturer * T + slots, minlength=problem.numLecturers * T
+        )
+        self.groupSlotCount = np.bincount(
+            problem.moduleGroup * T + slots, minlength=problem.numGroups * T
+        ).reshape(problem.numGroups, T)
+        self.groupDayCount = np.bincount(
+            problem.moduleGroup * numDays + problem.slotDay[slots],
+            minlength=problem.numGroups * numDays,
+        ).reshape(problem.numGroups, numDays)
+
+        # hard violation counts:
+        self.roomClashes = int(np.sum(np.maximum(self.roomSlotCount - 1, 0)))
+        self.lecturerClashes = int(np.sum(np.maximum(self.lecturerSlotCount - 1, 0)))
+        self.groupClashes = int(np.sum(np.maximum(self.groupSlotCount - 1, 0)))
+        self.roomCapacityViolations = int(
+            np.sum(problem.moduleGroupSize > problem.roomCapacity[rooms])
+        )
+
+        # soft violation counts, per student group:
+        occupied = self.groupSlotCount > 0
+        distinct = occupied.sum(axis=1)
+        first = np.argmax(occupied, axis=1)
+        last = T - 1 - np.argmax(occupied[:, ::-1], axis=1)
+        self.groupGaps = np.where(distinct > 0, last - first - (distinct - 1), 0)
+        laterClasses = self.groupDayCount.sum(axis=1, keepdims=True) - np.cumsum(
+            self.groupDayCount, axis=1
+        )
+        self.groupDayViolations = np.sum(
+            laterClasses * np.maximum(problem.daySlotCount - self.groupDayCount, 0),
+            axis=1,
+        )
+        self.gaps = int(self.groupGaps.sum())
+        self.dayOrderViolations = int(self.groupDayViolations.sum())
+
+    @property
+    def hardViolations(self):
+        return (
+            self.roomClashes
+            + self.lecturerClashes
+            + self.groupClashes
+            + self.roomCapacityViolations
+        )
+
+    @property
+    def cost(self):
+        """
+        :return: the cost of the current timetable, identical to problem.getCost()
+        """
+        return (
+            self.problem.hardConstraintPenalty * self.hardViolations
+            + self.gaps
+            + self.dayOrderViolations
+        )
+
+    def __moveChanges(self, move):
+        """
+        Calculates the changes caused by moving a module to a new gene
+        :param move: a (module, newGene) tuple
+        :return: tuple of (roomClashes, lecturerClashes, groupClashes, capacity,
+        new group gaps or None, new group day-order violations or None)
+        """
+        problem = self.problem
+        module, newGene = move
+        oldGene = int(self.genes[module])
+        oldRoom, oldSlot = divmod(oldGene, problem.numTimeslots)
+        newRoom, newSlot = divmod(newGene, problem.numTimeslots)
+
+        roomClashes = int(self.roomSlotCount[newGene] >= 1) - int(
+            self.roomSlotCount[oldGene] > 1
+        )
+        size = problem.moduleGroupSize[module]
+        capacity = int(size > problem.roomCapacity[newRoom]) - int(
+            size > problem.roomCapacity[oldRoom]
+        )
+        if oldSlot == newSlot:
+            return roomClashes, 0, 0, capacity, None, None
+
+        lecturerKey = problem.moduleLecturer[module] * problem.numTimeslots
+        lecturerClashes = int(
+            self.lecturerSlotCount[lecturerKey + newSlot] >= 1
+        ) - int(self.lecturerSlotCount[lecturerKey + oldSlot] > 1)
+
+        group = problem.moduleGroup[module]
+        slotCounts = self.groupSlotCount[group].copy()
+        groupClashes = int(slotCounts[newSlot] >= 1) - int(slotCounts[oldSlot] > 1)
+        slotCounts[oldSlot] -= 1
+        slotCounts[newSlot] += 1
+        gaps = groupGaps(slotCounts)
+
+        dayViolations = None
+        oldDay, newDay = problem.slotDay[oldSlot], problem.slotDay[newSlot]
+        if oldDay != newDay:
+            dayCounts = self.groupDayCount[group].copy()
+            dayCounts[oldDay] -= 1
+            dayCounts[newDay] += 1
+            dayViolations = groupDayViolations(dayCounts, problem.daySlotCount)
+
+        return roomClashes, lecturerClashes, groupClashes, capacity, gaps, dayViolations
+
+    def __costChange(self, module, changes):
+        roomClashes, lecturerClashes, groupClashes, capacity, gaps, dayViolations = changes
+        group = self.problem.moduleGroup[module]
+        soft = 0
+        if gaps is not None:
+            soft += gaps - self.groupGaps[group]
+        if dayViolations is not None:
+            soft += dayViolations - self.groupDayViolations[group]
+        hard = roomClashes + lecturerClashes + groupClashes + capacity
+        return int(self.problem.hardConstraintPenalty * hard + soft)
+
+    def delta(self, move):
+        """
+        Calculates the cost change of moving a module, without applying it
+        :param move: a (module, newGene) tuple
+        :return: the change in cost
+        """
+        module, newGene = move
+        if newGene == self.genes[module]:
+            return 0
+        return self.__costChange(module, self.__moveChanges(move))
+
+    def apply(self, move):
+        """
+        Moves a module to a new gene and updates all the counts
+        :param move: a (module, newGene) tuple
+        :return: the change in cost
+        """
+        problem = self.problem
+        module, newGene = move
+        oldGene = int(self.genes[module])
+        if newGene == oldGene:
+            return 0
+
+        changes = self.__moveChanges(move)
+        change = self.__costChange(module, changes)
+        roomClashes, lecturerClashes, groupClashes, capacity, gaps, dayViolations = changes
+
+        T = problem.numTimeslots
+        oldSlot, newSlot = oldGene % T, newGene % T
+        lecturerKey = problem.moduleLecturer[module] * T
+        group = problem.moduleGroup[module]
+
+        self.genes[module] = newGene
+        self.roomSlotCount[oldGene] -= 1
+        self.roomSlotCount[newGene] += 1
+        self.lecturerSlotCount[lecturerKey + oldSlot] -= 1
+        self.lecturerSlotCount[lecturerKey + newSlot] += 1
+        self.groupSlotCount[group, oldSlot] -= 1
+        self.groupSlotCount[group, newSlot] += 1
+        self.groupDayCount[group, problem.slotDay[oldSlot]] -= 1
+        self.groupDayCount[group, problem.slotDay[newSlot]] += 1
+
+        self.roomClashes += roomClashes
+        self.lecturerClashes += lecturerClashes
+        self.groupClashes += groupClashes
+        self.roomCapacityViolations += capacity
+        if gaps is not None:
+            self.gaps += gaps - int(self.groupGaps[group])
+            self.groupGaps[group] = gaps
+        if dayViolations is not None:
+            self.dayOrderViolations += dayViolations - int(self.groupDayViolations[group])
+            self.groupDayViolations[group] = dayViolations
+        return change
+
+    def repairMove(self, module, rng):
+        """
+        Proposes a gene for the module in a timeslot none of its conflicting modules
+        occupy, preferring a free room that fits (see TimetablingProblem.repairGene)
+        :param module: index of the module to move
+        :param rng: a random.Random-like generator
+        :return: a (module, newGene) tuple
+        """
+        return module, self.problem.repairGene(self.genes, module, rng, self.roomSlotCount)
+
+    def randomMove(self, rng):
+        """
+        :param rng: a random.Random-like generator
+        :return: a uniformly random move or, half of the time, a repair move
+        """
+        module = rng.randrange(self.problem.numModules)
+        if rng.random() < 0.5:
+            return module, rng.randrange(self.problem.numRooms * self.problem.numTimeslots)
+        return self.repairMove(module, rng)
+
+    def moveAttribute(self, move):
+        """
+        :return: the attribute made tabu after the move is applied (the moved module)
+        """
+        return move[0]
+
+    def toList(self):
+        """
+        :return: the current timetable as an integer chromosome
+        """
+        return self.genes.tolist()
+
+
 # testing the class:
 def main():
     problem = TimetablingProblem(10)
@@ -319,6 +999,12 @@ def main():
     problem.printSchedule(timetable)
     print("\nTotal Cost =", problem.getCost(timetable))
 
+    # evaluate a whole random population in one call:
+    population = np.random.randint(
+        problem.numRooms * problem.numTimeslots, size=(5, problem.numModules)
+    )
+    print("Population Costs =", problem.getCosts(population))
+
 
 if __name__ == "__main__":
     main()
@@ -5,7 +5,6 @@ import os
 import codecs
 import numpy as np
 from urllib.request import urlopen
-import matplotlib.pyplot as plt
 
 
 class TravelingSalesmanProblem:
@@ -144,6 +143,7 @@ class TravelingSalesmanProblem:
         :param indices: A list of ordered city indices describing the given path.
         :return: the resulting plot
         """
+        import matplotlib.pyplot as plt
 
         # plot the dots representing the cities:
         plt.scatter(*zip(*self.locations), marker=".", color="red")
@@ -0,0 +1,280 @@
+"""
+Asyncio optimization job service.
+
+Jobs are JSON-like specs:
+
+    {"problem": "rastrigin", "params": {"dimensions": 30}, "seed": 1,
+     "ga": {"population_size": 100, "ngen": 200, "variation": "mixed"}}
+
+where params are the get_problem() keywords and ga the BaseGA arguments. The
+service runs them concurrently on one shared executor, created once: by default
+a pool of long-lived worker processes, each running job after job (the problem
+instances stay cached in the workers), or a thread pool with mode="thread". The
+progress of every generation is streamed back as events:
+
+    {"type": "progress", "generation": ..., "best_fitness": ..., "mean_fitness": ..., "evaluations": ..., "elapsed": ...}
+    {"type": "result", "result": {...}}  |  {"type": "error", "error": "..."}  |  {"type": "cancelled"}
+
+Threads share the global random module, so seeded jobs are only reproducible in
+process mode (or when run alone).
+
+LocalClient is the stand-in for a remote client: its requests and the events it
+receives go through JSON, as they would over the wire.
+
+    python -m src.service
+"""
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.config.setting import PROBLEMS, get_problem
+
+# snapshot fields streamed as progress events
+PROGRESS_FIELDS = ("generation", "best_fitness", "mean_fitness", "evaluations", "elapsed")
+
+# progress queue of a worker process, set by the pool initializer
+_progress_queue = None
+
+
+def _init_worker(queue):
+    global _progress_queue
+    _progress_queue = queue
+
+
+def run_job(job_id, spec, emit=None, cancelled=None):
+    """
+    Runs one job; executed on the service's executor. Every event is passed to
+    emit((job_id, event)), or put on the worker's progress queue, so the events of a
+    job arrive in order.
+    :param cancelled: a threading.Event stopping the run at the next generation
+    """
+    from src.ga.base_ga import BaseGA
+
+    emit = emit or _progress_queue.put
+
+    def progress(snapshot):
+        emit((job_id, {"type": "progress", **{key: snapshot[key] for key in PROGRESS_FIELDS}}))
+        return not (cancelled is not None and cancelled.is_set())
+
+    try:
+        ga = BaseGA.from_problem(
+            get_problem(spec["problem"], **spec.get("params", {})),
+            seed=spec.get("seed"),
+            verbose=False,
+            **spec.get("ga", {}),
+        )
+        results = ga.run(progress=progress)
+    except Exception as error:
+        emit((job_id, {"type": "error", "error": f"{type(error).__name__}: {error}"}))
+    else:
+        if cancelled is not None and cancelled.is_set():
+            emit((job_id, {"type": "cancelled"}))
+        else:
+            emit((job_id, {"type": "result", "result": results}))
+
+
+class OptimizationService:
+    """Runs optimization jobs concurrently on a shared executor and streams their events"""
+
+    def __init__(self, workers=None, mode="process"):
+        """
+        :param workers: size of the executor (default: the number of CPUs)
+        :param mode: "process" or "thread"
+        """
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unsupported mode {mode!r}")
+        self.workers = workers or multiprocessing.cpu_count()
+        self.mode = mode
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._executor = None
+
+    async def start(self):
+        """Creates the executor (and, in process mode, the progress pump)"""
+        self._loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return
+
+        self._queue = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self._queue,)
+        )
+        self._pump = threading.Thread(target=self._pump_events, daemon=True)
+        self._pump.start()
+
+    async def close(self):
+        """Waits for the running jobs and shuts the executor down"""
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        if self.mode == "process":
+            self._queue.put(None)
+            await asyncio.to_thread(self._pump.join)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _pump_events(self):
+        # forwards the events of the worker processes to the event loop
+        while (item := self._queue.get()) is not None:
+            self._loop.call_soon_threadsafe(self._dispatch, item)
+
+    def _dispatch(self, item):
+        job_id, event = item
+        job = self._jobs[job_id]
+        if event["type"] == "progress":
+            job["generation"] = event["generation"]
+        else:
+            job["status"] = "done" if event["type"] == "result" else event["type"]
+            if not job["result"].done():
+                if event["type"] == "result":
+                    job["result"].set_result(event["result"])
+                else:
+                    job["result"].set_exception(RuntimeError(event.get("error", "cancelled")))
+        job["events"].put_nowait(event)
+
+    def submit(self, spec):
+        """
+        Queues a job on the executor
+        :param spec: the job spec (see the module docstring)
+        :return: the job id
+        """
+        if spec.get("problem") not in PROBLEMS:
+            raise ValueError(f"Unknown problem {spec.get('problem')!r}")
+
+        job_id = next(self._ids)
+        job = {
+            "spec": spec,
+            "status": "queued",
+            "generation": 0,
+            "events": asyncio.Queue(),
+            "result": self._loop.create_future(),
+            "cancelled": None,
+        }
+        # the result is also delivered through events(), so it may never be awaited
+        job["result"].add_done_callback(lambda future: future.exception())
+        self._jobs[job_id] = job
+
+        if self.mode == "thread":
+            job["cancelled"] = threading.Event()
+
+            def emit(item):
+                self._loop.call_soon_threadsafe(self._dispatch, item)
+
+            job["future"] = self._executor.submit(run_job, job_id, spec, emit, job["cancelled"])
+        else:
+            job["future"] = self._executor.submit(run_job, job_id, spec)
+        job["future"].add_done_callback(
+            lambda future: self._loop.call_soon_threadsafe(self._job_finished, job_id, future)
+        )
+        return job_id
+
+    def _job_finished(self, job_id, future):
+        # jobs cancelled before they started, or killed workers, send no final event
+        job = self._jobs[job_id]
+        if job["result"].done():
+            return
+        if future.cancelled():
+            self._dispatch((job_id, {"type": "cancelled"}))
+        elif future.exception() is not None:
+            self._dispatch((job_id, {"type": "error", "error": repr(future.exception())}))
+        else:
+            job["status"] = "running"  # the final event is still on its way
+
+    def status(self, job_id):
+        """:return: {"status": queued|running|done|error|cancelled, "generation": ...}"""
+        job = self._jobs[job_id]
+        status = job["status"]
+        if status == "queued" and job["future"].running():
+            status = "running"
+        return {"status": status, "generation": job["generation"]}
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued job; a running one stops at its next generation in thread
+        mode and runs to completion in process mode
+        :return: True if the job will not complete
+        """
+        job = self._jobs[job_id]
+        if job["future"].cancel():
+            return True
+        if job["cancelled"] is not None and not job["result"].done():
+            job["cancelled"].set()
+            return True
+        return False
+
+    async def events(self, job_id):
+        """Async iterator over the events of a job, up to its final event (single consumer)"""
+        events = self._jobs[job_id]["events"]
+        while True:
+            event = await events.get()
+            yield event
+            if event["type"] != "progress":
+                return
+
+    async def result(self, job_id):
+        """:return: the results dict of a job, once it completes"""
+        return await self._jobs[job_id]["result"]
+
+
+class LocalClient:
+    """In-process stand-in for a remote client of OptimizationService"""
+
+    def __init__(self, service):
+        self.service = service
+
+    @staticmethod
+    def _wire(message):
+        # what a network transport would do to the message (numpy scalars become numbers)
+        return json.loads(json.dumps(message, default=lambda value: value.item()))
+
+    async def submit(self, problem, params=None, ga=None, seed=None):
+        """:return: the job id"""
+        spec = {"problem": problem, "params": params or {}, "ga": ga or {}, "seed": seed}
+        return self.service.submit(self._wire(spec))
+
+    async def stream(self, job_id):
+        """Async iterator over the events of a job"""
+        async for event in self.service.events(job_id):
+            yield self._wire(event)
+
+    async def status(self, job_id):
+        return self._wire(self.service.status(job_id))
+
+    async def cancel(self, job_id):
+        return self.service.cancel(job_id)
+
+
+# demo: three different optimizations at once, progress streamed back
+async def demo():
+    async with OptimizationService(workers=2) as service:
+        client = LocalClient(service)
+        jobs = {
+            "rastrigin": await client.submit(
+                "rastrigin", {"dimensions": 10}, {"ngen": 60, "variation": "mixed"}, seed=1
+            ),
+            "knapsack": await client.submit("knapsack", ga={"ngen": 60}, seed=2),
+            "tsp": await client.submit("tsp", ga={"ngen": 60}, seed=3),
+        }
+
+        async def follow(name, job_id):
+            async for event in client.stream(job_id):
+                if event["type"] == "progress" and event["generation"] % 20 == 0:
+                    print(f"{name:10s} generation {event['generation']:3d}: best {event['best_fitness']:.4f}")
+                elif event["type"] == "result":
+                    print(f"{name:10s} done after {event['result']['evaluations']} evaluations")
+                elif event["type"] != "progress":
+                    print(f"{name:10s} {event}")
+
+        await asyncio.gather(*(follow(name, job_id) for name, job_id in jobs.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(demo())
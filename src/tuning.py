@@ -0,0 +1,385 @@
+"""
+Racing tuner for the GA settings of the registered problems.
+
+Samples candidate settings from TUNING_SPACE (plus the problem's current defaults
+from PROBLEM_GA_PARAMS), then races them: every round, each surviving candidate
+runs on the same new seeds across a process pool, and once FIRST_TEST seeds are
+in, a candidate is dropped as soon as a one-sided Wilcoxon signed-rank test
+(exact, Holm-corrected over the candidates) shows its loss is higher than the
+current leader's, the candidate with the best mean rank. The race stops when one
+candidate is left or after MAX_SEEDS seeds.
+
+Two objectives set the loss of a run:
+- "cost" (default): the evaluations needed to reach the reference quality, the
+  median best fitness of the current settings on separate calibration seeds
+  (runs that never reach it lose to every run that does, by their distance to
+  it); the tuned setting is the survivor with the lowest median cost, or the
+  current settings when no survivor reaches the reference in most runs.
+- "quality": the best fitness; among the survivors, which reach statistically the
+  same quality, the tuned setting is the one needing the fewest evaluations.
+
+    python -m src.tuning --problems tsp knapsack --jobs 8 --output tuned.json
+
+The tuned settings are printed as PROBLEM_GA_PARAMS entries (src/config/setting.py).
+They are tuned for the default (panmictic) engine; --check-modes runs every engine
+mode documented for src/main.py's --ga-option with every problem's settings, through
+the runner's code path, and exits with status 1 if one of them fails:
+
+    python -m src.tuning --check-modes
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+import traceback
+
+import numpy as np
+
+from src.config.setting import (
+    DEFAULT_GA_PARAMS,
+    PROBLEM_GA_PARAMS,
+    TUNING_PARAMS,
+    TUNING_SPACE,
+    get_problem,
+)
+
+# the engine modes documented for src/main.py's --ga-option (README.md)
+DOCUMENTED_MODES = (
+    {"variation": "mixed"},
+    {"multi_objective": True},
+    {"surrogate": True},
+    {"steady_state": True},
+    {"diversity": True},
+    {"cellular": True},
+)
+
+# PROBLEM_GA_PARAMS keys of the BaseGA.from_problem() arguments
+PARAM_KEYS = {
+    "population_size": "POPULATION_SIZE",
+    "ngen": "MAX_GENERATIONS",
+    "crossover_prob": "P_CROSSOVER",
+    "mutation_prob": "P_MUTATION",
+}
+
+
+# runs one (problem, candidate, seed) case; executed in a worker process
+def run_case(case):
+    from src.ga.base_ga import BaseGA
+
+    name, instance_params, candidate, seed, target = case
+    cfg = get_problem(name, **instance_params)
+    start = time.perf_counter()
+    if target is None:
+        results = BaseGA.from_problem(cfg, seed=seed, verbose=False, **candidate).run()
+    else:
+        # the cost is known once the target is reached
+        ga = BaseGA.from_problem(cfg, seed=seed, verbose=False, target=target, **candidate)
+        results = ga.run(progress=lambda snapshot: snapshot["evaluations_to_target"] is None)
+    best = float(results["best_fitness"])
+    return {
+        "best_fitness": best,
+        # lower is better whatever the direction
+        "quality_loss": -best if cfg["maximize"] else best,
+        "evaluations": results["evaluations"],
+        "evaluations_to_target": results["evaluations_to_target"],
+        "runtime": time.perf_counter() - start,
+    }
+
+
+# the problem's current settings as BaseGA.from_problem() arguments
+def current_settings(name):
+    defaults = {**DEFAULT_GA_PARAMS, **PROBLEM_GA_PARAMS.get(name, {})}
+    settings = {param: defaults[key] for param, key in PARAM_KEYS.items()}
+    settings.update(defaults.get("GA_OPTIONS", {}))
+    return settings
+
+
+# the TUNING_SPACE values of a problem, with its operator portfolio filled in
+def problem_space(name, instance_params):
+    from src.ga.adaptive import default_operators
+
+    cfg = get_problem(name, **instance_params)
+    extra = cfg.get("extra_params", lambda: {})()
+    mate, mutate = default_operators(
+        cfg["chromosome_type"],
+        cfg["individual_size"],
+        extra.get("int_range", (0, 10)),
+        extra.get("real_range", (0.0, 1.0)),
+    )
+    space = dict(TUNING_SPACE)
+    for kind, portfolio in (("mate", mate), ("mutate", mutate)):
+        if kind == "mutate" and "mutate_func" in extra:
+            space.pop(kind)  # the problem's own mutation operator stays
+        elif space.get(kind, ()) is None:
+            space[kind] = tuple(portfolio)
+    return space
+
+
+# count distinct candidates drawn uniformly from the space, the current settings first
+def sample_candidates(space, count, rng, first=None):
+    keys = sorted(space)
+    total = math.prod(len(space[key]) for key in keys)
+    candidates = [] if first is None else [first]
+    seen = {tuple(sorted(candidate.items())) for candidate in candidates}
+    drawn = set()
+    while len(candidates) < count and len(drawn) < total:
+        candidate = {key: rng.choice(space[key]) for key in keys}
+        key = tuple(sorted(candidate.items()))
+        if key in drawn:
+            continue
+        drawn.add(key)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+
+def average_ranks(values):
+    """Ranks 1..n of the values, ties sharing their average rank"""
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(1, len(values) + 1)
+    for value in np.unique(values):
+        tied = values == value
+        ranks[tied] = ranks[tied].mean()
+    return ranks
+
+
+def wilcoxon_greater(differences):
+    """
+    Exact p-value of the one-sided Wilcoxon signed-rank test that the paired
+    differences are centred above 0 (zero differences dropped, tied ranks averaged)
+    """
+    differences = np.asarray(differences, dtype=float)
+    differences = differences[differences != 0]
+    n = len(differences)
+    if n == 0:
+        return 1.0
+    # doubled ranks are integers even with ties averaged
+    ranks = np.rint(2 * average_ranks(np.abs(differences))).astype(int)
+    statistic = int(ranks[differences > 0].sum())
+    # null distribution of the statistic: each rank positive or negative with probability 1/2
+    counts = np.zeros(ranks.sum() + 1)
+    counts[0] = 1.0
+    for rank in ranks:
+        shifted = np.zeros_like(counts)
+        shifted[rank:] = counts[:-rank]
+        counts += shifted
+    return float(counts[statistic:].sum() / 2.0**n)
+
+
+def eliminate(losses, alive, alpha):
+    """
+    :param losses: (candidates, seeds) array of losses, lower is better
+    :param alive: indices of the surviving candidates
+    :return: (leader, candidates significantly worse than it)
+    """
+    block = losses[alive]
+    mean_ranks = np.mean([average_ranks(column) for column in block.T], axis=0)
+    leader = alive[int(np.argmin(mean_ranks))]
+    others = [i for i in alive if i != leader]
+    p_values = [wilcoxon_greater(losses[i] - losses[leader]) for i in others]
+
+    # Holm: the k-th smallest p-value is tested at alpha / (m - k)
+    dropped = []
+    for k, j in enumerate(np.argsort(p_values, kind="stable")):
+        if p_values[j] >= alpha / (len(others) - k):
+            break
+        dropped.append(others[j])
+    return leader, dropped
+
+
+def race(pool, name, instance_params, candidates, settings, objective="cost"):
+    """
+    Races the candidates on one problem; returns the race record
+    :param objective: "cost" or "quality"; the first candidate is the reference of "cost"
+    """
+    seeds = [settings["SEED_OFFSET"] + i for i in range(settings["MAX_SEEDS"])]
+    target = None
+    if objective == "cost":
+        calibration = [
+            (name, instance_params, candidates[0], settings["SEED_OFFSET"] + len(seeds) + i, None)
+            for i in range(settings["FIRST_TEST"])
+        ]
+        calibration_runs = pool.map(run_case, calibration)
+        target = statistics.median(run["best_fitness"] for run in calibration_runs)
+        target_loss = statistics.median(run["quality_loss"] for run in calibration_runs)
+        # above the evaluations of any run, so a missed target loses to every hit
+        missed = 2 * max(c["population_size"] * (c["ngen"] + 1) for c in candidates)
+
+    def loss(run):
+        if objective == "quality":
+            return run["quality_loss"]
+        if run["evaluations_to_target"] is None:
+            gap = (run["quality_loss"] - target_loss) / max(abs(target_loss), 1e-12)
+            return missed * (1.0 + max(gap, 0.0))
+        return run["evaluations_to_target"]
+
+    alive = list(range(len(candidates)))
+    losses = np.empty((len(candidates), 0))
+    runs = [[] for _ in candidates]
+    eliminated = []
+    done = 0
+
+    while len(alive) > 1 and done < len(seeds):
+        round_seeds = seeds[done:done + settings["SEEDS_PER_ROUND"]]
+        cases = [
+            (name, instance_params, candidates[i], seed, target) for i in alive for seed in round_seeds
+        ]
+        results = iter(pool.map(run_case, cases))
+        column = np.full((len(candidates), len(round_seeds)), np.nan)
+        for i in alive:
+            for j in range(len(round_seeds)):
+                run = next(results)
+                run["loss"] = loss(run)
+                runs[i].append(run)
+                column[i, j] = run["loss"]
+        losses = np.hstack((losses, column))
+        done += len(round_seeds)
+
+        if done >= settings["FIRST_TEST"]:
+            leader, dropped = eliminate(losses[:, :done], alive, settings["ALPHA"])
+            for i in dropped:
+                alive.remove(i)
+                eliminated.append({"candidate": i, "after_seeds": done})
+            print(f"{name}: {done} seeds, {len(alive)} of {len(candidates)} candidates left")
+
+    def median_of(i, field):
+        return statistics.median(run[field] for run in runs[i])
+
+    if objective == "cost":
+        winner = min(alive, key=lambda i: (median_of(i, "loss"), median_of(i, "evaluations")))
+        if median_of(winner, "loss") >= missed:
+            winner = 0
+    else:
+        # same quality: the cheapest survivor wins
+        winner = min(alive, key=lambda i: (median_of(i, "evaluations"), median_of(i, "loss")))
+    summary = [
+        {
+            "candidate": i,
+            "params": candidates[i],
+            "seeds": len(runs[i]),
+            "median_best_fitness": median_of(i, "best_fitness"),
+            "median_evaluations": median_of(i, "evaluations"),
+            "median_runtime": median_of(i, "runtime"),
+            "target_hits": sum(run["evaluations_to_target"] is not None for run in runs[i]),
+            "median_evaluations_to_target": statistics.median(
+                [run["evaluations_to_target"] for run in runs[i] if run["evaluations_to_target"] is not None]
+                or [None]
+            ),
+            "survived": i in alive,
+        }
+        for i in range(len(candidates))
+    ]
+    return {
+        "problem": name,
+        "instance_params": instance_params,
+        "objective": objective,
+        "target": target,
+        "seeds": done,
+        "winner": winner,
+        "tuned": candidates[winner],
+        "baseline": summary[0],
+        "candidates": summary,
+        "eliminated": eliminated,
+    }
+
+
+# the tuned settings as a PROBLEM_GA_PARAMS entry
+def as_problem_params(params):
+    entry = {key: params[param] for param, key in PARAM_KEYS.items() if param in params}
+    options = {param: value for param, value in params.items() if param not in PARAM_KEYS}
+    if options:
+        entry["GA_OPTIONS"] = options
+    return entry
+
+
+def print_race(record):
+    baseline = record["baseline"]
+    winner = record["candidates"][record["winner"]]
+    print(f"{record['problem']}: tuned for {record['objective']} over {record['seeds']} seeds"
+          + ("" if record["target"] is None else f", reference quality {record['target']:.6g}"))
+    for label, row in (("current", baseline), ("tuned", winner)):
+        to_target = ""
+        if record["target"] is not None:
+            reached = row["median_evaluations_to_target"]
+            to_target = (f"reference reached in {row['target_hits']}/{row['seeds']} runs"
+                         + ("" if reached is None else f", after {reached:.0f} evaluations") + "; ")
+        print(f"  {label:8s} {to_target}best {row['median_best_fitness']:.6g}, "
+              f"{row['median_evaluations']:.0f} evaluations, {row['median_runtime']:.2f}s (medians)"
+              f"{'' if row['survived'] else ', eliminated'}")
+    print(f"  {record['problem']!r}: {as_problem_params(record['tuned'])},")
+
+
+# runs every documented engine mode with each problem's settings for a few generations
+def check_modes(problems, generations=2):
+    """:return: the failures, as (problem, mode, error) tuples"""
+    from src.main import run_seed
+
+    failures = []
+    for name in problems:
+        cfg = get_problem(name)
+        defaults = {**DEFAULT_GA_PARAMS, **PROBLEM_GA_PARAMS.get(name, {})}
+        ga_params = dict(defaults, MAX_GENERATIONS=generations)
+        for mode in DOCUMENTED_MODES:
+            # modes that do not apply to the problem at all
+            if "variation" in mode and cfg["chromosome_type"] != "real":
+                continue
+            if "multi_objective" in mode and "multi_objective_params" not in cfg:
+                continue
+            options = dict(mode, verbose=False)
+            job = (name, {}, ga_params, defaults.get("GA_OPTIONS", {}), options, 0, None, 0.0)
+            try:
+                run_seed(job)
+            except Exception:
+                failures.append((name, mode, traceback.format_exc(limit=1).strip()))
+            else:
+                print(f"{name} {mode}: ok")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Race GA settings on the registered problems")
+    parser.add_argument("--problems", nargs="+", default=sorted(PROBLEM_GA_PARAMS))
+    parser.add_argument("--candidates", type=int, default=TUNING_PARAMS["CANDIDATES"])
+    parser.add_argument("--max-seeds", type=int, default=TUNING_PARAMS["MAX_SEEDS"])
+    parser.add_argument("--objective", choices=("cost", "quality"), default="cost",
+                        help="race on evaluations to the current quality, or on quality")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the candidate sampling")
+    parser.add_argument("--output", help="JSON file for the race records")
+    parser.add_argument("--check-modes", action="store_true",
+                        help="run the documented engine modes with the current settings instead")
+    args = parser.parse_args(argv)
+
+    if args.check_modes:
+        failures = check_modes(args.problems)
+        for name, mode, error in failures:
+            print(f"{name} {mode}: FAILED\n{error}")
+        sys.exit(1 if failures else 0)
+
+    settings = dict(TUNING_PARAMS, MAX_SEEDS=args.max_seeds)
+    rng = random.Random(args.seed)
+    records = []
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=args.jobs) as pool:
+        for name in args.problems:
+            space = problem_space(name, {})
+            candidates = sample_candidates(space, args.candidates, rng, first=current_settings(name))
+            record = race(pool, name, {}, candidates, settings, args.objective)
+            print_race(record)
+            records.append(record)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()